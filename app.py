@@ -4,13 +4,26 @@
 # Enhanced UI — Crimson Medical Intelligence (Extended Architecture)
 # ============================================================
 
+import hashlib
+import html
+import math
+import time
+from pathlib import Path
+
 import streamlit as st
 import numpy as np
-import pickle
-import plotly.express as px
-import plotly.graph_objects as go
-import pandas as pd
-import time
+
+import charts
+from audit import AUDIT_DB, AUDIT_FLUSH_TIMEOUT_S, AuditLog
+from neighbors import vote_weights
+from inference import (
+    FEATURES, KNN_BACKEND, KNN_ENGINE, RISK_BANDS, classify_risk, describe_rows, feature_axis, invalid_rows,
+    load_artifacts, missing_features, patient_vector, score_frame, sweep,
+)
+from pipeline import check_rows
+from population import percentile
+from registry import REGISTRY_DIR, ModelRegistry
+from telemetry import LATENCY_BUDGET_MS, LatencyTracker, timed
 
 # ============================================================
 # 1. PAGE CONFIGURATION
@@ -25,663 +38,126 @@ st.set_page_config(
 # ============================================================
 # 2. MODEL CACHING & INITIALIZATION
 # ============================================================
-@st.cache_resource
 def load_objects():
-    """Loads the KNN Model and StandardScaler from disk."""
+    """Loads the fused KNN inference pipeline, memory-mapped from `artifacts/` when exported."""
     try:
-        with open("model.pkl", "rb") as f:
-            model = pickle.load(f)
-        with open("scaler.pkl", "rb") as f:
-            scaler = pickle.load(f)
-        return model, scaler
+        return load_artifacts("model.pkl", "scaler.pkl", index_path="knn_index.pkl", artifact_dir="artifacts")
     except FileNotFoundError:
-        return None, None
-
-model, scaler = load_objects()
-
-# ============================================================
-# 3. ENTERPRISE CSS INJECTION (CRIMSON THEME + ANIMATIONS)
-# ============================================================
-st.markdown(
-    """
-<style>
-@import url('https://fonts.googleapis.com/css2?family=Inter:wght@300;400;600;800&family=JetBrains+Mono:wght@400;700&family=Outfit:wght@300;500;700;900&display=swap');
-
-/* ── GLOBAL VARIABLES ── */
-:root {
-    --crimson:       #e11d48;
-    --crimson-light: #fb7185;
-    --crimson-dark:  #9f1239;
-    --cyan:          #06b6d4;
-    --cyan-light:    #67e8f9;
-    --dark-950:      #020617;
-    --dark-900:      #0f172a;
-    --dark-800:      #1e293b;
-    --glass:         rgba(225, 29, 72, 0.03);
-    --glass-border:  rgba(225, 29, 72, 0.15);
-    --glow:          0 0 35px rgba(225, 29, 72, 0.25);
-    --text-main:     #f8fafc;
-    --text-muted:    rgba(248, 250, 252, 0.6);
-}
-
-/* ── BASE APPLICATION BACKGROUND ── */
-.stApp {
-    background: var(--dark-950);
-    font-family: 'Inter', sans-serif;
-    overflow-x: hidden;
-}
-
-/* ── AMBIENT GLOW ANIMATION ── */
-.stApp::before {
-    content: '';
-    position: fixed;
-    inset: 0;
-    background: 
-        radial-gradient(circle at 15% 20%, rgba(225, 29, 72, 0.07) 0%, transparent 45%),
-        radial-gradient(circle at 85% 80%, rgba(6, 182, 212, 0.04) 0%, transparent 45%),
-        radial-gradient(circle at 50% 50%, rgba(159, 18, 57, 0.03) 0%, transparent 60%);
-    pointer-events: none;
-    z-index: 0;
-    animation: pulseBg 10s ease-in-out infinite alternate;
-}
-
-@keyframes pulseBg {
-    0%   { opacity: 0.4; }
-    100% { opacity: 1.0; }
-}
-
-/* ── DOT GRID OVERLAY ── */
-.stApp::after {
-    content: '';
-    position: fixed;
-    inset: 0;
-    background-image: radial-gradient(circle, rgba(225, 29, 72, 0.05) 1px, transparent 1px);
-    background-size: 40px 40px;
-    pointer-events: none;
-    z-index: 0;
-}
-
-/* ── CONTAINER SPACING ── */
-.main .block-container {
-    position: relative;
-    z-index: 1;
-    padding-top: 20px;
-    padding-bottom: 60px;
-    max-width: 1450px;
-}
-
-/* ── HERO SECTION ── */
-.hero {
-    text-align: center;
-    padding: 60px 20px 40px;
-    animation: heroReveal 1s cubic-bezier(0.22,1,0.36,1) both;
-}
-
-@keyframes heroReveal {
-    from { opacity: 0; transform: translateY(-30px); }
-    to   { opacity: 1; transform: translateY(0); }
-}
-
-.hero-badge {
-    display: inline-flex;
-    align-items: center;
-    gap: 12px;
-    background: rgba(225, 29, 72, 0.08);
-    border: 1px solid rgba(225, 29, 72, 0.25);
-    border-radius: 50px;
-    padding: 8px 22px;
-    font-family: 'JetBrains Mono', monospace;
-    font-size: 11px;
-    color: var(--crimson-light);
-    letter-spacing: 2px;
-    text-transform: uppercase;
-    margin-bottom: 24px;
-    box-shadow: 0 0 20px rgba(225, 29, 72, 0.1);
-}
-
-.hero-badge-dot {
-    width: 8px; height: 8px;
-    border-radius: 50%;
-    background: var(--crimson);
-    box-shadow: 0 0 12px var(--crimson);
-    animation: heartbeat 1.2s ease-in-out infinite;
-}
-
-@keyframes heartbeat {
-    0%, 100% { transform: scale(1); opacity: 1; box-shadow: 0 0 12px var(--crimson); }
-    25%      { transform: scale(1.4); opacity: 0.8; box-shadow: 0 0 20px var(--crimson-light); }
-    50%      { transform: scale(1); opacity: 1; box-shadow: 0 0 12px var(--crimson); }
-    75%      { transform: scale(1.4); opacity: 0.8; box-shadow: 0 0 20px var(--crimson-light); }
-}
-
-.hero-title {
-    font-family: 'Outfit', sans-serif;
-    font-size: clamp(38px, 6vw, 72px);
-    font-weight: 900;
-    color: var(--text-main);
-    letter-spacing: -1.5px;
-    line-height: 1.05;
-    margin-bottom: 12px;
-}
-
-.hero-title em {
-    font-style: normal;
-    background: linear-gradient(135deg, var(--crimson-light), var(--cyan-light));
-    -webkit-background-clip: text;
-    -webkit-text-fill-color: transparent;
-    filter: drop-shadow(0 0 25px rgba(225, 29, 72, 0.4));
-}
-
-.hero-sub {
-    font-family: 'Inter', sans-serif;
-    font-size: 16px;
-    font-weight: 300;
-    color: var(--text-muted);
-    letter-spacing: 1.5px;
-    text-transform: uppercase;
-}
-
-.hero-line {
-    display: flex;
-    align-items: center;
-    gap: 16px;
-    margin: 25px auto 0;
-    max-width: 500px;
-}
-
-.hero-line-seg {
-    flex: 1;
-    height: 1px;
-    background: linear-gradient(90deg, transparent, var(--crimson), transparent);
-    animation: lineGrow 1.5s ease both 0.5s;
-}
-
-@keyframes lineGrow {
-    from { transform: scaleX(0); opacity: 0; }
-    to   { transform: scaleX(1); opacity: 1; }
-}
-
-/* ── SCORE BAND ── */
-.score-band {
-    display: flex;
-    justify-content: center;
-    gap: 20px;
-    flex-wrap: wrap;
-    margin-bottom: 30px;
-    animation: heroReveal 1s ease both 0.4s;
-}
-
-.score-chip {
-    display: flex;
-    align-items: center;
-    gap: 8px;
-    background: rgba(225, 29, 72, 0.05);
-    border: 1px solid rgba(225, 29, 72, 0.15);
-    border-radius: 8px;
-    padding: 8px 18px;
-    font-family: 'JetBrains Mono', monospace;
-    font-size: 11px;
-    color: var(--crimson-light);
-    letter-spacing: 1px;
-}
-
-/* ── GLASS PANELS & CONTAINERS ── */
-.glass-panel {
-    background: var(--glass);
-    border: 1px solid var(--glass-border);
-    border-radius: 18px;
-    padding: 30px;
-    margin-bottom: 24px;
-    position: relative;
-    overflow: hidden;
-    transition: all 0.4s cubic-bezier(0.175, 0.885, 0.32, 1.275);
-    animation: panelIn 0.6s ease both;
-}
-
-@keyframes panelIn {
-    from { opacity: 0; transform: translateY(20px); }
-    to   { opacity: 1; transform: translateY(0); }
-}
-
-.glass-panel::before {
-    content: '';
-    position: absolute;
-    top: 0; left: -100%;
-    width: 100%; height: 2px;
-    background: linear-gradient(90deg, transparent, var(--crimson), var(--cyan), transparent);
-    animation: scanRail 4s linear infinite;
-}
-
-@keyframes scanRail {
-    0%   { left: -100%; }
-    100% { left: 100%; }
-}
-
-.glass-panel:hover {
-    border-color: rgba(225, 29, 72, 0.35);
-    box-shadow: var(--glow);
-    transform: translateY(-3px);
-}
-
-.panel-eyebrow {
-    font-family: 'JetBrains Mono', monospace;
-    font-size: 11px;
-    letter-spacing: 3px;
-    color: var(--crimson);
-    text-transform: uppercase;
-    margin-bottom: 6px;
-    opacity: 0.8;
-}
-
-.panel-heading {
-    font-family: 'Outfit', sans-serif;
-    font-size: 22px;
-    font-weight: 800;
-    color: var(--text-main);
-    margin-bottom: 0;
-}
+        return None
 
-/* ── INPUT WIDGETS ── */
-div[data-testid="stNumberInput"] > div > div > input,
-div[data-testid="stSelectbox"] > div > div,
-div[data-testid="stSlider"] {
-    background: rgba(15, 23, 42, 0.7) !important;
-    border: 1px solid rgba(225, 29, 72, 0.2) !important;
-    border-radius: 10px !important;
-    color: var(--text-main) !important;
-    font-family: 'Inter', sans-serif !important;
-    transition: all 0.3s ease !important;
-}
-
-div[data-testid="stNumberInput"] > div > div > input:focus {
-    border-color: var(--crimson) !important;
-    box-shadow: 0 0 0 3px rgba(225, 29, 72, 0.15) !important;
-    outline: none !important;
-}
-
-.stSelectbox label,
-.stNumberInput label,
-.stSlider label {
-    color: rgba(103, 232, 249, 0.9) !important;
-    font-family: 'JetBrains Mono', monospace !important;
-    font-size: 11px !important;
-    letter-spacing: 1.5px !important;
-    text-transform: uppercase !important;
-}
-
-.input-group {
-    font-family: 'Outfit', sans-serif;
-    font-size: 14px;
-    font-weight: 800;
-    letter-spacing: 2px;
-    color: var(--crimson-light);
-    text-transform: uppercase;
-    border-bottom: 1px solid rgba(225, 29, 72, 0.2);
-    padding-bottom: 10px;
-    margin-bottom: 18px;
-    margin-top: 10px;
-}
-
-/* ── PREDICT BUTTON ── */
-div.stButton > button {
-    width: 100% !important;
-    background: linear-gradient(135deg, var(--crimson-dark) 0%, var(--crimson) 100%) !important;
-    color: #ffffff !important;
-    font-family: 'Outfit', sans-serif !important;
-    font-size: 18px !important;
-    font-weight: 800 !important;
-    letter-spacing: 4px !important;
-    text-transform: uppercase !important;
-    border: 1px solid rgba(251, 113, 133, 0.3) !important;
-    border-radius: 14px !important;
-    padding: 22px !important;
-    cursor: pointer !important;
-    transition: all 0.3s ease !important;
-    box-shadow: 0 10px 30px rgba(225, 29, 72, 0.3), inset 0 2px 0 rgba(255,255,255,0.2) !important;
-}
 
-div.stButton > button:hover {
-    transform: translateY(-4px) !important;
-    box-shadow: 0 15px 40px rgba(225, 29, 72, 0.5), inset 0 2px 0 rgba(255,255,255,0.2) !important;
-    border-color: var(--crimson-light) !important;
-}
-
-div.stButton > button:active {
-    transform: translateY(0) !important;
-}
-
-/* ── PREDICTION RESULT BOX ── */
-.result-box {
-    border-radius: 24px;
-    padding: 50px 30px;
-    text-align: center;
-    position: relative;
-    overflow: hidden;
-    margin-top: 25px;
-    animation: popIn 0.7s cubic-bezier(0.175,0.885,0.32,1.275) both;
-}
-
-@keyframes popIn {
-    from { opacity: 0; transform: scale(0.85); }
-    to   { opacity: 1; transform: scale(1); }
-}
-
-.result-box::before {
-    content: '';
-    position: absolute;
-    top: -50%; left: -50%;
-    width: 200%; height: 200%;
-    background: conic-gradient(from 0deg, transparent 0deg, rgba(255,255,255,0.05) 60deg, transparent 120deg);
-    animation: rotateConic 8s linear infinite;
-}
-
-@keyframes rotateConic {
-    from { transform: rotate(0deg); }
-    to   { transform: rotate(360deg); }
-}
-
-.result-num {
-    font-family: 'Outfit', sans-serif;
-    font-size: clamp(60px, 10vw, 110px);
-    font-weight: 900;
-    line-height: 1;
-    position: relative;
-    z-index: 1;
-    filter: drop-shadow(0 0 25px currentColor);
-    margin-bottom: 10px;
-}
-
-.result-label {
-    font-family: 'JetBrains Mono', monospace;
-    font-size: 14px;
-    letter-spacing: 4px;
-    text-transform: uppercase;
-    position: relative;
-    z-index: 1;
-    opacity: 0.9;
-}
-
-/* ── RISK COLOR VARIANTS ── */
-.risk-low  { background: linear-gradient(135deg, #022c22, #064e3b); border: 1px solid rgba(16,185,129,0.5); color: #34d399; box-shadow: 0 0 50px rgba(16,185,129,0.25); }
-.risk-mod  { background: linear-gradient(135deg, #451a03, #78350f); border: 1px solid rgba(245,158,11,0.5); color: #fcd34d; box-shadow: 0 0 50px rgba(245,158,11,0.25); }
-.risk-high { background: linear-gradient(135deg, #450a0a, #7f1d1d); border: 1px solid rgba(239,68,68,0.5);  color: #fca5a5; box-shadow: 0 0 50px rgba(239,68,68,0.35); }
-
-/* ── STAT CHIPS ── */
-.stat-row {
-    display: flex;
-    gap: 16px;
-    flex-wrap: wrap;
-    margin-top: 25px;
-}
-
-.stat-chip {
-    flex: 1;
-    min-width: 120px;
-    background: rgba(225, 29, 72, 0.05);
-    border: 1px solid rgba(225, 29, 72, 0.15);
-    border-radius: 14px;
-    padding: 20px 14px;
-    text-align: center;
-    transition: all 0.3s ease;
-}
-
-.stat-chip:hover {
-    background: rgba(225, 29, 72, 0.1);
-    transform: translateY(-3px);
-    box-shadow: 0 5px 15px rgba(225, 29, 72, 0.2);
-}
-
-.stat-chip-val {
-    font-family: 'Outfit', sans-serif;
-    font-size: 26px;
-    font-weight: 800;
-    color: var(--crimson-light);
-}
-
-.stat-chip-lbl {
-    font-family: 'JetBrains Mono', monospace;
-    font-size: 10px;
-    color: var(--text-muted);
-    letter-spacing: 2px;
-    text-transform: uppercase;
-    margin-top: 6px;
-}
-
-/* ── TABS STYLING ── */
-.stTabs [data-baseweb="tab-list"] {
-    background: rgba(15, 23, 42, 0.6) !important;
-    border-radius: 14px !important;
-    border: 1px solid rgba(225, 29, 72, 0.15) !important;
-    padding: 6px !important;
-    gap: 8px !important;
-}
-
-.stTabs [data-baseweb="tab"] {
-    font-family: 'Outfit', sans-serif !important;
-    font-size: 14px !important;
-    font-weight: 700 !important;
-    letter-spacing: 2px !important;
-    text-transform: uppercase !important;
-    color: rgba(248, 250, 252, 0.5) !important;
-    border-radius: 10px !important;
-    padding: 14px 24px !important;
-    transition: all 0.3s ease !important;
-}
-
-.stTabs [aria-selected="true"] {
-    background: linear-gradient(135deg, rgba(225, 29, 72, 0.2), rgba(159, 18, 57, 0.3)) !important;
-    color: var(--crimson-light) !important;
-    border: 1px solid rgba(225, 29, 72, 0.4) !important;
-    box-shadow: 0 0 20px rgba(225, 29, 72, 0.2) !important;
-}
-
-/* ── SIDEBAR STYLING ── */
-section[data-testid="stSidebar"] {
-    background: linear-gradient(180deg, #020617 0%, #0f172a 100%) !important;
-    border-right: 1px solid rgba(225, 29, 72, 0.15) !important;
-}
-
-.sb-logo-text {
-    font-family: 'Outfit', sans-serif;
-    font-size: 32px;
-    font-weight: 900;
-    background: linear-gradient(135deg, var(--crimson-light), var(--cyan-light));
-    -webkit-background-clip: text;
-    -webkit-text-fill-color: transparent;
-    letter-spacing: 2px;
-}
-
-.sb-logo-sub {
-    font-family: 'JetBrains Mono', monospace;
-    font-size: 10px;
-    color: rgba(225, 29, 72, 0.6);
-    letter-spacing: 3px;
-    margin-top: 4px;
-}
-
-.sb-title {
-    font-family: 'Outfit', sans-serif;
-    font-size: 14px;
-    font-weight: 800;
-    color: var(--crimson);
-    letter-spacing: 2px;
-    text-transform: uppercase;
-    margin-bottom: 12px;
-    border-bottom: 1px solid rgba(225, 29, 72, 0.15);
-    padding-bottom: 6px;
-}
-
-.sb-info {
-    background: rgba(225, 29, 72, 0.04);
-    border: 1px solid rgba(225, 29, 72, 0.15);
-    border-radius: 12px;
-    padding: 18px;
-    font-family: 'Inter', sans-serif;
-    font-size: 14px;
-    color: rgba(248, 250, 252, 0.8);
-    line-height: 1.9;
-}
+@st.cache_resource
+def get_model_registry():
+    """Process-wide model registry: serves the active version and hot-swaps new ones in the background.
 
-.sb-info span { color: var(--cyan-light); font-weight: 600; }
+    Each version carries its own batcher (concurrent scans from all sessions
+    share one predict call) and LRU of predictions keyed on the 13-feature
+    tuple. Without a `models/` registry the local files above are served.
+    """
+    # The scikit-learn engine reads the pickles directly, so it cannot serve registry versions.
+    root = REGISTRY_DIR if KNN_ENGINE == "numpy" else None
+    return ModelRegistry(root, fallback=load_objects, fallback_dir="artifacts").start()
 
-.sb-metric {
-    background: rgba(225, 29, 72, 0.05);
-    border: 1px solid rgba(225, 29, 72, 0.15);
-    border-radius: 12px;
-    padding: 16px;
-    text-align: center;
-    margin-bottom: 12px;
-}
 
-.sb-metric-val {
-    font-family: 'Outfit', sans-serif;
-    font-size: 26px;
-    font-weight: 900;
-    color: var(--cyan-light);
-}
+registry = get_model_registry()
+# The version this run renders with; a swap mid-run does not change it.
+served = registry.current()
+pipeline = served.pipeline if served is not None else None
+batcher = served.batcher if served is not None else None
+predictions = served.predictions if served is not None else None
 
-.sb-metric-lbl {
-    font-family: 'JetBrains Mono', monospace;
-    font-size: 10px;
-    color: var(--text-muted);
-    letter-spacing: 2px;
-    text-transform: uppercase;
-    margin-top: 6px;
-}
 
-/* ── INSIGHT CARDS ── */
-.insight {
-    background: rgba(225, 29, 72, 0.03);
-    border: 1px solid rgba(225, 29, 72, 0.15);
-    border-left: 4px solid var(--crimson);
-    border-radius: 14px;
-    padding: 20px 24px;
-    margin-bottom: 16px;
-    font-family: 'Inter', sans-serif;
-    font-size: 15px;
-    color: rgba(248, 250, 252, 0.85);
-    line-height: 1.7;
-    transition: all 0.3s ease;
-}
+@st.cache_resource
+def get_latency_tracker():
+    """Process-wide rolling window of scan latencies, shared by all sessions."""
+    return LatencyTracker()
 
-.insight:hover {
-    background: rgba(225, 29, 72, 0.08);
-    border-left-color: var(--crimson-light);
-    transform: translateX(5px);
-    box-shadow: 0 4px 15px rgba(225, 29, 72, 0.1);
-}
 
-.insight b { color: var(--cyan-light); }
+latency = get_latency_tracker()
 
-/* ── REPORT CARD ── */
-.report-card {
-    background: rgba(15, 23, 42, 0.4);
-    border: 1px solid rgba(225, 29, 72, 0.2);
-    border-radius: 18px;
-    padding: 30px;
-    margin-bottom: 20px;
-}
 
-.report-row {
-    display: flex;
-    justify-content: space-between;
-    align-items: center;
-    padding: 12px 0;
-    border-bottom: 1px solid rgba(225, 29, 72, 0.1);
-    font-family: 'Inter', sans-serif;
-    font-size: 15px;
-    color: rgba(248, 250, 252, 0.8);
-}
+@st.cache_resource
+def get_audit_log():
+    """Process-wide append-only log of every scan, written off the request thread."""
+    return AuditLog(AUDIT_DB) if AUDIT_DB else None
+
+
+audit = get_audit_log()
+
+
+# Figures are memoized on the patient's feature tuple and the model version and
+# shared across sessions, so reruns that don't change either skip figure building.
+@st.cache_resource(max_entries=256)
+def risk_figures(patient, score, version):
+    """Builds the tab2 radar, population and cholesterol-sweep figures for one patient."""
+    chol_range = np.linspace(100, 400, 300)
+    # Sweeps go to the pipeline directly: 300 one-off rows per patient would
+    # evict real scans from the shared prediction cache and skew its hit rate.
+    sim_scores = np.round(sweep(pipeline, np.array(patient), {"chol": chol_range}), 3)
+    population = served.population
+    return (
+        charts.radar_figure(patient, served.cohort),
+        charts.distribution_figure(score, population, percentile(population, score) if population else None),
+        charts.cholesterol_figure(chol_range.tolist(), sim_scores.tolist(), patient[FEATURES.index("chol")]),
+    )
 
-.report-row:last-child { border-bottom: none; }
 
-.report-row-key {
-    font-family: 'JetBrains Mono', monospace;
-    font-size: 11px;
-    letter-spacing: 1.5px;
-    text-transform: uppercase;
-    color: var(--text-muted);
-}
+@st.cache_resource(max_entries=64)
+def sensitivity_figure(patient, x_feature, y_feature, resolution, version):
+    """Builds the tab2 two-feature sensitivity heatmap for one patient."""
+    x_axis = feature_axis(x_feature, resolution)
+    y_axis = feature_axis(y_feature, resolution)
+    risk_grid = sweep(pipeline, np.array(patient), {x_feature: x_axis, y_feature: y_axis})
+    return charts.heatmap_figure(
+        x_feature, y_feature, x_axis.tolist(), y_axis.tolist(), risk_grid,
+        patient[FEATURES.index(x_feature)], patient[FEATURES.index(y_feature)],
+    )
 
-.report-row-val {
-    font-family: 'Outfit', sans-serif;
-    font-size: 16px;
-    font-weight: 800;
-    color: var(--cyan-light);
-}
 
-/* ── DATAFRAME & PROGRESS ── */
-div[data-testid="stDataFrame"] {
-    border: 1px solid rgba(225, 29, 72, 0.2) !important;
-    border-radius: 16px !important;
-    overflow: hidden !important;
-}
+@st.cache_resource(max_entries=64)
+def neighbor_explanation(patient, version):
+    """The k reference patients behind one prediction: distance, vote share, outcome and inputs."""
+    import pandas as pd  # only MODEL INSIGHTS shows this table
+
+    dist, ind = pipeline.kneighbors(np.array(patient))
+    dist, ind = dist[0], ind[0]
+    rows, outcomes = pipeline.reference_rows(ind)
+    weights = vote_weights(dist[None, :])[0] if pipeline.weights == "distance" else np.ones(len(dist))
+    table = pd.DataFrame({
+        "Rank": np.arange(1, len(ind) + 1),
+        "Reference Row": ind,
+        "Distance": np.round(dist, 3),
+        "Vote Share": [f"{w:.1%}" for w in weights / weights.sum()],
+        "Outcome": [f"{o:g} · {classify_risk(o)[0]}" for o in outcomes],
+    })
+    inputs = pd.DataFrame(np.round(rows, 2), columns=FEATURES)
+    return pd.concat([table, inputs], axis=1), outcomes, weights
 
-div[data-testid="stProgressBar"] > div {
-    background: linear-gradient(90deg, var(--crimson), var(--cyan)) !important;
-    border-radius: 99px !important;
-}
 
-div[data-testid="stProgressBar"] {
-    background: rgba(225, 29, 72, 0.1) !important;
-    border-radius: 99px !important;
-}
+def version_note():
+    """Says so when the scan was scored by an older model than the one drawing the figures."""
+    scored = st.session_state.model_version
+    if served is not None and scored is not None and scored != served.version:
+        st.info(f"This scan was scored by model {scored}; the figures below come from model {served.version}, "
+                "now being served. Re-run the diagnostic scan to score it on the current model.")
 
-/* ── SCROLLBAR ── */
-::-webkit-scrollbar { width: 6px; }
-::-webkit-scrollbar-track { background: var(--dark-950); }
-::-webkit-scrollbar-thumb {
-    background: linear-gradient(180deg, var(--crimson), var(--cyan-light));
-    border-radius: 4px;
-}
+# ============================================================
+# 3. ENTERPRISE CSS THEME (CRIMSON THEME + ANIMATIONS)
+# ============================================================
+# The theme lives in static/theme.css and is served once by Streamlit's static
+# file serving (.streamlit/config.toml); each run only sends the <link> tag.
+THEME_CSS = Path(__file__).parent / "static" / "theme.css"
 
-/* ── FLOATING PARTICLES (CELLS) ── */
-.particles {
-    position: fixed;
-    inset: 0;
-    pointer-events: none;
-    z-index: 0;
-    overflow: hidden;
-}
 
-.cell {
-    position: absolute;
-    border-radius: 50%;
-    background: radial-gradient(circle, var(--crimson-light) 0%, transparent 60%);
-    opacity: 0.15;
-    animation: floatCells linear infinite;
-}
+@st.cache_resource
+def theme_version():
+    """Content hash of the stylesheet, so browsers refetch it only after it changes."""
+    return hashlib.sha256(THEME_CSS.read_bytes()).hexdigest()[:12]
 
-/* Complex cell paths */
-.cell:nth-child(1) { width: 50px; height: 50px; left: 8%;  animation-duration: 28s; animation-delay: 0s; }
-.cell:nth-child(2) { width: 30px; height: 30px; left: 25%; animation-duration: 22s; animation-delay: 4s; }
-.cell:nth-child(3) { width: 65px; height: 65px; left: 45%; animation-duration: 35s; animation-delay: 2s; }
-.cell:nth-child(4) { width: 20px; height: 20px; left: 65%; animation-duration: 18s; animation-delay: 7s; }
-.cell:nth-child(5) { width: 45px; height: 45px; left: 82%; animation-duration: 30s; animation-delay: 1s; }
-.cell:nth-child(6) { width: 35px; height: 35px; left: 95%; animation-duration: 25s; animation-delay: 5s; }
-
-@keyframes floatCells {
-    0%   { transform: translateY(110vh) scale(0.8) rotate(0deg); opacity: 0; }
-    15%  { opacity: 0.25; }
-    85%  { opacity: 0.25; }
-    100% { transform: translateY(-10vh) scale(1.3) rotate(360deg); opacity: 0; }
-}
 
-/* ── FOOTER ── */
-.footer {
-    text-align: center;
-    padding: 35px;
-    font-family: 'JetBrains Mono', monospace;
-    font-size: 11px;
-    color: rgba(225, 29, 72, 0.4);
-    letter-spacing: 2.5px;
-    text-transform: uppercase;
-    border-top: 1px solid rgba(225, 29, 72, 0.1);
-    margin-top: 50px;
-    position: relative;
-    z-index: 1;
-}
-</style>
+st.markdown(
+    f"""
+<link rel="stylesheet" href="app/static/theme.css?v={theme_version()}">
 
 <div class="particles">
     <div class="cell"></div><div class="cell"></div><div class="cell"></div>
@@ -698,15 +174,67 @@ div[data-testid="stProgressBar"] {
 SESSION_KEYS = [
     "severity", "risk_level", "risk_class", "timestamp",
     "age", "sex", "cp", "trestbps", "chol", "fbs", 
-    "restecg", "thalach", "exang", "oldpeak", "slope", "ca", "thal"
+    "restecg", "thalach", "exang", "oldpeak", "slope", "ca", "thal",
+    "timings", "bulk_result", "model_version", "patient_id"
 ]
 for key in SESSION_KEYS:
     if key not in st.session_state:
         st.session_state[key] = None
 
+# Tabs render lazily, and Streamlit drops the state of any widget that was not
+# drawn on a run. The keyed inputs are seeded here and re-assigned every run so
+# they keep their values across tab switches.
+WIDGET_DEFAULTS = {
+    "in_patient_id": "", "in_age": 45, "in_sex": "Male", "in_cp": 0, "in_trestbps": 120, "in_chol": 200,
+    "in_fbs": "False", "in_restecg": 0, "in_thalach": 150, "in_exang": "No",
+    "in_oldpeak": 1.0, "in_slope": 0, "in_ca": 0, "in_thal": 1,
+    "hm_x": "age", "hm_y": "trestbps", "hm_res": 100, "hist_page": 1,
+}
+for key, default in WIDGET_DEFAULTS.items():
+    st.session_state[key] = st.session_state.get(key, default)
+
 # ============================================================
 # 5. ENTERPRISE SIDEBAR
 # ============================================================
+def live_status():
+    """Severity ring for the last scan; redrawn by the full rerun that follows each scan."""
+    if st.session_state.severity is not None:
+        live_score = float(st.session_state.severity)
+        prog_frac = min(live_score / 3.0, 1.0)
+        ring_color = "#10b981" if live_score < 0.75 else "#f59e0b" if live_score < 1.75 else "#ef4444"
+
+        st.markdown(
+            f"""
+            <div style='background:rgba(0,0,0,0.5); border:1px solid {ring_color}55;
+                        border-radius:16px; padding:20px; text-align:center;
+                        box-shadow:0 0 25px {ring_color}22;'>
+                <div style='font-family:Outfit,sans-serif; font-size:46px; font-weight:900;
+                            color:{ring_color}; text-shadow:0 0 20px {ring_color};'>{live_score}</div>
+                <div style='font-family:"JetBrains Mono",monospace; font-size:10px;
+                            color:rgba(255,255,255,0.5); letter-spacing:2px; margin-top:6px;'>
+                    SEVERITY INDEX / 3.0
+                </div>
+                <div style='font-family:"JetBrains Mono",monospace; font-size:10px;
+                            color:rgba(255,255,255,0.35); letter-spacing:2px; margin-top:4px;'>
+                    MODEL {st.session_state.model_version}
+                </div>
+            </div>
+            """,
+            unsafe_allow_html=True,
+        )
+        st.progress(prog_frac)
+    else:
+        st.markdown(
+            """<div style='background:rgba(225,29,72,0.03); border:1px solid rgba(225,29,72,0.15);
+                           border-radius:16px; padding:20px; text-align:center;'>
+                <div style='font-family:"JetBrains Mono",monospace; font-size:10px;
+                            color:rgba(225,29,72,0.5); letter-spacing:2px;'>SYSTEM STANDBY</div>
+            </div>""",
+            unsafe_allow_html=True,
+        )
+        st.progress(0.0)
+
+
 with st.sidebar:
     st.markdown(
         """
@@ -720,9 +248,12 @@ with st.sidebar:
 
     st.markdown('<div class="sb-title">🧬 Pipeline Architecture</div>', unsafe_allow_html=True)
     st.markdown(
-        """
+        f"""
         <div class="sb-info">
             <span>Algorithm:</span> K-Nearest Neighbours<br>
+            <span>Model Version:</span> {served.version if served is not None else "offline"}<br>
+            <span>Engine:</span> {"scikit-learn" if KNN_ENGINE == "sklearn" else "NumPy (fused)"}<br>
+            <span>Neighbor Search:</span> {"Approximate (IVF)" if KNN_BACKEND == "ivf" else "Exact"}<br>
             <span>Scaling:</span> StandardScaler<br>
             <span>Dimensions:</span> 13 Biomarkers<br>
             <span>Target Vector:</span> Severity Regression<br>
@@ -731,6 +262,8 @@ with st.sidebar:
         """,
         unsafe_allow_html=True,
     )
+    if registry.last_error:
+        st.warning(f"Model reload failed, still serving {served.version if served is not None else 'nothing'}: {registry.last_error}")
 
     st.markdown("<br>", unsafe_allow_html=True)
     st.markdown('<div class="sb-title">📊 System Telemetry</div>', unsafe_allow_html=True)
@@ -753,49 +286,25 @@ with st.sidebar:
             unsafe_allow_html=True,
         )
 
+    # Filled at the end of the script so this run's timings are shown.
+    telemetry_slot = st.empty()
+
     st.markdown("<br>", unsafe_allow_html=True)
     st.markdown('<div class="sb-title">🫀 Live Status</div>', unsafe_allow_html=True)
 
-    if st.session_state.severity is not None:
-        live_score = float(st.session_state.severity)
-        prog_frac = min(live_score / 3.0, 1.0)
-        ring_color = "#10b981" if live_score < 0.75 else "#f59e0b" if live_score < 1.75 else "#ef4444"
-        
-        st.markdown(
-            f"""
-            <div style='background:rgba(0,0,0,0.5); border:1px solid {ring_color}55;
-                        border-radius:16px; padding:20px; text-align:center;
-                        box-shadow:0 0 25px {ring_color}22;'>
-                <div style='font-family:Outfit,sans-serif; font-size:46px; font-weight:900;
-                            color:{ring_color}; text-shadow:0 0 20px {ring_color};'>{live_score}</div>
-                <div style='font-family:"JetBrains Mono",monospace; font-size:10px;
-                            color:rgba(255,255,255,0.5); letter-spacing:2px; margin-top:6px;'>
-                    SEVERITY INDEX / 3.0
-                </div>
-            </div>
-            """,
-            unsafe_allow_html=True,
-        )
-        st.progress(prog_frac)
-    else:
-        st.markdown(
-            """<div style='background:rgba(225,29,72,0.03); border:1px solid rgba(225,29,72,0.15);
-                           border-radius:16px; padding:20px; text-align:center;'>
-                <div style='font-family:"JetBrains Mono",monospace; font-size:10px;
-                            color:rgba(225,29,72,0.5); letter-spacing:2px;'>SYSTEM STANDBY</div>
-            </div>""",
-            unsafe_allow_html=True,
-        )
-        st.progress(0.0)
+    live_status()
 
     st.markdown("<br>", unsafe_allow_html=True)
     with st.expander("⚙️ KNN Technical Specs"):
+        specs = (
+            f"• Distance Metric: Minkowski (p={pipeline.p:g})<br>"
+            f"• Neighbor Count (k): {pipeline.n_neighbors}<br>"
+            f"• Weighting: {pipeline.weights.title()}<br>"
+        ) if pipeline is not None else "• Model offline<br>"
         st.markdown(
-            """<div style='font-family:"Inter",sans-serif; font-size:13px;
+            f"""<div style='font-family:"Inter",sans-serif; font-size:13px;
                            color:rgba(248,250,252,0.7); line-height:1.8;'>
-                • Distance Metric: Minkowski (p=2)<br>
-                • Neighbor Count (k): 5<br>
-                • Weighting: Uniform<br>
+                {specs}
                 • Feature space variance normalized via Scikit-Learn StandardScaler.
             </div>""",
             unsafe_allow_html=True,
@@ -838,20 +347,24 @@ st.markdown(
 # ============================================================
 # 7. MAIN TABS
 # ============================================================
-tab1, tab2, tab3, tab4 = st.tabs(
+tab1, tab2, tab3, tab4, tab5 = st.tabs(
     [
         "⚕️  CLINICAL INPUTS",
         "📊  RISK ANALYTICS",
         "🧬  MODEL INSIGHTS",
         "📋  PATIENT REPORT",
-    ]
+        "📂  BULK SCORING",
+    ],
+    key="active_tab",
+    on_change="rerun",  # lazy: only the selected tab's body runs
 )
 
 # ============================================================
 # TAB 1 — CLINICAL INPUTS (PREDICTION ENGINE)
 # ============================================================
-with tab1:
-
+@st.fragment
+def clinical_input_form():
+    """Biomarker widgets and the scan button; a widget change reruns only this form."""
     st.markdown(
         """<div class="glass-panel">
             <div class="panel-eyebrow">Patient Parameter Configuration</div>
@@ -860,29 +373,34 @@ with tab1:
         unsafe_allow_html=True,
     )
 
+    patient_id = st.text_input(
+        "Patient ID", key="in_patient_id", placeholder="e.g. MRN-004217",
+        help="Optional. Scans with the same ID form the patient's visit history on PATIENT REPORT.",
+    ).strip()
+
     col1, col2, col3 = st.columns(3)
 
     with col1:
         st.markdown('<div class="input-group">🩺 Base Demographics & Vitals</div>', unsafe_allow_html=True)
-        age = st.slider("Age (Years)", 1, 120, 45, help="Patient's age in years.")
-        sex_sel = st.selectbox("Biological Sex", ["Female", "Male"], index=1)
-        trestbps = st.slider("Resting Blood Pressure (mm Hg)", 80, 200, 120)
-        thalach = st.slider("Maximum Heart Rate Achieved", 60, 220, 150)
+        age = st.slider("Age (Years)", 1, 120, help="Patient's age in years.", key="in_age")
+        sex_sel = st.selectbox("Biological Sex", ["Female", "Male"], key="in_sex")
+        trestbps = st.slider("Resting Blood Pressure (mm Hg)", 80, 200, key="in_trestbps")
+        thalach = st.slider("Maximum Heart Rate Achieved", 60, 220, key="in_thalach")
 
     with col2:
         st.markdown('<div class="input-group">🧪 Metabolic Markers</div>', unsafe_allow_html=True)
-        chol = st.slider("Serum Cholestoral (mg/dl)", 100, 600, 200)
-        fbs_sel = st.selectbox("Fasting Blood Sugar > 120 mg/dl", ["False", "True"])
-        restecg = st.selectbox("Resting Electrocardiographic Results", [0, 1, 2], help="0: Normal, 1: ST-T Wave Abnormality, 2: Left Ventricular Hypertrophy")
-        cp = st.selectbox("Chest Pain Type", [0, 1, 2, 3], help="0: Typical Angina, 1: Atypical Angina, 2: Non-anginal Pain, 3: Asymptomatic")
+        chol = st.slider("Serum Cholestoral (mg/dl)", 100, 600, key="in_chol")
+        fbs_sel = st.selectbox("Fasting Blood Sugar > 120 mg/dl", ["False", "True"], key="in_fbs")
+        restecg = st.selectbox("Resting Electrocardiographic Results", [0, 1, 2], help="0: Normal, 1: ST-T Wave Abnormality, 2: Left Ventricular Hypertrophy", key="in_restecg")
+        cp = st.selectbox("Chest Pain Type", [0, 1, 2, 3], help="0: Typical Angina, 1: Atypical Angina, 2: Non-anginal Pain, 3: Asymptomatic", key="in_cp")
 
     with col3:
         st.markdown('<div class="input-group">🔬 Stress & Vascular Metrics</div>', unsafe_allow_html=True)
-        exang_sel = st.selectbox("Exercise Induced Angina", ["No", "Yes"])
-        oldpeak = st.number_input("ST Depression Induced by Exercise", 0.0, 10.0, 1.0, step=0.1)
-        slope = st.selectbox("Slope of Peak Exercise ST Segment", [0, 1, 2], help="0: Upsloping, 1: Flat, 2: Downsloping")
-        ca = st.selectbox("Number of Major Vessels Colored by Flourosopy", [0, 1, 2, 3])
-        thal = st.selectbox("Thalassemia", [1, 2, 3], help="1: Normal, 2: Fixed Defect, 3: Reversable Defect")
+        exang_sel = st.selectbox("Exercise Induced Angina", ["No", "Yes"], key="in_exang")
+        oldpeak = st.number_input("ST Depression Induced by Exercise", 0.0, 10.0, step=0.1, key="in_oldpeak")
+        slope = st.selectbox("Slope of Peak Exercise ST Segment", [0, 1, 2], help="0: Upsloping, 1: Flat, 2: Downsloping", key="in_slope")
+        ca = st.selectbox("Number of Major Vessels Colored by Flourosopy", [0, 1, 2, 3], key="in_ca")
+        thal = st.selectbox("Thalassemia", [1, 2, 3], help="1: Normal, 2: Fixed Defect, 3: Reversable Defect", key="in_thal")
 
     # Value Encoding
     sex_val = 1 if sex_sel == "Male" else 0
@@ -896,39 +414,42 @@ with tab1:
         predict_clicked = st.button("🔍 INITIATE AI DIAGNOSTIC SCAN", use_container_width=True)
 
     if predict_clicked:
-        if model is None or scaler is None:
+        # Newest version at click time; it finishes this scan even if a swap lands meanwhile.
+        model = registry.current()
+        if model is None:
             st.error("System Failure: ML Models ('model.pkl', 'scaler.pkl') offline. Please verify file integrity.")
         else:
-            # Simulate a deep scan loading state for enterprise feel
-            with st.spinner("Processing multidimensional biomarker vectors..."):
-                time.sleep(1.2)
-                
-            features = np.array([[age, sex_val, cp, trestbps, chol, fbs_val, restecg, thalach, exang_val, oldpeak, slope, ca, thal]])
-            scaled_features = scaler.transform(features)
-            raw_pred = model.predict(scaled_features)
+            timings = {}
+            with timed(timings, "validate"):
+                features = check_rows([age, sex_val, cp, trestbps, chol, fbs_val, restecg, thalach, exang_val, oldpeak, slope, ca, thal])
+            with timed(timings, "predict"):
+                raw_pred = model.predictions.predict_trusted(features)
             severity_score = round(float(raw_pred[0]), 2)
 
             # Categorization Logic
-            if severity_score < 0.75:
-                box_cls = "risk-low"
-                risk_band = "Low Risk Profile"
-            elif severity_score < 1.75:
-                box_cls = "risk-mod"
-                risk_band = "Moderate Risk Profile"
-            else:
-                box_cls = "risk-high"
-                risk_band = "High Risk Profile"
-
-            # Persist state
+            risk_band, box_cls = classify_risk(severity_score)
+            if audit is not None:
+                audit.record(features[0], severity_score, risk_band, model.version,
+                             timings["validate"] + timings["predict"], patient_id)
+
+            # Persist state; a different patient's history starts on its newest page
+            if (patient_id or None) != st.session_state.patient_id:
+                st.session_state.hist_page = 1
             st.session_state.update({
                 "severity": severity_score, "risk_level": risk_band, "risk_class": box_cls,
                 "timestamp": time.strftime("%Y-%m-%d %H:%M:%S"),
                 "age": age, "sex": sex_val, "cp": cp, "trestbps": trestbps, "chol": chol,
                 "fbs": fbs_val, "restecg": restecg, "thalach": thalach, "exang": exang_val,
-                "oldpeak": oldpeak, "slope": slope, "ca": ca, "thal": thal
+                "oldpeak": oldpeak, "slope": slope, "ca": ca, "thal": thal,
+                "timings": timings, "model_version": model.version, "patient_id": patient_id or None,
             })
+            # The new score feeds the result panel, the sidebar status and the other tabs
+            st.rerun()
+
 
-    # Display Result
+def result_panel():
+    """Severity readout and stat chips for the last scan."""
+    render_start = time.perf_counter()
     if st.session_state.severity is not None:
         gpa = st.session_state.severity
         rc = st.session_state.risk_class
@@ -956,11 +477,29 @@ with tab1:
         )
         st.markdown(f'<div class="stat-row">{chip_html}</div>', unsafe_allow_html=True)
 
+    # Record this scan's stage timings once its result has been drawn
+    timings = st.session_state.timings
+    if timings is not None and "render" not in timings:
+        timings["render"] = (time.perf_counter() - render_start) * 1000.0
+        latency.record(timings)
+
+
+def render_clinical_inputs():
+    """Patient input form, diagnostic scan and result panel."""
+    clinical_input_form()
+    result_panel()
+
+
+with tab1:
+    if tab1.open:
+        render_clinical_inputs()
+
+
 # ============================================================
 # TAB 2 — RISK ANALYTICS (DATA SCIENCE DEEP DIVE)
 # ============================================================
-with tab2:
-
+def render_risk_analytics():
+    """Radar, population, cholesterol-sweep and sensitivity charts for the scanned patient."""
     if st.session_state.severity is None:
         st.markdown(
             """<div style='text-align:center; padding:100px 20px; font-family:Outfit,sans-serif;
@@ -973,162 +512,92 @@ with tab2:
     else:
         # Retrieve state variables
         score = st.session_state.severity
-        s_age = st.session_state.age
-        s_trestbps = st.session_state.trestbps
-        s_chol = st.session_state.chol
-        s_thalach = st.session_state.thalach
-        s_oldpeak = st.session_state.oldpeak
-        s_ca = st.session_state.ca
+        patient = tuple(patient_vector(st.session_state).tolist())
 
+        version_note()
         st.markdown('<div class="input-group" style="font-size:18px;">📈 Multidimensional Risk Topography</div>', unsafe_allow_html=True)
 
         col_radar, col_dist = st.columns(2)
+        fig_radar, fig_dist, fig_sim = risk_figures(patient, score, served.version)
 
         # ── 1. Radar Chart (Normalized Profiles) ──
         with col_radar:
             st.markdown("<p style='text-align:center; font-family:JetBrains Mono; color:#67e8f9; font-size:12px;'>BIOMARKER RADAR MAPPING</p>", unsafe_allow_html=True)
-            
-            radar_labels = ["Age", "Cholesterol", "Blood Pressure", "Heart Rate", "ST Depression", "Vessels (CA)"]
-            
-            # Normalizing features relative to typical max boundaries for plotting
-            radar_values = [
-                s_age / 100.0,
-                s_chol / 500.0,
-                s_trestbps / 200.0,
-                s_thalach / 220.0,
-                s_oldpeak / 6.0,
-                s_ca / 3.0 if s_ca > 0 else 0.1 # Slight offset to show on chart
-            ]
-            
-            # Closing the loop for Plotly
-            r_closed = radar_values + [radar_values[0]]
-            theta_closed = radar_labels + [radar_labels[0]]
-
-            fig_radar = go.Figure()
-            fig_radar.add_trace(
-                go.Scatterpolar(
-                    r=r_closed,
-                    theta=theta_closed,
-                    fill="toself",
-                    fillcolor="rgba(225, 29, 72, 0.2)",
-                    line=dict(color="#fb7185", width=3),
-                    name="Patient Data",
-                )
-            )
-            # Add synthetic benchmark
-            fig_radar.add_trace(
-                go.Scatterpolar(
-                    r=[0.4, 0.4, 0.6, 0.7, 0.2, 0.1, 0.4],
-                    theta=theta_closed,
-                    mode="lines",
-                    line=dict(color="rgba(6, 182, 212, 0.5)", width=2, dash="dot"),
-                    name="Healthy Baseline",
-                )
-            )
-            
-            fig_radar.update_layout(
-                polar=dict(
-                    bgcolor="rgba(0,0,0,0)",
-                    radialaxis=dict(gridcolor="rgba(225,29,72,0.15)", color="rgba(225,29,72,0.5)", range=[0, 1]),
-                    angularaxis=dict(gridcolor="rgba(225,29,72,0.15)", color="#67e8f9"),
-                ),
-                paper_bgcolor="rgba(0,0,0,0)",
-                font=dict(family="JetBrains Mono", size=11),
-                height=450,
-                margin=dict(l=40, r=40, t=40, b=40),
-                legend=dict(orientation="h", yanchor="bottom", y=-0.2, xanchor="center", x=0.5, font=dict(color="#f8fafc"))
-            )
             st.plotly_chart(fig_radar, use_container_width=True)
 
         # ── 2. Population Distribution Curve ──
         with col_dist:
             st.markdown("<p style='text-align:center; font-family:JetBrains Mono; color:#67e8f9; font-size:12px;'>POPULATION SEVERITY DISTRIBUTION</p>", unsafe_allow_html=True)
-            
-            # Simulating a normal distribution of severity scores in a dataset
-            mu, sigma = 1.2, 0.6
-            x_vals = np.linspace(0.0, 3.0, 200)
-            y_vals = (1.0 / (sigma * np.sqrt(2.0 * np.pi))) * np.exp(-0.5 * ((x_vals - mu) / sigma) ** 2)
-
-            fig_dist = go.Figure()
-            fig_dist.add_trace(
-                go.Scatter(
-                    x=x_vals.tolist(), y=y_vals.tolist(),
-                    mode="lines", fill="tozeroy", fillcolor="rgba(6, 182, 212, 0.1)",
-                    line=dict(color="#06b6d4", width=3, shape="spline"),
-                    name="Synthetic Population"
-                )
-            )
-            # Add patient line
-            fig_dist.add_vline(
-                x=score, line=dict(color="#fb7185", width=3, dash="dash"),
-                annotation_text=f"Patient: {score}", annotation_font_color="#fb7185", annotation_position="top right"
-            )
-            
-            fig_dist.update_layout(
-                paper_bgcolor="rgba(0,0,0,0)", plot_bgcolor="rgba(225,29,72,0.02)",
-                font=dict(family="Inter", color="#f8fafc"),
-                xaxis=dict(title="Severity Score", range=[0, 3], gridcolor="rgba(255,255,255,0.05)"),
-                yaxis=dict(title="Density", gridcolor="rgba(255,255,255,0.05)", showticklabels=False),
-                height=450,
-                margin=dict(l=20, r=20, t=40, b=20),
-                showlegend=False
-            )
             st.plotly_chart(fig_dist, use_container_width=True)
-            
+            if served.population is not None:
+                st.caption(f"Percentile {percentile(served.population, score):.1f} of {served.population['n']:,} "
+                           f"reference patients, each scored leave-one-out by model {served.version}.")
+            else:
+                st.caption(f"No reference-cohort distribution for model {served.version}; "
+                           "export one with `python population.py <artifact dir>`.")
+
         # ── 3. Feature Simulation Line Chart ──
         st.markdown('<div class="input-group" style="font-size:18px; margin-top:40px;">🧪 Simulated Cholesterol Impact</div>', unsafe_allow_html=True)
-        
-        # Simulate how changing cholesterol affects THIS specific patient
-        chol_range = np.linspace(100, 400, 30)
-        sim_scores = []
-        for c in chol_range:
-            sim_arr = np.array([[s_age, st.session_state.sex, st.session_state.cp, s_trestbps, c, 
-                                 st.session_state.fbs, st.session_state.restecg, s_thalach, 
-                                 st.session_state.exang, s_oldpeak, st.session_state.slope, 
-                                 s_ca, st.session_state.thal]])
-            sim_scaled = scaler.transform(sim_arr)
-            sim_scores.append(round(min(max(float(model.predict(sim_scaled)[0]), 0.0), 3.0), 3))
-
-        fig_sim = go.Figure()
-        fig_sim.add_trace(
-            go.Scatter(
-                x=chol_range.tolist(), y=sim_scores,
-                mode="lines+markers",
-                line=dict(color="#e11d48", width=3, shape="spline"),
-                marker=dict(color="#f8fafc", size=6, line=dict(color="#e11d48", width=2)),
-                fill="tozeroy", fillcolor="rgba(225, 29, 72, 0.08)",
-            )
-        )
-        fig_sim.add_vline(
-            x=s_chol, line=dict(color="#06b6d4", width=2, dash="dash"),
-            annotation_text=f"Current: {s_chol} mg/dl", annotation_font_color="#06b6d4"
-        )
-        fig_sim.update_layout(
-            paper_bgcolor="rgba(0,0,0,0)", plot_bgcolor="rgba(0,0,0,0)",
-            font=dict(family="Inter", color="#f8fafc"),
-            xaxis=dict(title="Simulated Cholesterol (mg/dl)", gridcolor="rgba(255,255,255,0.05)"),
-            yaxis=dict(title="Predicted Severity", range=[0, 3], gridcolor="rgba(255,255,255,0.05)"),
-            height=350, margin=dict(l=20, r=20, t=20, b=20)
-        )
         st.plotly_chart(fig_sim, use_container_width=True)
 
+        # ── 4. Two-Feature Sensitivity Heatmap ──
+        st.markdown('<div class="input-group" style="font-size:18px; margin-top:40px;">🗺️ Two-Feature Sensitivity Map</div>', unsafe_allow_html=True)
+
+        hm_c1, hm_c2, hm_c3 = st.columns(3)
+        with hm_c1:
+            hm_x = st.selectbox("Horizontal Axis Feature", FEATURES, key="hm_x")
+        with hm_c2:
+            hm_y = st.selectbox("Vertical Axis Feature", [f for f in FEATURES if f != hm_x], key="hm_y")
+        with hm_c3:
+            hm_res = st.select_slider("Grid Resolution", [25, 50, 100, 150], key="hm_res")
+
+        st.plotly_chart(sensitivity_figure(patient, hm_x, hm_y, hm_res, served.version), use_container_width=True)
+
+
+with tab2:
+    if tab2.open:
+        render_risk_analytics()
+
+
 # ============================================================
 # TAB 3 — MODEL INSIGHTS (MACHINE LEARNING THEORY)
 # ============================================================
-with tab3:
+def render_model_insights():
+    """Algorithm notes and the feature architecture table."""
     st.markdown('<div class="input-group" style="font-size:18px;">🧠 Algorithm Interpretability</div>', unsafe_allow_html=True)
 
     why_insights = [
         ("<b>Non-Linear Boundary Mapping</b> — KNN excels in medical diagnostics because human biology rarely follows strict linear equations; it finds the 'closest' historical patients in a multi-dimensional space.",),
         ("<b>Feature Standardization</b> — Without `StandardScaler`, variables with large numeric ranges (like Cholesterol at 250) would completely dominate distance calculations over critical small-range features (like Oldpeak at 1.5).",),
         ("<b>Distance Metrics</b> — The algorithm computes Euclidean distances across 13 distinct axes. Every patient is plotted as a coordinate in a 13-dimensional hyperspace.",),
-        ("<b>Instance-Based Learning</b> — Unlike neural networks which compress data into weights, KNN 'remembers' the entire training set, making it highly transparent for clinical auditing.",),
+        ("<b>Instance-Based Learning</b> — Unlike neural networks which compress data into weights, KNN 'remembers' the entire training set, making it highly transparent for clinical auditing: the panel below lists the historical patients behind the current prediction.",),
     ]
     for (text,) in why_insights:
         st.markdown(f'<div class="insight">{text}</div>', unsafe_allow_html=True)
 
+    st.markdown('<div class="input-group" style="font-size:18px; margin-top:30px;">🔍 Nearest-Neighbor Explanation</div>', unsafe_allow_html=True)
+    if st.session_state.severity is None:
+        st.caption("Run a diagnostic scan to see the historical patients behind its prediction.")
+    else:
+        patient = tuple(patient_vector(st.session_state).tolist())
+        version_note()
+        table, outcomes, weights = neighbor_explanation(patient, served.version)
+        votes = {o: weights[outcomes == o].sum() / weights.sum() for o in np.unique(outcomes)}
+        tally = " · ".join(f"outcome {o:g}: {share:.0%} of the vote" for o, share in votes.items())
+        st.caption(f"The {len(table)} nearest reference patients to the current inputs (k={pipeline.n_neighbors}, "
+                   f"{pipeline.weights} weights, p={pipeline.p:g}), scored by model {served.version}: {tally}."
+                   + (" Inputs are in raw units." if pipeline.raw_reference is not None else ""))
+        if pipeline.raw_reference is None:
+            st.warning(f"Model {served.version} was exported without its unscaled training rows "
+                       "(raw_reference.npy), so the inputs below are scaled back from the reference matrix "
+                       "and may be offset from the recorded values. Re-export with `python train.py` "
+                       "or `python artifacts.py ... --raw <training rows>`.")
+        st.dataframe(table, use_container_width=True, hide_index=True)
+
     st.markdown('<div class="input-group" style="font-size:18px; margin-top:30px;">📋 Feature Architecture Table</div>', unsafe_allow_html=True)
 
+    import pandas as pd  # deferred: ~0.4 s to import, only this tab and bulk scoring need it
+
     feat_df = pd.DataFrame({
         "Feature Index": ["age", "sex", "cp", "trestbps", "chol", "fbs", "restecg", "thalach", "exang", "oldpeak", "slope", "ca", "thal"],
         "Clinical Description": [
@@ -1150,11 +619,53 @@ with tab3:
         use_container_width=True, hide_index=True
     )
 
+
+with tab3:
+    if tab3.open:
+        render_model_insights()
+
+
 # ============================================================
 # TAB 4 — PATIENT REPORT (EXPORTABLE DASHBOARD)
 # ============================================================
-with tab4:
-
+# Visits per history page; only this many rows are read from the audit log.
+HISTORY_PAGE = 50
+
+
+@st.fragment
+def patient_history():
+    """Severity and biomarker trend across the patient's logged visits, one page at a time."""
+    st.markdown('<div class="input-group">📈 Visit History</div>', unsafe_allow_html=True)
+    pid = st.session_state.patient_id
+    if audit is None:
+        st.caption("Visit history needs the audit log, which is turned off (HHI_AUDIT_DB).")
+        return
+    if not pid:
+        st.caption("Enter a Patient ID on CLINICAL INPUTS to track this patient across visits.")
+        return
+
+    # The scan that opened this report may still be queued.
+    flushed = audit.flush(AUDIT_FLUSH_TIMEOUT_S)
+    visits = audit.visit_count(pid)
+    pages = max(1, math.ceil(visits / HISTORY_PAGE))
+    page = 1
+    if pages > 1:
+        st.session_state.hist_page = min(st.session_state.hist_page, pages)
+        page = st.number_input("History page (1 = most recent)", 1, pages, step=1, key="hist_page")
+    offset = (page - 1) * HISTORY_PAGE
+    window = audit.history(pid, HISTORY_PAGE, offset)
+
+    st.caption(f"{visits:,} visit{'s' if visits != 1 else ''} on record for {pid} · showing {offset + 1:,}–{offset + len(window['ts']):,}"
+               f" · page {page} of {pages}")
+    pending = 0 if flushed else audit.pending()
+    if not flushed:
+        st.caption(f"⏳ {pending:,} pending write{'s' if pending != 1 else ''} to the audit log; "
+                   "the latest scans may be missing from this history.")
+    st.plotly_chart(charts.history_figure(window), use_container_width=True)
+
+
+def render_patient_report():
+    """Printable readout and physician advisory for the scanned patient."""
     if st.session_state.severity is None:
         st.markdown(
             """<div style='text-align:center; padding:100px 20px; font-family:Outfit,sans-serif;
@@ -1169,11 +680,12 @@ with tab4:
         rc = st.session_state.risk_class
         rl = st.session_state.risk_level
         ts = st.session_state.timestamp
+        pid = st.session_state.patient_id
 
         # Large Header Box
         st.markdown(
             f"""<div class="result-box {rc}" style="padding:40px; margin-bottom:30px;">
-                <div style="font-family:JetBrains Mono; font-size:12px; opacity:0.7; margin-bottom:10px;">GENERATED: {ts}</div>
+                <div style="font-family:JetBrains Mono; font-size:12px; opacity:0.7; margin-bottom:10px;">GENERATED: {ts}{f" · PATIENT {html.escape(pid)}" if pid else ""}</div>
                 <div class="result-num" style="font-size:80px;">{score}</div>
                 <div class="result-label" style="font-size:18px;">CLINICAL DIAGNOSIS: {rl}</div>
             </div>""",
@@ -1235,6 +747,121 @@ with tab4:
             unsafe_allow_html=True
         )
 
+        patient_history()
+
+
+with tab4:
+    if tab4.open:
+        render_patient_report()
+
+
+# ============================================================
+# TAB 5 — BULK SCORING (COHORT TRIAGE)
+# ============================================================
+# Rows scored per chunk; the progress bar advances once per chunk.
+BULK_CHUNK = 5000
+
+def render_bulk_scoring():
+    """CSV upload, chunked cohort scoring and scored-file download."""
+    st.markdown(
+        """<div class="glass-panel">
+            <div class="panel-eyebrow">Cohort Triage</div>
+            <div class="panel-heading">Bulk Patient Scoring</div>
+        </div>""",
+        unsafe_allow_html=True,
+    )
+
+    uploaded = st.file_uploader(
+        "Patient Cohort (CSV)", type=["csv"],
+        help="One row per patient with the 13 feature columns: " + ", ".join(FEATURES) + ".",
+    )
+
+    if uploaded is not None:
+        import pandas as pd
+
+        cohort = pd.read_csv(uploaded)
+        missing = missing_features(cohort.columns)
+        bad_rows = invalid_rows(cohort) if not missing else []
+
+        if missing:
+            st.error(f"Upload rejected: missing feature columns {', '.join(missing)}.")
+        elif len(bad_rows):
+            st.error(f"Upload rejected: blank, non-numeric or infinite feature values in {describe_rows(bad_rows)} "
+                     "(row 1 is the first patient after the header).")
+        elif cohort.empty:
+            st.warning("Uploaded file contains no patient rows.")
+        elif pipeline is None:
+            st.error("System Failure: ML Models ('model.pkl', 'scaler.pkl') offline. Please verify file integrity.")
+        else:
+            _, bulk_col, _ = st.columns([1, 2, 1])
+            with bulk_col:
+                score_clicked = st.button(f"📂 SCORE {len(cohort):,} PATIENTS", use_container_width=True)
+
+            if score_clicked:
+                progress = st.progress(0.0, text="Scoring cohort...")
+                scored_parts = []
+                try:
+                    for start in range(0, len(cohort), BULK_CHUNK):
+                        scored_parts.append(score_frame(pipeline, cohort.iloc[start:start + BULK_CHUNK]))
+                        done = min(start + BULK_CHUNK, len(cohort))
+                        progress.progress(done / len(cohort), text=f"Scored {done:,} / {len(cohort):,} patients")
+                except ValueError as exc:
+                    progress.empty()
+                    st.error(f"Scoring stopped: {exc}.")
+                else:
+                    st.session_state.bulk_result = (uploaded.file_id, pd.concat(scored_parts))
+
+            bulk_result = st.session_state.bulk_result
+            if bulk_result is not None and bulk_result[0] == uploaded.file_id:
+                scored = bulk_result[1]
+                band_counts = scored["risk_band"].value_counts()
+                chip_html = "".join(
+                    f'<div class="stat-chip"><div class="stat-chip-val">{band_counts.get(label, 0):,}</div><div class="stat-chip-lbl">{label}</div></div>'
+                    for _, label, _ in RISK_BANDS
+                )
+                st.markdown(f'<div class="stat-row">{chip_html}</div>', unsafe_allow_html=True)
+                st.dataframe(scored.head(500), use_container_width=True, hide_index=True)
+                st.download_button(
+                    "⬇️ Download Scored Cohort",
+                    scored.to_csv(index=False).encode("utf-8"),
+                    file_name=f"scored_{uploaded.name}",
+                    mime="text/csv",
+                )
+
+
+with tab5:
+    if tab5.open:
+        render_bulk_scoring()
+
+
+# ── Sidebar telemetry (filled last so this run's scan and cache activity are included) ──
+with telemetry_slot.container():
+    last = st.session_state.timings or {}
+    p95 = latency.percentile(95)
+    cache = predictions.stats() if predictions is not None else {"hits": 0, "misses": 0, "evictions": 0, "hit_rate": 0.0}
+    batches = batcher.stats() if batcher is not None else {"batches": 0, "mean_rows": 0.0, "max_rows": 0}
+    def fmt(v): return "—" if v is None else f"{v:.2f} ms"
+    audit_stats = audit.stats() if audit is not None else None
+    audit_line = "off" if audit_stats is None else (
+        f"{audit_stats['written']:,} logged · {audit_stats['pending']} pending"
+        + (f" · {audit_stats['errors']:,} failed" if audit_stats["errors"] else "")
+    )
+    st.markdown(
+        f"""<div class="sb-info" style="margin-top:12px;">
+            <span>Validate:</span> {fmt(last.get("validate"))}<br>
+            <span>Predict:</span> {fmt(last.get("predict"))}<br>
+            <span>Render:</span> {fmt(last.get("render"))}<br>
+            <span>p95 Total:</span> {fmt(p95)} / {LATENCY_BUDGET_MS:.0f} ms budget<br>
+            <span>Cache:</span> {cache["hits"]:,} hit · {cache["misses"]:,} miss · {cache["evictions"]:,} evict
+            ({cache["hit_rate"]:.0%})<br>
+            <span>Batches:</span> {batches["batches"]:,} · mean {batches["mean_rows"]:.1f} rows · max {batches["max_rows"]}<br>
+            <span>Audit Log:</span> {audit_line}
+        </div>""",
+        unsafe_allow_html=True,
+    )
+    if latency.over_budget():
+        st.warning(f"p95 scan latency {p95:.1f} ms exceeds the {LATENCY_BUDGET_MS:.0f} ms budget.")
+
 # ============================================================
 # 8. APPLICATION FOOTER
 # ============================================================
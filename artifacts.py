@@ -0,0 +1,185 @@
+# ============================================================
+# 🫀 Heart Health Intelligence Platform — Model Artifacts
+# Flat, memory-mapped storage for the fitted KNN reference set
+# ============================================================
+"""
+Usage:
+    python artifacts.py model.pkl scaler.pkl artifacts/ [--raw train_rows.csv]
+
+Exports the fitted model and scaler as plain `.npy` arrays plus a JSON
+manifest, with the scaler folded into the reference matrix (see
+pipeline.KNNPipeline):
+
+    manifest.json   format version, shapes, hyperparameters, checksums
+    reference.npy   reference matrix in query space, r + mean/scale (n × 13, float64)
+    sq_norms.npy    squared row norms of the reference matrix
+    labels.npy      class index of each reference row
+    classes.npy     class values
+    inv_scale.npy   1 / StandardScaler scale
+    raw_reference.npy  optional: the unscaled training rows (n × 13, float64)
+
+`raw_reference.npy` is written when the training rows are passed in (train.py
+always does; the command line takes `--raw`, a CSV of the 13 feature columns
+in the order the model was fit on). Scaling them back from the reference
+matrix is only exact when the scaler is the one the model was fit with, so
+the neighbor explanation reads patients from this file instead.
+
+The command line also writes the cohort summaries population.json and,
+given `--raw`, cohort.json (see population.py and cohort.py).
+
+Uniform or distance-weighted models with any Minkowski distance (p = 1,
+2, ...) are supported; the manifest records `weights` and `p`.
+
+`open_artifacts` memory-maps the arrays read-only, so opening costs the
+same for any reference size and every app worker process shares the same
+pages through the OS page cache.
+"""
+
+import argparse
+import hashlib
+import json
+import pickle
+import time
+from pathlib import Path
+
+import numpy as np
+
+from neighbors import BlockedIndex, IndexedKNN, MinkowskiIndex, minkowski_p
+from pipeline import KNNPipeline
+
+# v2: scaler folded into the reference matrix (v1 stored mean/scale separately).
+# v3: `weights` and Minkowski `p` are honored; v2 is read as uniform Euclidean.
+FORMAT_VERSION = 3
+READABLE_VERSIONS = (2, 3)
+ARRAYS = ["reference", "sq_norms", "labels", "classes", "inv_scale"]
+# Checksummed like ARRAYS when the manifest lists them.
+OPTIONAL_ARRAYS = ["raw_reference"]
+
+
+def _sha256(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def export_artifacts(model, scaler, out_dir, raw=None):
+    """Writes a fitted KNeighborsClassifier and StandardScaler as a flat artifact directory.
+
+    `raw` is the unscaled training rows in fit order; when given they are
+    stored as raw_reference.npy, after checking the scaler maps them onto
+    the model's reference rows.
+    """
+    p = minkowski_p(model)
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+
+    inv_scale = 1.0 / np.asarray(scaler.scale_, dtype=np.float64)
+    reference = np.ascontiguousarray(model._fit_X + scaler.mean_ * inv_scale, dtype=np.float64)
+    arrays = {
+        "reference": reference,
+        "sq_norms": np.einsum("ij,ij->i", reference, reference),
+        "labels": np.asarray(model._y, dtype=np.int64),
+        "classes": np.asarray(model.classes_),
+        "inv_scale": inv_scale,
+    }
+    if raw is not None:
+        raw = np.ascontiguousarray(raw, dtype=np.float64)
+        if raw.shape != reference.shape:
+            raise ValueError(f"raw rows have shape {raw.shape}, the model's reference set {reference.shape}")
+        if not np.allclose(raw * inv_scale, reference, rtol=1e-9, atol=1e-6):
+            raise ValueError("raw rows do not match the model's reference set (other rows, order or scaler)")
+        arrays["raw_reference"] = raw
+    for name, array in arrays.items():
+        np.save(out_dir / f"{name}.npy", array)
+
+    manifest = {
+        "format_version": FORMAT_VERSION,
+        "created": time.strftime("%Y-%m-%d %H:%M:%S"),
+        "n_samples": int(reference.shape[0]),
+        "n_features": int(reference.shape[1]),
+        "feature_names": [str(f) for f in getattr(scaler, "feature_names_in_", [])],
+        "n_neighbors": int(model.n_neighbors),
+        "metric": "euclidean" if p == 2 else "minkowski",
+        "p": p,
+        "reference_space": "prescaled",
+        "weights": model.weights,
+        "sha256": {name: _sha256(out_dir / f"{name}.npy") for name in arrays},
+    }
+    (out_dir / "manifest.json").write_text(json.dumps(manifest, indent=2) + "\n")
+    return manifest
+
+
+def read_manifest(artifact_dir):
+    manifest = json.loads((Path(artifact_dir) / "manifest.json").read_text())
+    if manifest["format_version"] not in READABLE_VERSIONS:
+        raise ValueError(f"unsupported artifact format version {manifest['format_version']}")
+    return manifest
+
+
+def verify_artifacts(artifact_dir):
+    """Checks every array against the manifest checksums; returns the manifest."""
+    artifact_dir = Path(artifact_dir)
+    manifest = read_manifest(artifact_dir)
+    for name in ARRAYS + [name for name in OPTIONAL_ARRAYS if name in manifest["sha256"]]:
+        if _sha256(artifact_dir / f"{name}.npy") != manifest["sha256"][name]:
+            raise ValueError(f"checksum mismatch for {name}.npy")
+    return manifest
+
+
+def open_artifacts(artifact_dir, verify=False):
+    """Memory-maps an exported artifact directory as a KNNPipeline.
+
+    `verify=True` checks every array against the manifest checksums, which
+    reads the files in full.
+    """
+    artifact_dir = Path(artifact_dir)
+    manifest = verify_artifacts(artifact_dir) if verify else read_manifest(artifact_dir)
+
+    arrays = {name: np.load(artifact_dir / f"{name}.npy", mmap_mode="r") for name in ARRAYS}
+    p = manifest.get("p", 2.0)
+    if p == 2:
+        index = BlockedIndex(arrays["reference"], sq_norms=arrays["sq_norms"])
+    else:
+        index = MinkowskiIndex(arrays["reference"], p)
+    knn = IndexedKNN(index, arrays["labels"], np.array(arrays["classes"]), manifest["n_neighbors"],
+                     manifest.get("weights", "uniform"))
+    raw = None
+    if "raw_reference" in manifest["sha256"]:
+        raw = np.load(artifact_dir / "raw_reference.npy", mmap_mode="r")
+    return KNNPipeline(knn, np.array(arrays["inv_scale"]), raw_reference=raw)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Export a pickled KNN model and scaler as one memory-mappable pipeline.")
+    parser.add_argument("model", help="pickled KNeighborsClassifier")
+    parser.add_argument("scaler", help="pickled StandardScaler")
+    parser.add_argument("output", help="artifact directory to write")
+    parser.add_argument("--raw", help="CSV of the unscaled training rows (13 feature columns, fit order)")
+    args = parser.parse_args(argv)
+
+    with open(args.model, "rb") as f:
+        model = pickle.load(f)
+    with open(args.scaler, "rb") as f:
+        scaler = pickle.load(f)
+    raw = None
+    if args.raw:
+        import pandas as pd
+
+        from inference import FEATURES
+
+        raw = pd.read_csv(args.raw)[FEATURES].to_numpy(dtype=np.float64)
+    manifest = export_artifacts(model, scaler, args.output, raw)
+    print(f"wrote {args.output} ({manifest['n_samples']:,} reference rows, format v{FORMAT_VERSION})")
+
+    from cohort import write_cohort
+    from population import write_population
+
+    write_population(args.output)
+    if raw is not None:
+        write_cohort(args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,179 @@
+# ============================================================
+# 🫀 Heart Health Intelligence Platform — Prediction Audit Log
+# Append-only SQLite store of every diagnostic scan
+# ============================================================
+"""
+Every scan is appended to a SQLite database in WAL mode: the patient ID,
+the 13 inputs, severity, risk band, model version and latency.
+`AuditLog.record` only puts the row on a queue; a background thread writes
+whatever has queued up in one transaction, so the scan never waits on the
+disk and bursts of scans share a commit. WAL lets readers (reports, exports) query the file
+while the writer appends.
+
+Visits are indexed on (patient_id, ts), so `history` reads one page of a
+patient's visits straight from the index, however long their record is.
+
+    sqlite3 audit.db "SELECT ts, severity, risk_band, model_version FROM predictions ORDER BY id DESC LIMIT 10"
+"""
+
+import os
+import queue
+import sqlite3
+import threading
+import time
+
+from inference import FEATURES
+
+AUDIT_DB = os.environ.get("HHI_AUDIT_DB", "audit.db")
+# Rows written per transaction at most; a backlog larger than this is split.
+AUDIT_MAX_BATCH = 4096
+# How long a report waits for queued scans to commit before reading without them.
+AUDIT_FLUSH_TIMEOUT_S = float(os.environ.get("HHI_AUDIT_FLUSH_TIMEOUT_S", "2"))
+
+# Columns returned by `history`: the severity trend and the biomarkers charted with it.
+HISTORY_COLUMNS = ["ts", "severity", "risk_band", "chol", "trestbps", "thalach", "oldpeak", "model_version"]
+
+# v2: patient_id column and the (patient_id, ts) index.
+SCHEMA_VERSION = 2
+COLUMNS = ["ts", "patient_id", *FEATURES, "severity", "risk_band", "model_version", "latency_ms"]
+SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS predictions (
+    id INTEGER PRIMARY KEY,
+    ts REAL NOT NULL,
+    {", ".join(f"{name} REAL NOT NULL" for name in FEATURES)},
+    severity REAL NOT NULL,
+    risk_band TEXT NOT NULL,
+    model_version TEXT,
+    latency_ms REAL,
+    patient_id TEXT
+)
+"""
+INDEX = "CREATE INDEX IF NOT EXISTS predictions_patient_ts ON predictions (patient_id, ts)"
+INSERT = f"INSERT INTO predictions ({', '.join(COLUMNS)}) VALUES ({', '.join('?' * len(COLUMNS))})"
+VISIT_COUNT = "SELECT COUNT(*) FROM predictions WHERE patient_id = ?"
+HISTORY = (f"SELECT {', '.join(HISTORY_COLUMNS)} FROM predictions WHERE patient_id = ? "
+           "ORDER BY ts DESC LIMIT ? OFFSET ?")
+
+
+def connect(path):
+    """Opens the audit database in WAL mode, creating or upgrading the schema."""
+    conn = sqlite3.connect(path)
+    conn.execute("PRAGMA journal_mode=WAL")
+    # With WAL, NORMAL syncs at checkpoints: a crash cannot corrupt the log,
+    # though an OS crash may lose the last few commits.
+    conn.execute("PRAGMA synchronous=NORMAL")
+    version = conn.execute("PRAGMA user_version").fetchone()[0]
+    conn.execute(SCHEMA)
+    if version == 1:
+        conn.execute("ALTER TABLE predictions ADD COLUMN patient_id TEXT")
+    conn.execute(INDEX)
+    conn.execute(f"PRAGMA user_version={SCHEMA_VERSION}")
+    conn.commit()
+    return conn
+
+
+class AuditLog:
+    """Buffers prediction records and appends them from a background thread.
+
+    `record` returns immediately. `flush` blocks until everything recorded
+    so far is committed (or `timeout` passes); `close` flushes and stops the
+    writer. A failing database never stops the writer: rows it cannot commit
+    are counted in `errors` and flushes still return.
+    """
+
+    def __init__(self, path=AUDIT_DB, max_batch=AUDIT_MAX_BATCH):
+        self.path = path
+        self.max_batch = max_batch
+        self.written = 0
+        self.commits = 0
+        self.errors = 0
+        self._queue = queue.SimpleQueue()
+        self._readers = threading.local()
+        connect(path).close()  # fail here, not in the writer thread, if the path is unusable
+        self._writer = threading.Thread(target=self._run, name="audit-writer", daemon=True)
+        self._writer.start()
+
+    def record(self, features, severity, risk_band, model_version=None, latency_ms=None, patient_id=None):
+        """Queues one scan: 13 raw inputs, its severity and risk band."""
+        self._queue.put((time.time(), patient_id or None, *(float(v) for v in features), float(severity),
+                         risk_band, model_version, latency_ms))
+
+    def flush(self, timeout=None):
+        """Waits for everything recorded so far to be written; False if `timeout` passed first."""
+        if not self._writer.is_alive():
+            return False
+        done = threading.Event()
+        self._queue.put(done)
+        return done.wait(timeout)
+
+    def close(self):
+        self.flush()
+        self._queue.put(None)
+        self._writer.join()
+
+    def pending(self):
+        return self._queue.qsize()
+
+    def _reader(self):
+        # One read-only connection per thread; sqlite3 connections are not shareable.
+        conn = getattr(self._readers, "conn", None)
+        if conn is None:
+            conn = self._readers.conn = sqlite3.connect(f"file:{self.path}?mode=ro", uri=True)
+        return conn
+
+    def visit_count(self, patient_id):
+        """Number of logged scans for one patient (an index-only count)."""
+        return self._reader().execute(VISIT_COUNT, (patient_id,)).fetchone()[0]
+
+    def history(self, patient_id, limit=50, offset=0):
+        """One page of a patient's visits, newest first, as a dict of column lists.
+
+        Only `limit` rows are read, located through the (patient_id, ts)
+        index. Call `flush` first to include scans recorded moments ago.
+        """
+        rows = self._reader().execute(HISTORY, (patient_id, limit, offset)).fetchall()
+        return {name: [row[i] for row in rows] for i, name in enumerate(HISTORY_COLUMNS)}
+
+    def stats(self):
+        return {"written": self.written, "commits": self.commits, "pending": self.pending(), "errors": self.errors}
+
+    def _run(self):
+        try:
+            conn = connect(self.path)
+        except Exception:
+            conn = None  # keep draining the queue so flushes return; every row counts as an error
+        while True:
+            item = self._queue.get()
+            rows, markers = [], []
+            while True:
+                if item is None:
+                    self._write(conn, rows, markers)
+                    if conn is not None:
+                        conn.close()
+                    return
+                if isinstance(item, threading.Event):
+                    markers.append(item)
+                else:
+                    rows.append(item)
+                if len(rows) >= self.max_batch:
+                    break
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+            self._write(conn, rows, markers)
+
+    def _write(self, conn, rows, markers):
+        try:
+            if rows:
+                if conn is None:
+                    raise sqlite3.OperationalError(f"cannot open {self.path}")
+                with conn:
+                    conn.executemany(INSERT, rows)
+                self.written += len(rows)
+                self.commits += 1
+        except Exception:
+            self.errors += len(rows)  # e.g. disk full; scans keep working without the log
+        finally:
+            for marker in markers:
+                marker.set()
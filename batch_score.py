@@ -0,0 +1,178 @@
+# ============================================================
+# 🫀 Heart Health Intelligence Platform — Batch Scoring CLI
+# Scores CSV/Parquet cohorts in fixed-size chunks
+# ============================================================
+"""
+Usage:
+    python batch_score.py cohort.csv scored.csv
+    python batch_score.py cohort.parquet scored.parquet --chunk-size 100000 --workers 4
+
+The input must contain the 13 feature columns (age … thal); any other
+columns, such as patient identifiers, are passed through unchanged. Each
+output row gains `severity` and `risk_band`. Only `workers × 2` chunks are
+ever held in memory, so file size does not bound the run.
+
+Output is written to a hidden `.partial` file beside the destination and
+renamed into place once every row is scored; a failed run leaves no output.
+"""
+
+import argparse
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import pandas as pd
+
+from inference import (
+    FEATURES, add_model_arguments, init_worker, load_artifacts, missing_features, model_source, score_frame,
+    worker_pipeline,
+)
+
+DEFAULT_CHUNK_SIZE = 50_000
+
+def _is_parquet(path):
+    return Path(path).suffix.lower() in {".parquet", ".pq"}
+
+
+def read_chunks(path, chunk_size):
+    """Yields DataFrames of at most `chunk_size` rows from a CSV or Parquet file.
+
+    Each chunk is indexed by its rows' 0-based position in the file, so
+    errors can name the offending rows.
+    """
+    if _is_parquet(path):
+        import pyarrow.parquet as pq
+
+        parquet = pq.ParquetFile(path)
+        missing = missing_features(parquet.schema_arrow.names)
+        if missing:
+            raise ValueError(f"{path}: missing feature columns: {', '.join(missing)}")
+        start = 0
+        for batch in parquet.iter_batches(batch_size=chunk_size):
+            frame = batch.to_pandas()
+            frame.index = pd.RangeIndex(start, start + len(frame))
+            start += len(frame)
+            yield frame
+    else:
+        for frame in pd.read_csv(path, chunksize=chunk_size):
+            yield frame
+
+
+class ChunkWriter:
+    """Appends scored chunks to a CSV or Parquet file as they arrive.
+
+    Rows go to a temporary file that `close` renames to `path`; `abort`
+    deletes it instead. Parquet needs one schema for the whole file, so the
+    features and severity are always float64, and later chunks are cast to
+    the first chunk's schema (columns that are empty in it are stored as
+    strings).
+    """
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.tmp_path = self.path.with_name(f".{self.path.name}.partial")
+        self.rows = 0
+        self._parquet_writer = None
+        self._schema = None
+
+    def write(self, frame):
+        if _is_parquet(self.path):
+            self._write_parquet(frame)
+        else:
+            frame.to_csv(self.tmp_path, mode="a" if self.rows else "w", header=not self.rows, index=False)
+        self.rows += len(frame)
+
+    def _write_parquet(self, frame):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        frame = frame.astype({name: "float64" for name in FEATURES + ["severity"] if name in frame.columns})
+        table = pa.Table.from_pandas(frame, preserve_index=False)
+        if self._parquet_writer is None:
+            # A pass-through column with no values yet has no real type (null, or float64 from CSV NaNs).
+            empty = {name for name in table.column_names
+                     if name not in FEATURES and table.column(name).null_count == len(table)}
+            self._schema = pa.schema([field.with_type(pa.string()) if field.name in empty else field
+                                      for field in table.schema], metadata=table.schema.metadata)
+            self._parquet_writer = pq.ParquetWriter(self.tmp_path, self._schema)
+        try:
+            table = table.cast(self._schema)
+        except (pa.ArrowInvalid, pa.ArrowNotImplementedError, ValueError) as exc:
+            raise ValueError(f"rows {self.rows + 1:,}–{self.rows + len(frame):,} do not fit the column types "
+                             f"of the rows before them ({exc})") from exc
+        self._parquet_writer.write_table(table)
+
+    def close(self):
+        """Finishes the file and moves it to `path`."""
+        if self._parquet_writer is not None:
+            self._parquet_writer.close()
+        if self.tmp_path.exists():
+            os.replace(self.tmp_path, self.path)
+
+    def abort(self):
+        """Discards everything written so far."""
+        if self._parquet_writer is not None:
+            self._parquet_writer.close()
+        self.tmp_path.unlink(missing_ok=True)
+
+
+def _score_in_worker(frame):
+    return score_frame(worker_pipeline(), frame)
+
+
+def score_chunks(chunks, source, workers=1):
+    """Yields scored chunks in input order, optionally across a process pool.
+
+    `source` is the `load_artifacts` argument tuple (see inference.model_source).
+    With a pool, at most `workers × 2` chunks are in flight at once.
+    """
+    if workers <= 1:
+        pipeline = load_artifacts(*source)
+        for frame in chunks:
+            yield score_frame(pipeline, frame)
+        return
+
+    with ProcessPoolExecutor(workers, initializer=init_worker, initargs=source) as pool:
+        pending = deque()
+        for frame in chunks:
+            pending.append(pool.submit(_score_in_worker, frame))
+            if len(pending) >= workers * 2:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Score a patient cohort with the heart disease KNN model.")
+    parser.add_argument("input", help="CSV or Parquet file with the 13 feature columns")
+    parser.add_argument("output", help="destination CSV or Parquet file")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE, help="rows per chunk")
+    parser.add_argument("--workers", type=int, default=1, help="scoring processes (default: 1)")
+    add_model_arguments(parser)
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    rows = 0
+    writer = ChunkWriter(args.output)
+    try:
+        for scored in score_chunks(read_chunks(args.input, args.chunk_size), model_source(args), args.workers):
+            writer.write(scored)
+            rows += len(scored)
+            print(f"\rscored {rows:,} rows", end="", file=sys.stderr)
+    except ValueError as exc:
+        writer.abort()
+        parser.exit(2, f"\nerror: {exc}; no output written\n")
+    except BaseException:
+        writer.abort()
+        raise
+    writer.close()
+
+    elapsed = time.perf_counter() - start
+    print(f"\nwrote {args.output} ({rows:,} rows in {elapsed:.1f}s)", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+# ============================================================
+# 🫀 Heart Health Intelligence Platform — Prediction Batching
+# Coalesces concurrent single-patient predictions into one call
+# ============================================================
+
+import os
+import queue
+import threading
+import time
+from collections import Counter
+from concurrent.futures import Future
+
+import numpy as np
+
+from pipeline import check_rows
+
+# How long the first pending request waits for others to join its batch,
+# and the row count that flushes a batch early. With no wait, a batch is
+# whatever queued up while the previous one was predicting, so a lone scan
+# adds no latency; benchmarks/bench_batching.py compares wait settings.
+BATCH_MAX_WAIT_MS = float(os.environ.get("HHI_BATCH_MAX_WAIT_MS", "0"))
+BATCH_MAX_SIZE = int(os.environ.get("HHI_BATCH_MAX_SIZE", "64"))
+
+
+class BatchScheduler:
+    """Runs predictions from many threads as one matrix per batch.
+
+    Exposes the same `predict` / `predict_trusted` interface as the
+    pipeline it wraps. Callers block until their rows are scored; a
+    background thread collects requests for up to `max_wait_ms` or
+    `max_batch` rows and predicts them together, so concurrent sessions
+    pay the per-call overhead once per batch instead of once per scan.
+    """
+
+    def __init__(self, pipeline, max_batch=BATCH_MAX_SIZE, max_wait_ms=BATCH_MAX_WAIT_MS):
+        self.pipeline = pipeline
+        self.max_batch = max_batch
+        self.max_wait = max_wait_ms / 1000.0
+        self.batch_sizes = Counter()  # rows per batch -> number of batches
+        self._requests = queue.SimpleQueue()
+        self._lock = threading.Lock()
+        self._closed = False
+        self._closing = threading.Lock()
+        self._worker = threading.Thread(target=self._run, name="prediction-batcher", daemon=True)
+        self._worker.start()
+
+    def predict_trusted(self, X):
+        future = Future()
+        with self._closing:
+            closed = self._closed
+            if not closed:
+                self._requests.put((X, future))
+        if closed:
+            return self.pipeline.predict_trusted(X)
+        return future.result()
+
+    def predict(self, X):
+        return self.predict_trusted(check_rows(X))
+
+    def close(self):
+        """Stops the batching thread once every request queued so far is answered.
+
+        Later calls predict directly on the wrapped pipeline, so callers still
+        holding this scheduler keep working.
+        """
+        with self._closing:
+            if not self._closed:
+                self._closed = True
+                self._requests.put(None)
+
+    def _run(self):
+        while True:
+            request = self._requests.get()
+            if request is None:
+                return
+            batch = [request]
+            rows = len(request[0])
+            deadline = time.perf_counter() + self.max_wait
+            while rows < self.max_batch:
+                # Past the deadline, still take whatever is already queued.
+                timeout = deadline - time.perf_counter()
+                try:
+                    request = self._requests.get(timeout=timeout) if timeout > 0 else self._requests.get_nowait()
+                except queue.Empty:
+                    break
+                if request is None:
+                    self._predict(batch, rows)
+                    return
+                batch.append(request)
+                rows += len(request[0])
+            self._predict(batch, rows)
+
+    def _predict(self, batch, rows):
+        with self._lock:
+            self.batch_sizes[rows] += 1
+        try:
+            preds = self.pipeline.predict_trusted(np.concatenate([X for X, _ in batch]))
+        except Exception as exc:
+            for _, future in batch:
+                future.set_exception(exc)
+            return
+        start = 0
+        for X, future in batch:
+            future.set_result(preds[start:start + len(X)])
+            start += len(X)
+
+    def stats(self):
+        """Returns batch counters and the batch-size distribution in power-of-two buckets."""
+        with self._lock:
+            sizes = dict(self.batch_sizes)
+        batches = sum(sizes.values())
+        rows = sum(size * count for size, count in sizes.items())
+        buckets = Counter()
+        for size, count in sizes.items():
+            upper = 1 << max(size - 1, 0).bit_length()
+            buckets[f"≤{upper}"] += count
+        return {
+            "batches": batches, "rows": rows,
+            "mean_rows": rows / batches if batches else 0.0,
+            "max_rows": max(sizes, default=0),
+            "distribution": dict(sorted(buckets.items(), key=lambda item: int(item[0][1:]))),
+            "max_batch": self.max_batch, "max_wait_ms": self.max_wait * 1000.0,
+        }
@@ -0,0 +1,51 @@
+# ============================================================
+# Benchmark: IVF approximate search — recall@k vs latency per nprobe
+# Usage: python benchmarks/bench_ann.py [--rows 300000] [--nprobe 1 2 4 8 16 32 64]
+# ============================================================
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from bench_neighbors import K, single_query_ms, synthetic_cohort, throughput  # noqa: E402
+from neighbors import IndexedKNN, IVFIndex, build_index, recall_at_k  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=300_000)
+    parser.add_argument("--nprobe", type=int, nargs="+", default=[1, 2, 4, 8, 16, 32, 64])
+    parser.add_argument("--queries", type=int, default=500)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    X, y = synthetic_cohort(args.rows, rng)
+    queries, _ = synthetic_cohort(args.queries, rng)
+    classes = np.array([0, 1])
+
+    exact = IndexedKNN(build_index(X), y, classes, K)
+    start = time.perf_counter()
+    ivf = IVFIndex.build(X)
+    print(f"{args.rows:,} rows, {len(ivf.centroids)} clusters, IVF build {time.perf_counter() - start:.1f}s")
+
+    exact_pred = exact.predict(queries)
+    print(f"{'backend':<14} {'recall@' + str(K):>9} {'agree':>7} {'1-row ms':>9} {'rows/s':>9}")
+    print(f"{'exact':<14} {1.0:>9.3f} {1.0:>7.3f} {single_query_ms(exact.predict, queries[:200]):>9.3f} "
+          f"{throughput(exact.predict, queries):>9,.0f}")
+    for nprobe in args.nprobe:
+        ivf.nprobe = nprobe
+        knn = exact.with_index(ivf)
+        recall = recall_at_k(ivf, exact.index, queries, K)
+        agree = float((knn.predict(queries) == exact_pred).mean())
+        print(f"{'ivf nprobe=' + str(nprobe):<14} {recall:>9.3f} {agree:>7.3f} "
+              f"{single_query_ms(knn.predict, queries[:200]):>9.3f} {throughput(knn.predict, queries):>9,.0f}")
+
+
+if __name__ == "__main__":
+    main()
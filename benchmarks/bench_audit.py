@@ -0,0 +1,94 @@
+# ============================================================
+# Benchmark: audit log insert throughput and request-thread cost
+# Usage: python benchmarks/bench_audit.py [--threads 8] [--seconds 5]
+# ============================================================
+"""
+Client threads record scans as fast as they can for a fixed time, either
+through audit.AuditLog (queued, written in batches by a background thread)
+or with a synchronous INSERT + COMMIT per scan on a per-thread connection,
+the straightforward alternative. Reports sustained rows committed per
+second and how long the recording call blocks the scanning thread.
+"""
+
+import argparse
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+import numpy as np
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from audit import INSERT, AuditLog, connect  # noqa: E402
+
+FEATURES = [45.0, 1, 0, 120, 200, 0, 0, 150, 0, 1.0, 0, 0, 1]
+
+
+def run_clients(threads, seconds, record):
+    stop = threading.Event()
+    samples = [[] for _ in range(threads)]
+
+    def client(out):
+        while not stop.is_set():
+            start = time.perf_counter()
+            record()
+            out.append(time.perf_counter() - start)
+
+    workers = [threading.Thread(target=client, args=(out,)) for out in samples]
+    for w in workers:
+        w.start()
+    time.sleep(seconds)
+    stop.set()
+    for w in workers:
+        w.join()
+    return np.concatenate([np.array(s) for s in samples]) * 1e6
+
+
+def buffered(path, threads, seconds):
+    log = AuditLog(path)
+    start = time.perf_counter()
+    lat = run_clients(threads, seconds, lambda: log.record(FEATURES, 1.0, "Moderate Risk Profile", "v1", 0.5, "P-0001"))
+    log.close()  # rows still queued when the clients stop count towards the elapsed time
+    return lat, log.written, time.perf_counter() - start, log.written / max(log.commits, 1)
+
+
+def synchronous(path, threads, seconds):
+    connect(path).close()
+    local = threading.local()
+    row = (0.0, "P-0001", *FEATURES, 1.0, "Moderate Risk Profile", "v1", 0.5)
+
+    def record():
+        conn = getattr(local, "conn", None)
+        if conn is None:
+            conn = local.conn = sqlite3.connect(path, timeout=30)
+            conn.execute("PRAGMA synchronous=NORMAL")
+        with conn:
+            conn.execute(INSERT, (time.time(), *row[1:]))
+
+    start = time.perf_counter()
+    lat = run_clients(threads, seconds, record)
+    elapsed = time.perf_counter() - start
+    return lat, len(lat), elapsed, 1.0
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--seconds", type=float, default=5.0)
+    args = parser.parse_args()
+
+    print(f"{args.threads} threads recording for {args.seconds:g}s")
+    print(f"  {'mode':<28} {'rows/s':>9} {'rows/commit':>12} {'record() p50':>13} {'p99':>10} {'max':>10}")
+    for label, fn in (("INSERT + COMMIT per scan", synchronous), ("AuditLog (background writer)", buffered)):
+        with tempfile.TemporaryDirectory() as tmp:
+            lat, rows, elapsed, per_commit = fn(str(Path(tmp) / "audit.db"), args.threads, args.seconds)
+        print(f"  {label:<28} {rows / elapsed:>9,.0f} {per_commit:>12,.1f} {np.median(lat):>10.1f} µs "
+              f"{np.percentile(lat, 99):>7.1f} µs {lat.max() / 1000:>7.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+# ============================================================
+# Benchmark: concurrent single-patient predictions, direct vs batched
+# Usage: python benchmarks/bench_batching.py [--threads 32] [--calls 200]
+# ============================================================
+"""
+`--threads` threads each make `--calls` one-row predictions, as concurrent
+Streamlit sessions do when scans coincide. Compares calling the pipeline
+directly with routing through batching.BatchScheduler at a few max-wait
+settings, and reports throughput, per-call latency and batch sizes.
+"""
+
+import argparse
+import sys
+import threading
+import time
+from pathlib import Path
+
+import numpy as np
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from batching import BatchScheduler  # noqa: E402
+from inference import load_artifacts  # noqa: E402
+
+ROW = np.array([[45.0, 1, 0, 120, 200, 0, 0, 150, 0, 1.0, 0, 0, 1]])
+
+
+def per_call_us(fn, calls=2000):
+    start = time.perf_counter()
+    for _ in range(calls):
+        fn()
+    return (time.perf_counter() - start) / calls * 1e6
+
+
+def hammer(predictor, threads, calls):
+    latencies = [[] for _ in range(threads)]
+    barrier = threading.Barrier(threads + 1)
+
+    def worker(out):
+        barrier.wait()
+        for _ in range(calls):
+            start = time.perf_counter()
+            predictor.predict_trusted(ROW)
+            out.append(time.perf_counter() - start)
+
+    pool = [threading.Thread(target=worker, args=(latencies[i],)) for i in range(threads)]
+    for t in pool:
+        t.start()
+    barrier.wait()
+    start = time.perf_counter()
+    for t in pool:
+        t.join()
+    elapsed = time.perf_counter() - start
+    ms = np.concatenate([np.array(lat) for lat in latencies]) * 1000.0
+    return threads * calls / elapsed, ms
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--threads", type=int, default=32)
+    parser.add_argument("--calls", type=int, default=200)
+    args = parser.parse_args()
+
+    pipeline = load_artifacts(artifact_dir=ROOT / "artifacts")
+    for rows in (1, 64):
+        X = np.repeat(ROW, rows, axis=0)
+        print(f"one predict call, {rows:>2} row(s): {per_call_us(lambda: pipeline.predict_trusted(X)):7.1f} µs")
+
+    print(f"\n{args.threads} threads × {args.calls} one-row predictions")
+    cases = [("direct", pipeline)] + [
+        (f"batched, wait {wait:g} ms", BatchScheduler(pipeline, max_wait_ms=wait)) for wait in (0.0, 1.0, 2.0, 5.0)
+    ]
+    for label, predictor in cases:
+        throughput, ms = hammer(predictor, args.threads, args.calls)
+        line = (f"  {label:<20} {throughput:9,.0f} pred/s   p50 {np.percentile(ms, 50):6.2f} ms   "
+                f"p99 {np.percentile(ms, 99):6.2f} ms")
+        if isinstance(predictor, BatchScheduler):
+            stats = predictor.stats()
+            line += f"   mean batch {stats['mean_rows']:.1f}  {stats['distribution']}"
+        print(line)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+# ============================================================
+# Benchmark: cohort quantile summary, one groupby pass vs per-group loop
+# Usage: python benchmarks/bench_cohort.py [--rows 1000000]
+# ============================================================
+"""
+Resamples the shipped reference cohort (artifacts/) up to `--rows`
+patients and builds the cohort.json summary two ways:
+cohort.summarize_cohort, one groupby-quantile over the cohort stacked per
+grouping level, and a loop that filters the frame and takes quantiles
+once per group. Reports wall time and whether both agree.
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from cohort import QUANTILES, age_band, reference_frame, summarize_cohort  # noqa: E402
+from inference import FEATURES  # noqa: E402
+
+
+def per_group(frame):
+    groups = {"overall": frame}
+    for target in sorted(frame["target"].unique()):
+        in_class = frame[frame["target"] == target]
+        groups[str(target)] = in_class
+        bands = in_class["age"].map(age_band)
+        for band in bands.unique():
+            for sex in in_class["sex"].unique():
+                groups[f"{target}|{band}|{int(sex)}"] = in_class[(bands == band) & (in_class["sex"] == sex)]
+    return {key: {name: rows[name].quantile(list(QUANTILES)).round(4).tolist() for name in FEATURES}
+            for key, rows in groups.items()}
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    reference = reference_frame(ROOT / "artifacts")
+    rng = np.random.default_rng(0)
+    frame = reference.iloc[rng.integers(len(reference), size=args.rows)].reset_index(drop=True)
+    frame[["age", "chol", "trestbps", "thalach"]] += rng.normal(0.0, 1.0, (args.rows, 4))
+    print(f"cohort: {args.rows:,} rows")
+
+    start = time.perf_counter()
+    summary = summarize_cohort(frame)
+    single = time.perf_counter() - start
+    print(f"  one groupby pass  {single * 1000:9.1f} ms  ({len(summary['strata'])} strata)")
+
+    start = time.perf_counter()
+    looped = per_group(frame)
+    loop = time.perf_counter() - start
+    print(f"  per-group loop    {loop * 1000:9.1f} ms  ({loop / single:.1f}x slower)")
+
+    groups = {"overall": summary["overall"], **summary["classes"], **summary["strata"]}
+    same = groups.keys() == looped.keys() and all(
+        np.allclose(groups[key][name], looped[key][name]) for key in looped for name in FEATURES)
+    print(f"  summaries {'agree' if same else 'DIFFER'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+# ============================================================
+# Benchmark: NumPy inference engine vs the scikit-learn path
+# Usage: python benchmarks/bench_engines.py [--repeats 5]
+# ============================================================
+"""
+Cold start is measured in a fresh interpreter per run: importing
+`inference`, loading the engine and making the first prediction, and
+whether scikit-learn ended up imported. Warm latency is the median of
+repeated one-row and 1,000-row predictions in this process.
+"""
+
+import argparse
+import json
+import subprocess
+import sys
+import time
+import warnings
+from pathlib import Path
+
+import numpy as np
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from inference import load_artifacts  # noqa: E402
+
+warnings.filterwarnings("ignore")
+
+PROBE = """
+import json, sys, time, warnings
+warnings.filterwarnings("ignore")
+start = time.perf_counter()
+sys.path.insert(0, {root!r})
+import numpy as np
+from inference import load_artifacts
+imported = time.perf_counter()
+pipeline = load_artifacts({model!r}, {scaler!r}, artifact_dir={artifacts!r}, engine={engine!r})
+loaded = time.perf_counter()
+pipeline.predict(np.array([[45.0, 1, 0, 120, 200, 0, 0, 150, 0, 1.0, 0, 0, 1]]))
+done = time.perf_counter()
+print(json.dumps({{
+    "import_ms": (imported - start) * 1000, "load_ms": (loaded - imported) * 1000,
+    "first_ms": (done - start) * 1000, "sklearn": "sklearn" in sys.modules,
+}}))
+"""
+
+
+def cold_start(engine):
+    code = PROBE.format(root=str(ROOT), model=str(ROOT / "model.pkl"), scaler=str(ROOT / "scaler.pkl"),
+                        artifacts=str(ROOT / "artifacts"), engine=engine)
+    out = subprocess.run([sys.executable, "-c", code], check=True, capture_output=True, text=True).stdout
+    return json.loads(out.strip().splitlines()[-1])
+
+
+def per_call_us(fn, calls):
+    samples = np.empty(calls)
+    for i in range(calls):
+        start = time.perf_counter()
+        fn()
+        samples[i] = time.perf_counter() - start
+    return float(np.median(samples)) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--repeats", type=int, default=5, help="cold starts per engine (median reported)")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    row = np.array([[45.0, 1, 0, 120, 200, 0, 0, 150, 0, 1.0, 0, 0, 1]])
+    batch = np.tile(row, (1000, 1)) + rng.normal(0, 1, (1000, 13))
+
+    print(f"{'engine':<8} {'import ms':>10} {'load ms':>9} {'→ 1st predict ms':>17} {'sklearn?':>9} "
+          f"{'1 row µs':>9} {'1k rows µs':>11}")
+    for engine in ("sklearn", "numpy"):
+        runs = [cold_start(engine) for _ in range(args.repeats)]
+        med = {k: float(np.median([r[k] for r in runs])) for k in ("import_ms", "load_ms", "first_ms")}
+        pipeline = load_artifacts(ROOT / "model.pkl", ROOT / "scaler.pkl", artifact_dir=ROOT / "artifacts", engine=engine)
+        one = per_call_us(lambda: pipeline.predict(row), 2000)
+        many = per_call_us(lambda: pipeline.predict(batch), 200)
+        print(f"{engine:<8} {med['import_ms']:>10.1f} {med['load_ms']:>9.1f} {med['first_ms']:>17.1f} "
+              f"{'yes' if runs[0]['sklearn'] else 'no':>9} {one:>9.1f} {many:>11.1f}")
+
+
+if __name__ == "__main__":
+    main()
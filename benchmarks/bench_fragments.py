@@ -0,0 +1,150 @@
+# ============================================================
+# Benchmark: server CPU and websocket bytes per slider interaction
+# Usage: python benchmarks/bench_fragments.py [--runs 30] [--port 8599]
+# ============================================================
+"""
+Starts app.py under `streamlit run` and drives it over its websocket the
+way the browser does: widget changes are sent as rerun requests (scoped to
+the widget's fragment when it has one), cacheable messages are reported
+back as cached, and each rerun is read until its script_finished message.
+After one diagnostic scan, each interaction drags the cholesterol slider;
+the server process CPU time and the bytes received are recorded per rerun.
+"""
+
+import argparse
+import asyncio
+import os
+import subprocess
+import sys
+import time
+import urllib.request
+from contextlib import contextmanager
+from pathlib import Path
+
+import numpy as np
+import websockets
+from streamlit.proto.BackMsg_pb2 import BackMsg
+from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+from streamlit.proto.WidgetStates_pb2 import WidgetState
+
+ROOT = Path(__file__).resolve().parents[1]
+
+SLIDER = "Serum Cholestoral (mg/dl)"
+SCAN = "🔍 INITIATE AI DIAGNOSTIC SCAN"
+
+
+def server_cpu_s(pid):
+    """User + system CPU seconds consumed so far by process `pid`."""
+    with open(f"/proc/{pid}/stat") as f:
+        fields = f.read().rsplit(")", 1)[1].split()
+    return (int(fields[11]) + int(fields[12])) / os.sysconf("SC_CLK_TCK")
+
+
+class BrowserSession:
+    """Minimal websocket client speaking Streamlit's BackMsg/ForwardMsg protocol."""
+
+    def __init__(self, ws):
+        self.ws = ws
+        self.widgets = {}  # label -> (widget id, fragment id)
+        self.cached = set()
+        self.page_hash = ""
+
+    def _index(self, msg):
+        if msg.WhichOneof("type") == "new_session":
+            self.page_hash = msg.new_session.page_script_hash
+        if msg.WhichOneof("type") != "delta" or msg.delta.WhichOneof("type") != "new_element":
+            return
+        element = msg.delta.new_element
+        kind = element.WhichOneof("type")
+        proto = getattr(element, kind) if kind else None
+        if proto is not None and getattr(proto, "id", "") and getattr(proto, "label", ""):
+            self.widgets[proto.label] = (proto.id, msg.delta.fragment_id)
+
+    async def rerun(self, states=(), fragment_id=""):
+        """Sends one rerun request; returns bytes received until the run settles."""
+        back = BackMsg()
+        client = back.rerun_script
+        client.page_script_hash = self.page_hash
+        client.fragment_id = fragment_id
+        client.cached_message_hashes.extend(sorted(self.cached))
+        client.widget_states.widgets.extend(states)
+        await self.ws.send(back.SerializeToString())
+
+        received = 0
+        while True:
+            data = await self.ws.recv()
+            received += len(data)
+            msg = ForwardMsg()
+            msg.ParseFromString(data)
+            if msg.metadata.cacheable:
+                self.cached.add(msg.hash)
+            self._index(msg)
+            if (msg.WhichOneof("type") == "script_finished"
+                    and msg.script_finished != ForwardMsg.FINISHED_EARLY_FOR_RERUN):
+                return received
+
+    async def set_slider(self, label, value):
+        widget_id, fragment_id = self.widgets[label]
+        state = WidgetState(id=widget_id)
+        state.double_array_value.data.append(value)
+        return await self.rerun([state], fragment_id)
+
+    async def click(self, label):
+        widget_id, fragment_id = self.widgets[label]
+        return await self.rerun([WidgetState(id=widget_id, trigger_value=True)], fragment_id)
+
+
+async def drive(port, pid, runs):
+    uri = f"ws://127.0.0.1:{port}/_stcore/stream"
+    async with websockets.connect(uri, subprotocols=["streamlit"], max_size=None) as ws:
+        session = BrowserSession(ws)
+        first = await session.rerun()
+        await session.click(SCAN)
+
+        cpu, sent = [], []
+        for i in range(runs):
+            before = server_cpu_s(pid)
+            sent.append(await session.set_slider(SLIDER, 150.0 + (i % 2) * 100.0))
+            cpu.append((server_cpu_s(pid) - before) * 1000.0)
+        return first, np.array(cpu), np.array(sent)
+
+
+@contextmanager
+def streamlit_server(port):
+    """Runs `streamlit run app.py` headless on `port`; yields the server pid once healthy."""
+    server = subprocess.Popen(
+        [sys.executable, "-m", "streamlit", "run", "app.py", "--server.headless", "true",
+         "--server.port", str(port), "--browser.gatherUsageStats", "false"],
+        cwd=ROOT, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    try:
+        for _ in range(120):
+            try:
+                urllib.request.urlopen(f"http://127.0.0.1:{port}/_stcore/health", timeout=1)
+                break
+            except OSError:
+                time.sleep(0.25)
+        yield server.pid
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--runs", type=int, default=30)
+    parser.add_argument("--port", type=int, default=8599)
+    args = parser.parse_args()
+
+    with streamlit_server(args.port) as pid:
+        first, cpu, sent = asyncio.run(drive(args.port, pid, args.runs))
+
+    print(f"first page load: {first / 1024:.1f} KiB over the websocket")
+    print(f"slider interaction on CLINICAL INPUTS ({args.runs} runs)")
+    # /proc CPU counters tick at 10 ms, so the mean is steadier than the median here
+    print(f"  server CPU  mean   {cpu.mean():7.1f} ms   p95 {np.percentile(cpu, 95):7.1f} ms")
+    print(f"  websocket   median {np.median(sent) / 1024:7.1f} KiB p95 {np.percentile(sent, 95) / 1024:7.1f} KiB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+# ============================================================
+# Benchmark: patient history page reads from the audit log
+# Usage: python benchmarks/bench_history.py [--rows 1000000] [--visits 500]
+# ============================================================
+"""
+Fills a scratch audit database with `--rows` scans spread over many
+patients, plus one patient with `--visits` visits interleaved through the
+log. Times what the PATIENT REPORT history view runs (visit count plus one
+50-visit page, first and last page) with the (patient_id, ts) index, the
+same SQL forced to scan the table (NOT INDEXED), and reading the
+patient's full history instead of one page.
+"""
+
+import argparse
+import sqlite3
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from audit import HISTORY, INSERT, VISIT_COUNT, connect  # noqa: E402
+
+PAGE = 50
+PATIENT = "MRN-TARGET"
+
+
+def fill(path, rows, visits, patients=20_000):
+    rng = np.random.default_rng(0)
+    conn = connect(path)
+    target = set(np.linspace(0, rows - 1, visits).astype(int).tolist())
+    features = [45.0, 1, 0, 120, 200, 0, 0, 150, 0, 1.0, 0, 0, 1]
+    ids = rng.integers(patients, size=rows)
+    batch = []
+    for i in range(rows):
+        pid = PATIENT if i in target else f"MRN-{ids[i]:06d}"
+        batch.append((1.7e9 + i, pid, *features, float(i % 3), "Moderate Risk Profile", "v1", 0.5))
+        if len(batch) == 50_000:
+            with conn:
+                conn.executemany(INSERT, batch)
+            batch = []
+    with conn:
+        conn.executemany(INSERT, batch)
+    conn.close()
+
+
+def median_ms(fn, repeats=50):
+    samples = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return float(np.median(samples)) * 1000.0
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--visits", type=int, default=500)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = str(Path(tmp) / "audit.db")
+        start = time.perf_counter()
+        fill(path, args.rows, args.visits)
+        print(f"{args.rows:,} logged scans, {args.visits} for one patient (filled in {time.perf_counter() - start:.1f}s)")
+
+        conn = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+        last = (args.visits - 1) // PAGE * PAGE
+
+        for label, table in (("indexed", "predictions"), ("no index", "predictions NOT INDEXED")):
+            count_sql, history_sql = (sql.replace("FROM predictions", f"FROM {table}") for sql in (VISIT_COUNT, HISTORY))
+
+            def page_view(offset):
+                return lambda: (conn.execute(count_sql, (PATIENT,)).fetchone(),
+                                conn.execute(history_sql, (PATIENT, PAGE, offset)).fetchall())
+
+            def full_history():
+                return conn.execute(history_sql, (PATIENT, args.visits, 0)).fetchall()
+
+            repeats = 50 if label == "indexed" else 3
+            print(f"  {label}")
+            print(f"    count + newest page      {median_ms(page_view(0), repeats):8.3f} ms")
+            print(f"    count + oldest page      {median_ms(page_view(last), repeats):8.3f} ms")
+            print(f"    full history ({args.visits} rows) {median_ms(full_history, repeats):8.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+# ============================================================
+# Benchmark: prediction latency and errors across a model hot-swap
+# Usage: python benchmarks/bench_hotswap.py [--threads 8] [--seconds 6]
+# ============================================================
+"""
+Publishes the repo model as v1 in a scratch registry and serves it through
+registry.ModelRegistry while client threads predict continuously. Midway,
+a second version (same reference set, k=5) is published; the registry
+picks it up by checksum poll, loads it in the background and swaps it in.
+Reports how long publishing took to reach the serving path, request
+latency before/around/after the swap, and that no request failed or was
+answered by a version other than the one it was sent to.
+"""
+
+import argparse
+import pickle
+import sys
+import tempfile
+import threading
+import time
+import warnings
+from pathlib import Path
+
+import numpy as np
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from registry import ModelRegistry, publish  # noqa: E402
+
+warnings.filterwarnings("ignore")
+
+
+def client(registry, rows, stop, log, errors):
+    rng = np.random.default_rng(threading.get_ident() % 2**32)
+    while not stop.is_set():
+        model = registry.current()
+        X = rows[rng.integers(len(rows))][None, :]
+        start = time.perf_counter()
+        try:
+            pred = model.predictions.predict_trusted(X)[0]
+        except Exception as exc:
+            errors.append(exc)
+            continue
+        # Each version's answer must come from that version's pipeline.
+        if pred != model.pipeline.predict_trusted(X)[0]:
+            errors.append(AssertionError(f"{model.version} answered with another model"))
+        log.append((start, time.perf_counter() - start, model.version))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--seconds", type=float, default=6.0)
+    parser.add_argument("--poll", type=float, default=0.25, help="registry poll interval (s)")
+    args = parser.parse_args()
+
+    with open(ROOT / "model.pkl", "rb") as f:
+        model = pickle.load(f)
+    with open(ROOT / "scaler.pkl", "rb") as f:
+        scaler = pickle.load(f)
+    rng = np.random.default_rng(0)
+    rows = np.column_stack([rng.uniform(lo, hi, 2000) for lo, hi in
+                            [(29, 77), (0, 1), (0, 3), (94, 200), (126, 564), (0, 1), (0, 2),
+                             (71, 202), (0, 1), (0, 6.2), (0, 2), (0, 3), (1, 3)]]).round()
+
+    with tempfile.TemporaryDirectory() as root:
+        publish(root, model, scaler)
+        registry = ModelRegistry(root, poll_s=args.poll).start()
+        stop, log, errors = threading.Event(), [], []
+        threads = [threading.Thread(target=client, args=(registry, rows, stop, log, errors))
+                   for _ in range(args.threads)]
+        for t in threads:
+            t.start()
+
+        time.sleep(args.seconds / 2)
+        model.n_neighbors = 5
+        published = time.perf_counter()
+        publish(root, model, scaler)
+        while registry.current().version != "v2":
+            time.sleep(0.001)
+        swapped = time.perf_counter()
+        time.sleep(args.seconds / 2)
+        stop.set()
+        for t in threads:
+            t.join()
+        registry.stop()
+
+    starts, lat, versions = (np.array(c) for c in zip(*log))
+    lat *= 1000.0
+    around = np.abs(starts - swapped) < 0.25
+    print(f"{len(log):,} predictions from {args.threads} threads, {len(errors)} errors")
+    print(f"publish → serving v2: {(swapped - published) * 1000:.0f} ms (poll every {args.poll * 1000:.0f} ms)")
+    for label, mask in (("v1, steady", (versions == "v1") & ~around), ("±250 ms of swap", around),
+                        ("v2, steady", (versions == "v2") & ~around)):
+        print(f"  {label:<16} n={mask.sum():>7,}  p50 {np.median(lat[mask]):6.3f} ms  "
+              f"p99 {np.percentile(lat[mask], 99):6.3f} ms  max {lat[mask].max():6.2f} ms")
+    for exc in errors[:3]:
+        print(f"  error: {exc!r}")
+    sys.exit(1 if errors else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+# ============================================================
+# Benchmark: cold start of pickle vs memory-mapped model artifacts
+# Usage: python benchmarks/bench_loader.py [--sizes 241 100000 1000000]
+# ============================================================
+
+import argparse
+import json
+import pickle
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+import numpy as np
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from sklearn.neighbors import KNeighborsClassifier  # noqa: E402
+from sklearn.preprocessing import StandardScaler  # noqa: E402
+
+from artifacts import export_artifacts  # noqa: E402
+
+# Runs in a fresh interpreter so each loader starts cold (modulo page cache).
+PROBE = """
+import json, sys, time
+sys.path.insert(0, {root!r})
+import numpy as np
+from inference import load_artifacts
+
+def rss():
+    fields = dict(line.split(":", 1) for line in open("/proc/self/status"))
+    return {{k: int(fields[k].split()[0]) / 1024 for k in ("RssAnon", "RssFile")}}
+
+before = rss()
+start = time.perf_counter()
+pipeline = load_artifacts({model!r}, {scaler!r}, artifact_dir={artifact_dir!r})
+loaded = time.perf_counter() - start
+after_load = rss()
+pipeline.predict(np.zeros((1, 13)))
+first_predict = time.perf_counter() - start
+after_predict = rss()
+print(json.dumps({{
+    "load_ms": loaded * 1000, "first_predict_ms": first_predict * 1000,
+    "anon_load_mb": after_load["RssAnon"] - before["RssAnon"],
+    "anon_predict_mb": after_predict["RssAnon"] - before["RssAnon"],
+    "file_predict_mb": after_predict["RssFile"] - before["RssFile"],
+}}))
+"""
+
+
+def probe(model, scaler, artifact_dir=None):
+    code = PROBE.format(root=str(ROOT), model=str(model), scaler=str(scaler),
+                        artifact_dir=None if artifact_dir is None else str(artifact_dir))
+    out = subprocess.run([sys.executable, "-W", "ignore", "-c", code], check=True,
+                         capture_output=True, text=True).stdout
+    return json.loads(out.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=[241, 100_000, 1_000_000])
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    print(f"{'rows':>10}  {'loader':<7} {'load ms':>9} {'1st predict ms':>15} "
+          f"{'private MB':>11} {'shared MB':>10}")
+    for n in args.sizes:
+        X = rng.normal(size=(n, 13))
+        y = rng.integers(0, 2, n)
+        scaler = StandardScaler().fit(X)
+        model = KNeighborsClassifier(n_neighbors=15).fit(scaler.transform(X), y)
+
+        with tempfile.TemporaryDirectory() as tmp:
+            tmp = Path(tmp)
+            with open(tmp / "model.pkl", "wb") as f:
+                pickle.dump(model, f)
+            with open(tmp / "scaler.pkl", "wb") as f:
+                pickle.dump(scaler, f)
+            export_artifacts(model, scaler, tmp / "artifacts")
+
+            for name, artifact_dir in (("pickle", None), ("mmap", tmp / "artifacts")):
+                r = probe(tmp / "model.pkl", tmp / "scaler.pkl", artifact_dir)
+                print(f"{n:>10,}  {name:<7} {r['load_ms']:>9.1f} {r['first_predict_ms']:>15.1f} "
+                      f"{r['anon_predict_mb']:>11.1f} {r['file_predict_mb']:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+# ============================================================
+# Benchmark: neighbor index backends vs the pickled KNN estimator
+# Usage: python benchmarks/bench_neighbors.py [--sizes 300 3000 30000 300000 1000000]
+# ============================================================
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from sklearn.neighbors import KNeighborsClassifier  # noqa: E402
+
+from neighbors import IndexedKNN, build_index  # noqa: E402
+
+K = 15
+N_FEATURES = 13
+
+
+def synthetic_cohort(n, rng):
+    """Standardized 13-D rows with a few latent factors, like real biomarker data."""
+    latent = rng.normal(size=(n, 4))
+    mixing = rng.normal(size=(4, N_FEATURES))
+    X = latent @ mixing + 0.3 * rng.normal(size=(n, N_FEATURES))
+    X = (X - X.mean(axis=0)) / X.std(axis=0)
+    y = (X[:, 0] + 0.5 * rng.normal(size=n) > 0).astype(int)
+    return X, y
+
+
+def single_query_ms(predict, queries):
+    """Median latency of one-row predict calls in milliseconds."""
+    samples = []
+    for row in queries:
+        start = time.perf_counter()
+        predict(row[None, :])
+        samples.append(time.perf_counter() - start)
+    return float(np.median(samples)) * 1000.0
+
+
+def throughput(predict, queries):
+    """Rows per second for one batched predict call."""
+    start = time.perf_counter()
+    predict(queries)
+    return len(queries) / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=[300, 3_000, 30_000, 300_000, 1_000_000])
+    parser.add_argument("--single", type=int, default=200, help="one-row queries timed per backend")
+    parser.add_argument("--batch", type=int, default=2_000, help="rows in the batched query")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    print(f"{'rows':>10}  {'backend':<12} {'build s':>8} {'1-row ms':>9} {'batch rows/s':>13}")
+    for n in args.sizes:
+        X, y = synthetic_cohort(n, rng)
+        queries, _ = synthetic_cohort(max(args.single, args.batch), rng)
+
+        start = time.perf_counter()
+        estimator = KNeighborsClassifier(n_neighbors=K).fit(X, y)
+        backends = [("sklearn", estimator, time.perf_counter() - start)]
+        for method in ("blocked", "kd_tree", "ball_tree"):
+            start = time.perf_counter()
+            knn = IndexedKNN(build_index(X, method), y, estimator.classes_, K)
+            backends.append((method, knn, time.perf_counter() - start))
+
+        for name, knn, build_s in backends:
+            one = single_query_ms(knn.predict, queries[:args.single])
+            rate = throughput(knn.predict, queries[:args.batch])
+            print(f"{n:>10,}  {name:<12} {build_s:>8.2f} {one:>9.3f} {rate:>13,.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+# ============================================================
+# Benchmark: websocket payload per full rerun and stylesheet caching
+# Usage: python benchmarks/bench_payload.py [--runs 10] [--port 8598]
+# ============================================================
+"""
+Measures what a browser receives from app.py: the first page load, a full
+rerun with Streamlit's message cache (the client reports the hashes it has
+seen), the same rerun with an empty client cache, and the theme stylesheet
+over HTTP with the caching headers it is served with.
+"""
+
+import argparse
+import asyncio
+import sys
+import urllib.error
+import urllib.request
+from pathlib import Path
+
+import numpy as np
+import websockets
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT / "benchmarks"))
+
+from bench_fragments import BrowserSession, streamlit_server  # noqa: E402
+
+
+async def drive(port, runs):
+    uri = f"ws://127.0.0.1:{port}/_stcore/stream"
+    async with websockets.connect(uri, subprotocols=["streamlit"], max_size=None) as ws:
+        session = BrowserSession(ws)
+        first = await session.rerun()
+        cached = [await session.rerun() for _ in range(runs)]
+        uncached = []
+        for _ in range(runs):
+            session.cached.clear()
+            uncached.append(await session.rerun())
+        return first, np.median(cached), np.median(uncached)
+
+
+def stylesheet(port):
+    """(bytes, caching headers) for the theme stylesheet, or None when it is not served."""
+    url = f"http://127.0.0.1:{port}/app/static/theme.css"
+    try:
+        with urllib.request.urlopen(url) as resp:
+            if resp.headers.get_content_type() != "text/css":
+                return None  # static serving off: the app's index.html answers instead
+            body = resp.read()
+            headers = {k: resp.headers[k] for k in ("Cache-Control", "ETag", "Last-Modified") if k in resp.headers}
+    except urllib.error.HTTPError:
+        return None
+    return len(body), headers
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--port", type=int, default=8598)
+    args = parser.parse_args()
+
+    with streamlit_server(args.port):
+        first, cached, uncached = asyncio.run(drive(args.port, args.runs))
+        css = stylesheet(args.port)
+
+    print(f"first page load            {first / 1024:7.1f} KiB")
+    print(f"full rerun, client cache   {cached / 1024:7.1f} KiB (median of {args.runs})")
+    print(f"full rerun, no cache       {uncached / 1024:7.1f} KiB (median of {args.runs})")
+    if css is None:
+        print("theme stylesheet           not served")
+    else:
+        print(f"theme stylesheet           {css[0] / 1024:7.1f} KiB over HTTP, {', '.join(css[1]) or 'no caching headers'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+# ============================================================
+# Benchmark: single-row latency, two-step sklearn vs fused pipeline
+# Usage: python benchmarks/bench_pipeline.py
+# ============================================================
+
+import pickle
+import sys
+import time
+import warnings
+from pathlib import Path
+
+import numpy as np
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from inference import load_artifacts  # noqa: E402
+
+warnings.filterwarnings("ignore")
+
+ROW = np.array([[45.0, 1, 0, 120, 200, 0, 0, 150, 0, 1.0, 0, 0, 1]])
+
+
+def per_call_us(fn, calls=2000):
+    """Median wall-clock time of one call in microseconds."""
+    samples = np.empty(calls)
+    for i in range(calls):
+        start = time.perf_counter()
+        fn()
+        samples[i] = time.perf_counter() - start
+    return float(np.median(samples)) * 1e6
+
+
+def main():
+    with open(ROOT / "model.pkl", "rb") as f:
+        model = pickle.load(f)
+    with open(ROOT / "scaler.pkl", "rb") as f:
+        scaler = pickle.load(f)
+    pipeline = load_artifacts(artifact_dir=ROOT / "artifacts")
+
+    cases = [
+        ("scaler.transform + model.predict", lambda: model.predict(scaler.transform(ROW))),
+        ("KNNPipeline.predict", lambda: pipeline.predict(ROW)),
+        ("KNNPipeline.predict_trusted", lambda: pipeline.predict_trusted(ROW)),
+    ]
+    for label, fn in cases:
+        print(f"{label:<34} {per_call_us(fn):9.1f} µs")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+# ============================================================
+# Benchmark: leave-one-out cohort distribution precomputation
+# Usage: python benchmarks/bench_population.py [--rows 30000] [--loop-rows 2000]
+# ============================================================
+"""
+Builds a synthetic reference cohort of `--rows` patients (the shipped
+reference rows plus jitter, labelled by the shipped model) and times
+population.leave_one_out at several chunk sizes, with the peak memory each
+run allocates. For comparison it times a per-row loop (one k+1 query per
+patient) on `--loop-rows` rows and extrapolates, and checks that every
+chunk size yields identical scores.
+"""
+
+import argparse
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+import numpy as np
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from neighbors import BlockedIndex, IndexedKNN  # noqa: E402
+from inference import load_artifacts  # noqa: E402
+from population import leave_one_out, summarize  # noqa: E402
+
+CHUNKS = (256, 2048, 8192, 65536)
+
+
+def build_cohort(rows, seed=0):
+    shipped = load_artifacts(str(ROOT / "model.pkl"), str(ROOT / "scaler.pkl"), artifact_dir=str(ROOT / "artifacts"))
+    reference = np.asarray(shipped.knn.index.reference)
+    rng = np.random.default_rng(seed)
+    cohort = reference[rng.integers(len(reference), size=rows)] + rng.normal(0.0, 0.25, (rows, reference.shape[1]))
+    labels = np.searchsorted(shipped.classes_, shipped.knn.predict(cohort))
+    return IndexedKNN(BlockedIndex(cohort), labels, shipped.classes_, shipped.n_neighbors, shipped.weights)
+
+
+def per_row(knn, rows):
+    reference = knn.index.reference
+    k = knn.n_neighbors
+    scores = np.empty(rows)
+    for i in range(rows):
+        dist, ind = knn.index.query(reference[i:i + 1], k + 1)
+        keep = ind[0] != i
+        if keep.all():
+            keep[-1] = False
+        scores[i] = knn.vote(dist[:, keep], ind[:, keep])[0]
+    return scores
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=30_000)
+    parser.add_argument("--loop-rows", type=int, default=2000)
+    args = parser.parse_args()
+
+    knn = build_cohort(args.rows)
+    print(f"cohort: {args.rows:,} rows, k={knn.n_neighbors} {knn.weights}")
+
+    start = time.perf_counter()
+    looped = per_row(knn, args.loop_rows)
+    loop_s = (time.perf_counter() - start) * args.rows / args.loop_rows
+    print(f"  per-row loop      ~{loop_s:8.1f} s  (extrapolated from {args.loop_rows:,} rows)")
+
+    reference_scores = None
+    for chunk in CHUNKS:
+        tracemalloc.start()
+        start = time.perf_counter()
+        scores = leave_one_out(knn, chunk_rows=chunk)
+        elapsed = time.perf_counter() - start
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        if reference_scores is None:
+            reference_scores = scores
+        same = np.array_equal(scores, reference_scores) and np.array_equal(scores[:args.loop_rows], looped)
+        print(f"  chunk {chunk:>7,}     {elapsed:8.1f} s  peak {peak / 2**20:7.1f} MiB  "
+              f"{loop_s / elapsed:5.1f}x  {'same scores' if same else 'SCORES DIFFER'}")
+
+    population = summarize(reference_scores)
+    print(f"  summary: {len(population['values'])} distinct scores, "
+          f"{len(population['histogram']['counts'])}-bin histogram, {len(population['kde']['x'])}-point KDE")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+# ============================================================
+# Benchmark: Streamlit script-run time per interaction
+# Usage: python benchmarks/bench_reruns.py [--runs 30]
+# ============================================================
+"""
+Drives app.py headlessly with streamlit.testing.v1.AppTest. After one
+diagnostic scan, each interaction drags the cholesterol slider on the
+CLINICAL INPUTS tab and times the resulting script run (CPU and wall).
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+from streamlit.testing.v1 import AppTest
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+
+def element(elements, label):
+    return next(e for e in elements if e.label == label)
+
+
+def timed_run(at):
+    cpu, wall = time.process_time(), time.perf_counter()
+    at.run()
+    return (time.process_time() - cpu) * 1000.0, (time.perf_counter() - wall) * 1000.0
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--runs", type=int, default=30)
+    args = parser.parse_args()
+
+    at = AppTest.from_file(str(ROOT / "app.py"), default_timeout=60)
+    at.run()
+    element(at.button, "🔍 INITIATE AI DIAGNOSTIC SCAN").click()
+    at.run()
+    assert not at.exception, at.exception
+
+    cpu, wall = [], []
+    for i in range(args.runs):
+        element(at.slider, "Serum Cholestoral (mg/dl)").set_value(150 + (i % 2) * 100)
+        c, w = timed_run(at)
+        cpu.append(c)
+        wall.append(w)
+    assert not at.exception, at.exception
+
+    print(f"slider interaction on CLINICAL INPUTS ({args.runs} runs)")
+    print(f"  script CPU  median {np.median(cpu):7.1f} ms   p95 {np.percentile(cpu, 95):7.1f} ms")
+    print(f"  wall clock  median {np.median(wall):7.1f} ms   p95 {np.percentile(wall, 95):7.1f} ms")
+    print(f"  charts rendered per run: {len(at.get('plotly_chart'))}")
+
+
+if __name__ == "__main__":
+    main()
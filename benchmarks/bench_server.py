@@ -0,0 +1,114 @@
+# ============================================================
+# Benchmark: REST inference server throughput and latency
+# Usage: python benchmarks/bench_server.py [--concurrency 64] [--requests 20000] [--workers 1]
+# ============================================================
+"""
+Starts server.py in a subprocess and drives POST /predict from
+`--concurrency` keep-alive connections until `--requests` responses have
+arrived, once with micro-batching disabled (--max-batch 1) and once with
+the server defaults. Reports throughput and p50/p99 request latency.
+"""
+
+import argparse
+import asyncio
+import json
+import subprocess
+import sys
+import time
+import urllib.request
+from pathlib import Path
+
+import numpy as np
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from server import DEFAULT_MAX_BATCH, DEFAULT_MAX_WAIT_MS  # noqa: E402
+
+
+def request_bytes(port, row):
+    body = json.dumps({"features": row}).encode()
+    head = (f"POST /predict HTTP/1.1\r\nHost: 127.0.0.1:{port}\r\n"
+            f"Content-Type: application/json\r\nContent-Length: {len(body)}\r\n\r\n")
+    return head.encode() + body
+
+
+async def client(port, rows, budget, latencies):
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    i = 0
+    while budget[0] > 0:
+        budget[0] -= 1
+        start = time.perf_counter()
+        writer.write(request_bytes(port, rows[i % len(rows)]))
+        await writer.drain()
+        await reader.readline()
+        length = 0
+        while True:
+            line = await reader.readline()
+            if line == b"\r\n":
+                break
+            if line.lower().startswith(b"content-length:"):
+                length = int(line.split(b":")[1])
+        await reader.readexactly(length)
+        latencies.append(time.perf_counter() - start)
+        i += 1
+    writer.close()
+
+
+async def load(port, concurrency, requests, rows):
+    budget, latencies = [requests], []
+    start = time.perf_counter()
+    await asyncio.gather(*(client(port, rows[c::concurrency], budget, latencies) for c in range(concurrency)))
+    return requests / (time.perf_counter() - start), np.array(latencies) * 1000.0
+
+
+def run(port, args, rows, server_args):
+    server = subprocess.Popen([sys.executable, "server.py", "--port", str(port),
+                               "--workers", str(args.workers), *server_args],
+                              cwd=ROOT, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        for _ in range(120):
+            try:
+                urllib.request.urlopen(f"http://127.0.0.1:{port}/health", timeout=1)
+                break
+            except OSError:
+                time.sleep(0.25)
+        throughput, ms = asyncio.run(load(port, args.concurrency, args.requests, rows))
+        with urllib.request.urlopen(f"http://127.0.0.1:{port}/health") as resp:
+            batching = json.load(resp)["batching"]
+    finally:
+        server.terminate()
+        server.wait()
+    return throughput, ms, batching
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--requests", type=int, default=20_000)
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--port", type=int, default=8601)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    rows = np.column_stack([
+        rng.integers(29, 78, 1024), rng.integers(0, 2, 1024), rng.integers(0, 4, 1024),
+        rng.integers(94, 200, 1024), rng.integers(126, 564, 1024), rng.integers(0, 2, 1024),
+        rng.integers(0, 3, 1024), rng.integers(71, 202, 1024), rng.integers(0, 2, 1024),
+        rng.uniform(0, 6.2, 1024).round(1), rng.integers(0, 3, 1024), rng.integers(0, 4, 1024),
+        rng.integers(1, 4, 1024),
+    ]).tolist()
+
+    print(f"{args.requests:,} POST /predict from {args.concurrency} connections, {args.workers} worker(s)")
+    configs = [
+        ("no batching", ["--max-batch", "1"]),
+        (f"batch ≤{DEFAULT_MAX_BATCH} rows / {DEFAULT_MAX_WAIT_MS:g} ms", []),
+    ]
+    for label, server_args in configs:
+        throughput, ms, batching = run(args.port, args, rows, server_args)
+        print(f"  {label:<26} {throughput:8,.0f} req/s   p50 {np.percentile(ms, 50):6.2f} ms   "
+              f"p99 {np.percentile(ms, 99):6.2f} ms   mean batch {batching['mean_batch_rows']:.1f} rows")
+
+
+if __name__ == "__main__":
+    main()
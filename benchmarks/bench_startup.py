@@ -0,0 +1,140 @@
+# ============================================================
+# Benchmark: cold start to first prediction, with import profiling
+# Usage: python benchmarks/bench_startup.py [--runs 3] [--check | --update]
+# ============================================================
+"""
+Starts `python -X importtime -m streamlit run app.py` in a fresh process,
+opens a browser session over the websocket and clicks the diagnostic scan.
+Reports the time from process launch to the server answering, to the first
+page render and to the first prediction, and the import time per top-level
+package as logged by -X importtime (everything imported up to the first
+prediction; the server is stopped right after it).
+
+--update stores the medians in benchmarks/startup_baseline.json; --check
+compares against that file and exits 1 when time to first prediction
+regresses by more than --tolerance or a deferred package (pandas,
+scikit-learn, scipy) is imported before the first prediction.
+"""
+
+import argparse
+import asyncio
+import json
+import re
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+from collections import defaultdict
+from pathlib import Path
+
+import numpy as np
+import websockets
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT / "benchmarks"))
+
+from bench_fragments import SCAN, BrowserSession  # noqa: E402
+
+BASELINE = ROOT / "benchmarks" / "startup_baseline.json"
+DEFERRED = ("pandas", "sklearn", "scipy")
+IMPORT_LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)")
+
+
+def package_import_ms(log):
+    """Cumulative import ms per top-level package from -X importtime output."""
+    totals = defaultdict(float)
+    for line in log.splitlines():
+        match = IMPORT_LINE.match(line)
+        if not match or len(match.group(3)) != 1:
+            continue  # only outermost imports, so nested packages are not double-counted
+        totals[match.group(4).split(".")[0]] += int(match.group(2)) / 1000.0
+    return dict(totals)
+
+
+async def first_prediction(port):
+    async with websockets.connect(f"ws://127.0.0.1:{port}/_stcore/stream",
+                                  subprotocols=["streamlit"], max_size=None) as ws:
+        session = BrowserSession(ws)
+        await session.rerun()
+        rendered = time.perf_counter()
+        await session.click(SCAN)
+        return rendered, time.perf_counter()
+
+
+def cold_start(port):
+    """One fresh server: (milestones in ms since launch, import ms per package)."""
+    with tempfile.TemporaryFile("w+") as log:
+        launched = time.perf_counter()
+        server = subprocess.Popen(
+            [sys.executable, "-X", "importtime", "-m", "streamlit", "run", "app.py",
+             "--server.headless", "true", "--server.port", str(port), "--browser.gatherUsageStats", "false"],
+            cwd=ROOT, stdout=subprocess.DEVNULL, stderr=log,
+        )
+        try:
+            while True:
+                try:
+                    urllib.request.urlopen(f"http://127.0.0.1:{port}/_stcore/health", timeout=1)
+                    break
+                except OSError:
+                    if server.poll() is not None:
+                        raise RuntimeError("streamlit exited before becoming healthy")
+                    time.sleep(0.02)
+            healthy = time.perf_counter()
+            rendered, predicted = asyncio.run(first_prediction(port))
+        finally:
+            server.terminate()
+            server.wait()
+        log.seek(0)
+        imports = package_import_ms(log.read())
+    milestones = {name: (t - launched) * 1000.0 for name, t in
+                  (("healthy_ms", healthy), ("first_render_ms", rendered), ("first_prediction_ms", predicted))}
+    return milestones, imports
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--port", type=int, default=8597)
+    parser.add_argument("--top", type=int, default=8, help="packages listed by import time")
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument("--check", action="store_true", help="fail on regression against the stored baseline")
+    mode.add_argument("--update", action="store_true", help="store this run as the baseline")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed slowdown before --check fails")
+    args = parser.parse_args()
+
+    runs = [cold_start(args.port) for _ in range(args.runs)]
+    result = {key: float(np.median([m[key] for m, _ in runs])) for key in runs[0][0]}
+    imports = {pkg: float(np.median([i.get(pkg, 0.0) for _, i in runs])) for pkg in runs[0][1]}
+    result["deferred_imported"] = sorted(pkg for pkg in DEFERRED if pkg in runs[0][1])
+
+    print(f"cold start, median of {args.runs}")
+    print(f"  server healthy      {result['healthy_ms']:7.0f} ms")
+    print(f"  first page render   {result['first_render_ms']:7.0f} ms")
+    print(f"  first prediction    {result['first_prediction_ms']:7.0f} ms")
+    print(f"  deferred packages imported: {', '.join(result['deferred_imported']) or 'none'}")
+    print("import time by package (-X importtime, cumulative)")
+    for pkg, ms in sorted(imports.items(), key=lambda item: -item[1])[:args.top]:
+        print(f"  {pkg:<20} {ms:7.1f} ms")
+
+    if args.update:
+        BASELINE.write_text(json.dumps(result, indent=2) + "\n")
+        print(f"baseline written to {BASELINE.relative_to(ROOT)}")
+    elif args.check:
+        baseline = json.loads(BASELINE.read_text())
+        limit = baseline["first_prediction_ms"] * (1.0 + args.tolerance)
+        failures = []
+        if result["first_prediction_ms"] > limit:
+            failures.append(f"first prediction {result['first_prediction_ms']:.0f} ms > {limit:.0f} ms "
+                            f"(baseline {baseline['first_prediction_ms']:.0f} ms + {args.tolerance:.0%})")
+        newly = sorted(set(result["deferred_imported"]) - set(baseline["deferred_imported"]))
+        if newly:
+            failures.append(f"imported before the first prediction: {', '.join(newly)}")
+        for failure in failures:
+            print(f"REGRESSION: {failure}")
+        print("startup check passed" if not failures else "startup check failed")
+        sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+# ============================================================
+# Benchmark: what-if sweeps (per-point loop vs vectorized grid)
+# Usage: python benchmarks/bench_sweep.py
+# ============================================================
+
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from inference import FEATURES, feature_axis, load_artifacts, sweep  # noqa: E402
+
+BASE = np.array([45, 1, 0, 120, 200, 0, 0, 150, 0, 1.0, 0, 0, 1])
+
+
+def timed(fn, repeat=5):
+    """Returns the best wall-clock time of `repeat` runs in milliseconds."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000.0
+
+
+def per_point(pipeline, axes):
+    """The original tab2 approach: one predict call per grid cell."""
+    names = list(axes)
+    for values in np.stack(np.meshgrid(*axes.values(), indexing="ij"), -1).reshape(-1, len(names)):
+        row = BASE.astype(float).copy()
+        for name, v in zip(names, values):
+            row[FEATURES.index(name)] = v
+        pipeline.predict(row[None, :])
+
+
+def main():
+    pipeline = load_artifacts(ROOT / "model.pkl", ROOT / "scaler.pkl", artifact_dir=ROOT / "artifacts")
+
+    single = timed(lambda: pipeline.predict(BASE[None, :]))
+    print(f"single predict call            {single:9.2f} ms")
+
+    cases = [
+        ("chol × 30 (per-point loop)", {"chol": feature_axis("chol", 30)}, True),
+        ("chol × 30 (vectorized)", {"chol": feature_axis("chol", 30)}, False),
+        ("chol × 300 (vectorized)", {"chol": feature_axis("chol", 300)}, False),
+        ("age × trestbps 100² (vectorized)",
+         {"age": feature_axis("age", 100), "trestbps": feature_axis("trestbps", 100)}, False),
+        ("thalach × oldpeak 150² (vectorized)",
+         {"thalach": feature_axis("thalach", 150), "oldpeak": feature_axis("oldpeak", 150)}, False),
+    ]
+    for label, axes, loop in cases:
+        if loop:
+            ms = timed(lambda: per_point(pipeline, axes), repeat=3)
+        else:
+            ms = timed(lambda: sweep(pipeline, BASE, axes))
+        points = int(np.prod([len(v) for v in axes.values()]))
+        print(f"{label:<34} {ms:9.2f} ms  ({points} points)")
+
+
+if __name__ == "__main__":
+    main()
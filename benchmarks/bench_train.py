@@ -0,0 +1,87 @@
+# ============================================================
+# Benchmark: train.py grid search vs refitting per setting
+# Usage: python benchmarks/bench_train.py [--data heart.csv] [--workers 4]
+# ============================================================
+"""
+Cross-validates the same grid (k 1..30 × uniform/distance × p 1/2,
+5-fold × 3 repeats) two ways: scikit-learn's GridSearchCV refitting a
+StandardScaler + KNeighborsClassifier pipeline per setting and fold, and
+train.search, which runs one neighbor search per fold and p. Reports wall
+time and whether both pick the same best setting with the same score.
+Without --data, the training rows are recovered from model.pkl/scaler.pkl.
+"""
+
+import argparse
+import pickle
+import sys
+import time
+import warnings
+from pathlib import Path
+
+import pandas as pd
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from inference import FEATURES  # noqa: E402
+from train import K_VALUES, P_VALUES, SEED, WEIGHTS, load_dataset, search  # noqa: E402
+
+warnings.filterwarnings("ignore")
+
+
+def recovered_rows():
+    with open(ROOT / "model.pkl", "rb") as f:
+        model = pickle.load(f)
+    with open(ROOT / "scaler.pkl", "rb") as f:
+        scaler = pickle.load(f)
+    X = pd.DataFrame(scaler.inverse_transform(model._fit_X), columns=FEATURES)
+    return X, pd.Series(model.classes_[model._y], name="target")
+
+
+def grid_search_cv(X, y, folds, repeats, n_jobs):
+    from sklearn.model_selection import GridSearchCV, RepeatedStratifiedKFold
+    from sklearn.neighbors import KNeighborsClassifier
+    from sklearn.pipeline import make_pipeline
+    from sklearn.preprocessing import StandardScaler
+
+    grid = {"kneighborsclassifier__n_neighbors": list(K_VALUES),
+            "kneighborsclassifier__weights": list(WEIGHTS),
+            "kneighborsclassifier__p": list(P_VALUES)}
+    cv = RepeatedStratifiedKFold(n_splits=folds, n_repeats=repeats, random_state=SEED)
+    gs = GridSearchCV(make_pipeline(StandardScaler(), KNeighborsClassifier()), grid, cv=cv, n_jobs=n_jobs).fit(X, y)
+    best = {key.split("__")[1]: value for key, value in gs.best_params_.items()}
+    return {"k": best["n_neighbors"], "weights": best["weights"], "p": best["p"], "mean": gs.best_score_}
+
+
+def timed(fn, *args):
+    start = time.perf_counter()
+    result = fn(*args)
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--data", help="heart disease CSV (default: rows recovered from the pickles)")
+    parser.add_argument("--folds", type=int, default=5)
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--workers", type=int, default=2)
+    args = parser.parse_args()
+
+    X, y = load_dataset(args.data) if args.data else recovered_rows()
+    settings = len(K_VALUES) * len(WEIGHTS) * len(P_VALUES)
+    print(f"{len(X):,} rows, {settings} settings × {args.folds * args.repeats} folds")
+
+    runs = [
+        ("GridSearchCV, n_jobs=1", grid_search_cv, (X, y, args.folds, args.repeats, 1)),
+        ("train.search, 1 worker", search, (X, y, args.folds, args.repeats, K_VALUES, P_VALUES, 1)),
+        (f"train.search, {args.workers} workers", search, (X, y, args.folds, args.repeats, K_VALUES, P_VALUES, args.workers)),
+    ]
+    for label, fn, fn_args in runs:
+        result, seconds = timed(fn, *fn_args)
+        best = result[0] if isinstance(result, list) else result
+        print(f"  {label:<26} {seconds * 1000:9.1f} ms   best k={best['k']} {best['weights']} "
+              f"p={best['p']:g}  CV accuracy {best['mean']:.4f}")
+
+
+if __name__ == "__main__":
+    main()
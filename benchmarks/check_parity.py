@@ -0,0 +1,90 @@
+# ============================================================
+# Parity check: NumPy inference engine vs the scikit-learn model
+# Usage: python benchmarks/check_parity.py [--rows 100000]
+# ============================================================
+"""
+Predicts the same patients with every NumPy engine source (memory-mapped
+artifacts, the saved neighbor index, and fusing the pickles directly) and
+with the original `model.predict(scaler.transform(X))`, and compares the
+predicted classes and neighbor distances. Inputs are the training
+patients, random patients within the app's input bounds, and the full
+two-feature sensitivity grids around one patient. Exits 1 on any
+prediction mismatch. tests/test_parity.py asserts the same parity under
+pytest, including refit weights × p models.
+"""
+
+import argparse
+import sys
+import warnings
+from pathlib import Path
+
+import numpy as np
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from inference import FEATURE_BOUNDS, FEATURES, feature_axis, load_artifacts  # noqa: E402
+
+warnings.filterwarnings("ignore")
+
+BASE = np.array([45.0, 1, 0, 120, 200, 0, 0, 150, 0, 1.0, 0, 0, 1])
+
+
+def random_patients(rng, n):
+    cols = []
+    for name in FEATURES:
+        lo, hi, discrete = FEATURE_BOUNDS[name]
+        cols.append(rng.integers(lo, hi + 1, n).astype(float) if discrete else rng.uniform(lo, hi, n).round(1))
+    return np.column_stack(cols)
+
+
+def sensitivity_grids(resolution=50):
+    rows = []
+    for i, x in enumerate(FEATURES):
+        for y in FEATURES[i + 1:]:
+            gx, gy = np.meshgrid(feature_axis(x, resolution), feature_axis(y, resolution), indexing="ij")
+            grid = np.tile(BASE, (gx.size, 1))
+            grid[:, FEATURES.index(x)] = gx.ravel()
+            grid[:, FEATURES.index(y)] = gy.ravel()
+            rows.append(grid)
+    return np.concatenate(rows)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=100_000, help="random patients to compare")
+    args = parser.parse_args()
+
+    paths = dict(model_path=ROOT / "model.pkl", scaler_path=ROOT / "scaler.pkl")
+    reference = load_artifacts(**paths, engine="sklearn")
+    engines = {
+        "numpy (artifacts/)": load_artifacts(**paths, artifact_dir=ROOT / "artifacts"),
+        "numpy (knn_index.pkl)": load_artifacts(**paths, index_path=ROOT / "knn_index.pkl"),
+        "numpy (model.pkl)": load_artifacts(**paths),
+    }
+
+    training = reference.scaler.inverse_transform(reference.model._fit_X)
+    inputs = {
+        "training patients": training,
+        "random patients": random_patients(np.random.default_rng(0), args.rows),
+        "sensitivity grids": sensitivity_grids(),
+    }
+
+    failed = False
+    for input_name, X in inputs.items():
+        expected = reference.predict(X)
+        ref_dist, _ = reference.kneighbors(X)
+        print(f"{input_name} ({len(X):,} rows)")
+        for engine_name, engine in engines.items():
+            mismatches = int((engine.predict(X) != expected).sum())
+            dist, _ = engine.kneighbors(X)
+            print(f"  {engine_name:<22} {mismatches:>6} mismatched predictions   "
+                  f"max |Δ distance| {np.abs(dist - ref_dist).max():.1e}")
+            failed |= mismatches > 0
+
+    print("FAIL" if failed else "OK: identical predictions")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,228 @@
+# ============================================================
+# 🫀 Heart Health Intelligence Platform — Risk Analytics Figures
+# Plotly figure builders for the RISK ANALYTICS tab
+# ============================================================
+"""
+Pure figure builders: each takes plain values and returns a go.Figure, so
+the app can memoize them on the patient's feature tuple and skip figure
+construction on reruns where the patient state has not changed.
+"""
+
+import time
+
+import numpy as np
+import plotly.graph_objects as go
+from plotly.subplots import make_subplots
+
+from cohort import healthy_baseline
+from inference import FEATURES
+
+RADAR_LABELS = ["Age", "Cholesterol", "Blood Pressure", "Heart Rate", "ST Depression", "Vessels (CA)"]
+RADAR_FEATURES = ["age", "chol", "trestbps", "thalach", "oldpeak", "ca"]
+# Typical maxima, used to scale the radar when no cohort summary was exported.
+RADAR_MAXIMA = [100.0, 500.0, 200.0, 220.0, 6.0, 3.0]
+
+HEATMAP_COLORSCALE = [[0.0, "#0f172a"], [0.25, "#10b981"], [0.58, "#f59e0b"], [1.0, "#ef4444"]]
+
+
+def radar_figure(patient, cohort=None):
+    """Biomarker radar for a 13-feature patient tuple against the healthy baseline.
+
+    With a cohort summary (see cohort.py) each axis spans the cohort's 5th to
+    95th percentile and the baseline is the healthy-class median of the
+    patient's age band and sex; without one, axes are scaled by typical
+    maxima and no baseline is drawn.
+    """
+    p = dict(zip(FEATURES, patient))
+    raw = np.array([p[name] for name in RADAR_FEATURES])
+    if cohort is not None:
+        lo_q, hi_q = cohort["quantiles"].index(0.05), cohort["quantiles"].index(0.95)
+        lo = np.array([cohort["overall"][name][lo_q] for name in RADAR_FEATURES])
+        span = np.array([cohort["overall"][name][hi_q] for name in RADAR_FEATURES]) - lo
+        span[span == 0.0] = 1.0
+    else:
+        lo, span = np.zeros(len(RADAR_FEATURES)), np.array(RADAR_MAXIMA)
+    radar_values = np.clip((raw - lo) / span, 0.0, 1.0).tolist()
+
+    # Closing the loop for Plotly
+    r_closed = radar_values + [radar_values[0]]
+    theta_closed = RADAR_LABELS + [RADAR_LABELS[0]]
+    raw_closed = [f"{v:g}" for v in raw] + [f"{raw[0]:g}"]
+
+    fig_radar = go.Figure()
+    fig_radar.add_trace(
+        go.Scatterpolar(
+            r=r_closed,
+            theta=theta_closed,
+            fill="toself",
+            fillcolor="rgba(225, 29, 72, 0.2)",
+            line=dict(color="#fb7185", width=3),
+            name="Patient Data",
+            text=raw_closed, hovertemplate="%{theta}: %{text}<extra></extra>",
+        )
+    )
+    if cohort is not None:
+        baseline, described = healthy_baseline(cohort, p["age"], p["sex"])
+        median = cohort["quantiles"].index(0.5)
+        base_raw = np.array([baseline[name][median] for name in RADAR_FEATURES])
+        base_values = np.clip((base_raw - lo) / span, 0.0, 1.0).tolist()
+        fig_radar.add_trace(
+            go.Scatterpolar(
+                r=base_values + [base_values[0]],
+                theta=theta_closed,
+                mode="lines",
+                line=dict(color="rgba(6, 182, 212, 0.5)", width=2, dash="dot"),
+                name=f"Healthy Baseline ({described})",
+                text=[f"{v:.4g}" for v in base_raw] + [f"{base_raw[0]:.4g}"],
+                hovertemplate="%{theta}: %{text}<extra></extra>",
+            )
+        )
+
+    fig_radar.update_layout(
+        polar=dict(
+            bgcolor="rgba(0,0,0,0)",
+            radialaxis=dict(gridcolor="rgba(225,29,72,0.15)", color="rgba(225,29,72,0.5)", range=[0, 1]),
+            angularaxis=dict(gridcolor="rgba(225,29,72,0.15)", color="#67e8f9"),
+        ),
+        paper_bgcolor="rgba(0,0,0,0)",
+        font=dict(family="JetBrains Mono", size=11),
+        height=450,
+        margin=dict(l=40, r=40, t=40, b=40),
+        legend=dict(orientation="h", yanchor="bottom", y=-0.2, xanchor="center", x=0.5, font=dict(color="#f8fafc"))
+    )
+    return fig_radar
+
+
+def distribution_figure(score, population, rank=None):
+    """Reference-cohort severity density (see population.py) with the patient's score and percentile marked."""
+    fig_dist = go.Figure()
+    if population is not None:
+        fig_dist.add_trace(
+            go.Scatter(
+                x=population["kde"]["x"], y=population["kde"]["y"],
+                mode="lines", fill="tozeroy", fillcolor="rgba(6, 182, 212, 0.1)",
+                line=dict(color="#06b6d4", width=3, shape="spline"),
+                name=f"Reference Cohort (n={population['n']:,})"
+            )
+        )
+    # Add patient line
+    label = f"Patient: {score}" if rank is None else f"Patient: {score} · percentile {rank:.0f}"
+    fig_dist.add_vline(
+        x=score, line=dict(color="#fb7185", width=3, dash="dash"),
+        annotation_text=label, annotation_font_color="#fb7185", annotation_position="top right"
+    )
+
+    fig_dist.update_layout(
+        paper_bgcolor="rgba(0,0,0,0)", plot_bgcolor="rgba(225,29,72,0.02)",
+        font=dict(family="Inter", color="#f8fafc"),
+        xaxis=dict(title="Severity Score", range=[0, 3], gridcolor="rgba(255,255,255,0.05)"),
+        yaxis=dict(title="Density", gridcolor="rgba(255,255,255,0.05)", showticklabels=False),
+        height=450,
+        margin=dict(l=20, r=20, t=40, b=20),
+        showlegend=False
+    )
+    return fig_dist
+
+
+def cholesterol_figure(chol_range, sim_scores, current_chol):
+    """Predicted severity across simulated cholesterol values."""
+    fig_sim = go.Figure()
+    fig_sim.add_trace(
+        go.Scatter(
+            x=list(chol_range), y=list(sim_scores),
+            mode="lines",
+            line=dict(color="#e11d48", width=3, shape="hv"),
+            fill="tozeroy", fillcolor="rgba(225, 29, 72, 0.08)",
+        )
+    )
+    fig_sim.add_vline(
+        x=current_chol, line=dict(color="#06b6d4", width=2, dash="dash"),
+        annotation_text=f"Current: {current_chol:g} mg/dl", annotation_font_color="#06b6d4"
+    )
+    fig_sim.update_layout(
+        paper_bgcolor="rgba(0,0,0,0)", plot_bgcolor="rgba(0,0,0,0)",
+        font=dict(family="Inter", color="#f8fafc"),
+        xaxis=dict(title="Simulated Cholesterol (mg/dl)", gridcolor="rgba(255,255,255,0.05)"),
+        yaxis=dict(title="Predicted Severity", range=[0, 3], gridcolor="rgba(255,255,255,0.05)"),
+        height=350, margin=dict(l=20, r=20, t=20, b=20)
+    )
+    return fig_sim
+
+
+def heatmap_figure(x_feature, y_feature, x_axis, y_axis, risk_grid, patient_x, patient_y):
+    """Predicted severity over a two-feature grid with the patient marked."""
+    fig_hm = go.Figure()
+    fig_hm.add_trace(
+        go.Heatmap(
+            x=list(x_axis), y=list(y_axis), z=np.asarray(risk_grid).T.tolist(),
+            zmin=0, zmax=3,
+            colorscale=HEATMAP_COLORSCALE,
+            colorbar=dict(title="Severity"),
+        )
+    )
+    fig_hm.add_trace(
+        go.Scatter(
+            x=[patient_x], y=[patient_y],
+            mode="markers",
+            marker=dict(color="#f8fafc", size=12, symbol="x", line=dict(color="#06b6d4", width=2)),
+            name="Patient",
+        )
+    )
+    fig_hm.update_layout(
+        paper_bgcolor="rgba(0,0,0,0)", plot_bgcolor="rgba(0,0,0,0)",
+        font=dict(family="Inter", color="#f8fafc"),
+        xaxis=dict(title=x_feature), yaxis=dict(title=y_feature),
+        height=450, margin=dict(l=20, r=20, t=20, b=20),
+        showlegend=False
+    )
+    return fig_hm
+
+
+# Biomarkers charted under the severity trend: (column, label, color).
+HISTORY_MARKERS = [
+    ("chol", "Cholesterol (mg/dl)", "#f59e0b"),
+    ("trestbps", "Resting BP (mm Hg)", "#06b6d4"),
+    ("thalach", "Max HR (BPM)", "#a78bfa"),
+]
+
+
+def history_figure(history):
+    """Severity and key biomarkers across visits for one page of a patient's history.
+
+    `history` is a dict of column lists, newest first (see audit.AuditLog.history).
+    """
+    visits = [time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(ts)) for ts in reversed(history["ts"])]
+    series = {name: list(reversed(values)) for name, values in history.items()}
+
+    fig = make_subplots(rows=3, cols=1, shared_xaxes=True, vertical_spacing=0.06, row_heights=[0.4, 0.35, 0.25])
+    fig.add_trace(
+        go.Scatter(
+            x=visits, y=series["severity"], mode="lines+markers", name="Severity",
+            line=dict(color="#e11d48", width=3), marker=dict(size=7),
+            customdata=series["risk_band"], hovertemplate="%{y:.2f} · %{customdata}<extra></extra>",
+        ),
+        row=1, col=1,
+    )
+    for column, label, color in HISTORY_MARKERS:
+        fig.add_trace(
+            go.Scatter(x=visits, y=series[column], mode="lines+markers", name=label,
+                       line=dict(color=color, width=2), marker=dict(size=5)),
+            row=2, col=1,
+        )
+    fig.add_trace(
+        go.Scatter(x=visits, y=series["oldpeak"], mode="lines+markers", name="ST Depression",
+                   line=dict(color="#10b981", width=2), marker=dict(size=5)),
+        row=3, col=1,
+    )
+    grid = dict(gridcolor="rgba(255,255,255,0.05)")
+    fig.update_yaxes(title_text="Severity", range=[0, 3], row=1, col=1, **grid)
+    fig.update_yaxes(title_text="Vitals", row=2, col=1, **grid)
+    fig.update_yaxes(title_text="Oldpeak", row=3, col=1, **grid)
+    fig.update_xaxes(**grid)
+    fig.update_layout(
+        paper_bgcolor="rgba(0,0,0,0)", plot_bgcolor="rgba(0,0,0,0)",
+        font=dict(family="Inter", color="#f8fafc"),
+        height=560, margin=dict(l=20, r=20, t=20, b=20),
+        legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="center", x=0.5),
+    )
+    return fig
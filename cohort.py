@@ -0,0 +1,161 @@
+# ============================================================
+# 🫀 Heart Health Intelligence Platform — Cohort Quantiles
+# Per-feature quantile summary of the reference cohort
+# ============================================================
+"""
+Usage:
+    python cohort.py artifacts/ [--data heart.csv]
+
+Summarizes the 13 raw features of the reference cohort as quantiles
+(QUANTILES) for the whole cohort, each target class, and each class within
+age band × sex strata, and writes them as `cohort.json` next to the
+manifest. The radar chart normalizes biomarkers by the cohort's 5th–95th
+percentile range and draws the healthy (class 0) medians as its baseline,
+from the patient's own stratum when it holds at least MIN_STRATUM_ROWS
+patients.
+
+By default the cohort is the model's reference set, read from the
+unscaled training rows the artifacts were exported with
+(raw_reference.npy). Without that file `--data` is required: scaling the
+reference matrix back only gives real values when the scaler is the one
+the model was fit with, and a wrong one yields impossible quantiles (a
+0/1 feature reaching 1.09). `--data` summarizes a CSV such as heart.csv.
+Every group is computed in one groupby pass over a frame that stacks the
+cohort once per grouping level.
+"""
+
+import argparse
+import json
+import time
+from pathlib import Path
+
+import numpy as np
+
+from artifacts import read_manifest
+from inference import FEATURES
+
+COHORT_FILE = "cohort.json"
+QUANTILES = (0.05, 0.25, 0.5, 0.75, 0.95)
+AGE_BANDS = [(45, "<45"), (55, "45-54"), (65, "55-64"), (float("inf"), "65+")]
+HEALTHY_CLASS = "0"
+# Smaller strata fall back to the class-wide baseline.
+MIN_STRATUM_ROWS = 20
+
+
+def age_band(age):
+    for upper, label in AGE_BANDS:
+        if age < upper:
+            return label
+    return AGE_BANDS[-1][1]
+
+
+def stratum_key(target, age, sex):
+    return f"{target}|{age_band(age)}|{int(sex)}"
+
+
+def reference_frame(artifact_dir):
+    """The artifact directory's unscaled training rows (raw_reference.npy), with a `target` column."""
+    import pandas as pd
+
+    artifact_dir = Path(artifact_dir)
+    if "raw_reference" not in read_manifest(artifact_dir)["sha256"]:
+        raise ValueError(f"{artifact_dir} was exported without its training rows (raw_reference.npy); "
+                         "re-export with them or summarize a CSV with --data")
+    arrays = {name: np.load(artifact_dir / f"{name}.npy") for name in ("raw_reference", "labels", "classes")}
+    frame = pd.DataFrame(arrays["raw_reference"], columns=FEATURES)
+    frame["target"] = arrays["classes"][arrays["labels"]]
+    return frame
+
+
+def summarize_cohort(frame, target="target"):
+    """Quantiles of every feature for the cohort, each class and each class × age band × sex stratum."""
+    import pandas as pd
+
+    class_values, class_codes = np.unique(frame[target].to_numpy().astype(int), return_inverse=True)
+    band_codes = np.searchsorted([upper for upper, _ in AGE_BANDS], frame["age"].to_numpy(), side="right")
+    sex_codes = frame["sex"].to_numpy().astype(int).clip(0, 1)
+    stratum_codes = (class_codes * len(AGE_BANDS) + band_codes) * 2 + sex_codes
+
+    # Group 0 is the whole cohort, then one group per class, then one per stratum.
+    keys = ["all"] + [str(c) for c in class_values] + [
+        f"{c}|{label}|{sex}" for c in class_values for _, label in AGE_BANDS for sex in (0, 1)]
+    values = frame[FEATURES].to_numpy(dtype=float)
+    codes = np.concatenate([np.zeros(len(frame), dtype=np.intp), 1 + class_codes, 1 + len(class_values) + stratum_codes])
+    grouped = pd.DataFrame(np.concatenate([values, values, values]), columns=FEATURES).groupby(codes, sort=True)
+    quantiles = grouped.quantile(list(QUANTILES))  # index: (group code, quantile)
+    sizes = grouped.size()
+    groups = {
+        keys[code]: {"n": int(sizes[code]), **{name: np.round(rows[name].to_numpy(), 4).tolist() for name in FEATURES}}
+        for code, rows in quantiles.groupby(level=0)
+    }
+    return {
+        "quantiles": list(QUANTILES),
+        "overall": groups.pop("all"),
+        "classes": {str(c): groups.pop(str(c)) for c in class_values},
+        "strata": groups,
+    }
+
+
+def write_cohort(artifact_dir, data=None):
+    """Writes cohort.json for an artifact directory, from its reference rows or the CSV at `data`."""
+    artifact_dir = Path(artifact_dir)
+    if data is None:
+        frame = reference_frame(artifact_dir)
+        source = {"raw_reference_sha256": read_manifest(artifact_dir)["sha256"]["raw_reference"]}
+    else:
+        from train import load_dataset
+
+        X, y = load_dataset(data)
+        frame = X.assign(target=y)
+        source = {"data": str(data)}
+    cohort = {"created": time.strftime("%Y-%m-%d %H:%M:%S"), "source": source, **summarize_cohort(frame)}
+    (artifact_dir / COHORT_FILE).write_text(json.dumps(cohort) + "\n")
+    return cohort
+
+
+def load_cohort(artifact_dir):
+    """The stored summary, or None when missing or not built from these training rows or a CSV.
+
+    Summaries of reference rows scaled back with the scaler (written before
+    raw_reference.npy existed) are ignored, so the radar falls back to its
+    fixed axes instead of drawing bands from them.
+    """
+    try:
+        cohort = json.loads((Path(artifact_dir) / COHORT_FILE).read_text())
+        manifest = read_manifest(artifact_dir)
+    except (OSError, ValueError):
+        return None
+    if "data" in cohort["source"]:
+        return cohort
+    expected = cohort["source"].get("raw_reference_sha256")
+    if expected is None or expected != manifest["sha256"].get("raw_reference"):
+        return None
+    return cohort
+
+
+def healthy_baseline(cohort, age, sex):
+    """Healthy-class quantiles for a patient: their age band × sex stratum if large enough, else the class.
+
+    Returns (quantile summary, description).
+    """
+    stratum = cohort["strata"].get(stratum_key(HEALTHY_CLASS, age, sex))
+    if stratum is not None and stratum["n"] >= MIN_STRATUM_ROWS:
+        return stratum, f"age {age_band(age)}, {'male' if int(sex) == 1 else 'female'}, n={stratum['n']}"
+    summary = cohort["classes"][HEALTHY_CLASS]
+    return summary, f"n={summary['n']}"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Write per-feature quantiles of the reference cohort.")
+    parser.add_argument("artifacts", help="exported artifact directory (see artifacts.py)")
+    parser.add_argument("--data", help="summarize this CSV (13 features + 'target') instead of the reference rows")
+    args = parser.parse_args(argv)
+
+    cohort = write_cohort(args.artifacts, args.data)
+    classes = ", ".join(f"class {key}: {summary['n']}" for key, summary in cohort["classes"].items())
+    print(f"wrote {Path(args.artifacts) / COHORT_FILE} ({cohort['overall']['n']} rows; {classes}; "
+          f"{len(cohort['strata'])} strata)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,212 @@
+# ============================================================
+# 🫀 Heart Health Intelligence Platform — Inference Engine
+# Shared model loading and vectorized prediction helpers
+# ============================================================
+
+import os
+import pickle
+
+import numpy as np
+
+from artifacts import open_artifacts
+from neighbors import IndexedKNN, IVFIndex
+from pipeline import KNNPipeline, SklearnPipeline
+
+# Column order expected by the inference pipeline.
+FEATURES = [
+    "age", "sex", "cp", "trestbps", "chol", "fbs",
+    "restecg", "thalach", "exang", "oldpeak", "slope", "ca", "thal",
+]
+
+# Input bounds mirrored from the tab1 widgets; discrete features are swept
+# over their integer levels instead of a continuous range.
+FEATURE_BOUNDS = {
+    "age": (1, 120, False), "sex": (0, 1, True), "cp": (0, 3, True),
+    "trestbps": (80, 200, False), "chol": (100, 600, False), "fbs": (0, 1, True),
+    "restecg": (0, 2, True), "thalach": (60, 220, False), "exang": (0, 1, True),
+    "oldpeak": (0.0, 10.0, False), "slope": (0, 2, True), "ca": (0, 3, True),
+    "thal": (1, 3, True),
+}
+
+# Inference engine: "numpy" serves predictions from the fused NumPy pipeline
+# (no scikit-learn import on the artifact path); "sklearn" runs the pickled
+# scaler and KNeighborsClassifier as trained, for parity checks or fallback.
+KNN_ENGINE = os.environ.get("HHI_KNN_ENGINE", "numpy")
+
+# Neighbor search backend: "exact" uses the saved index as built, "ivf"
+# switches to approximate clustered search (see neighbors.IVFIndex).
+KNN_BACKEND = os.environ.get("HHI_KNN_BACKEND", "exact")
+IVF_NPROBE = int(os.environ["HHI_IVF_NPROBE"]) if "HHI_IVF_NPROBE" in os.environ else None
+
+# Severity cut-offs shared by the UI, the batch scorer and reports:
+# (upper bound, risk band label, result-box CSS class).
+RISK_BANDS = [
+    (0.75, "Low Risk Profile", "risk-low"),
+    (1.75, "Moderate Risk Profile", "risk-mod"),
+    (float("inf"), "High Risk Profile", "risk-high"),
+]
+
+# Rows predicted per call when sweeping large grids. Keeps the
+# working set to a few hundred kilobytes regardless of grid size.
+SWEEP_CHUNK = 4096
+
+
+def load_artifacts(model_path="model.pkl", scaler_path="scaler.pkl", index_path=None,
+                   backend=KNN_BACKEND, nprobe=IVF_NPROBE, artifact_dir=None, engine=KNN_ENGINE):
+    """Loads the fused KNN inference pipeline (see pipeline.KNNPipeline) from disk.
+
+    Sources are tried in order: a memory-mapped `artifact_dir` (see
+    artifacts.py), then the pickled scaler combined with a prebuilt
+    neighbor index at `index_path` (see neighbors.py), then the pickled
+    scaler and KNeighborsClassifier. `backend="ivf"` serves predictions
+    from an approximate IVF index instead (clustering the reference set if
+    the source is exact) and `nprobe` sets its recall/latency trade-off.
+    `engine="sklearn"` skips all of that and returns the pickled scaler and
+    model unchanged (see pipeline.SklearnPipeline).
+    """
+    if engine == "sklearn":
+        if backend == "ivf":
+            raise ValueError("the IVF backend needs the numpy engine")
+        with open(model_path, "rb") as f:
+            model = pickle.load(f)
+        with open(scaler_path, "rb") as f:
+            scaler = pickle.load(f)
+        return SklearnPipeline(model, scaler)
+    if engine != "numpy":
+        raise ValueError(f"unknown inference engine {engine!r}; expected 'numpy' or 'sklearn'")
+
+    if artifact_dir is not None and os.path.exists(os.path.join(artifact_dir, "manifest.json")):
+        pipeline = open_artifacts(artifact_dir)
+    else:
+        with open(scaler_path, "rb") as f:
+            scaler = pickle.load(f)
+        if index_path is not None and os.path.exists(index_path):
+            # The saved index holds plain standardized rows, so the mean is applied per query.
+            inv_scale = 1.0 / scaler.scale_
+            pipeline = KNNPipeline(IndexedKNN.load(index_path), inv_scale, shift=-scaler.mean_ * inv_scale)
+        else:
+            with open(model_path, "rb") as f:
+                model = pickle.load(f)
+            pipeline = KNNPipeline.from_estimator(model, scaler)
+
+    if backend == "ivf":
+        if pipeline.knn.p != 2:
+            raise ValueError("the IVF backend supports Euclidean models only")
+        if not isinstance(pipeline.knn.index, IVFIndex):
+            pipeline.knn = pipeline.knn.with_index(IVFIndex.build(pipeline.knn.index.reference))
+        if nprobe is not None:
+            pipeline.knn.index.nprobe = nprobe
+    return pipeline
+
+
+def add_model_arguments(parser):
+    """Adds the model-source options shared by the command-line entry points (server, batch scorer)."""
+    parser.add_argument("--model", default="model.pkl")
+    parser.add_argument("--scaler", default="scaler.pkl")
+    parser.add_argument("--index", default="knn_index.pkl", help="prebuilt neighbor index, used when present")
+    parser.add_argument("--artifacts", default="artifacts", help="memory-mapped artifact directory, used when present")
+    parser.add_argument("--backend", default=KNN_BACKEND, choices=["exact", "ivf"], help="neighbor search backend")
+    parser.add_argument("--nprobe", type=int, default=IVF_NPROBE, help="clusters probed per query with --backend ivf")
+
+
+def model_source(args):
+    """The `load_artifacts` arguments chosen by `add_model_arguments` options, in order."""
+    return (args.model, args.scaler, args.index, args.backend, args.nprobe, args.artifacts)
+
+
+# Inference pipeline of the current worker process (set by init_worker).
+_worker_pipeline = None
+
+
+def init_worker(*source):
+    """Process-pool initializer: loads the pipeline once per worker from a `model_source` tuple."""
+    global _worker_pipeline
+    _worker_pipeline = load_artifacts(*source)
+
+
+def worker_pipeline():
+    return _worker_pipeline
+
+
+def classify_risk(score):
+    """Maps a severity score to its (risk band label, CSS class)."""
+    for upper, label, css_class in RISK_BANDS:
+        if score < upper:
+            return label, css_class
+    return RISK_BANDS[-1][1:]
+
+
+def missing_features(columns):
+    """Lists the model features absent from a table's columns."""
+    return [name for name in FEATURES if name not in set(columns)]
+
+
+def invalid_rows(frame):
+    """Index labels of rows whose 13 features are not all finite numbers (blank, text, inf)."""
+    import pandas as pd  # callers already hold a DataFrame
+
+    values = frame[FEATURES].apply(pd.to_numeric, errors="coerce").to_numpy(dtype=float)
+    return frame.index[~np.isfinite(values).all(axis=1)]
+
+
+def describe_rows(labels, limit=10):
+    """"row N" / "rows N, M, …" (1-based, header excluded) for 0-based row index labels."""
+    shown = ", ".join(f"{label + 1:,}" for label in labels[:limit])
+    more = f" … ({len(labels):,} in total)" if len(labels) > limit else ""
+    return f"row{'s' if len(labels) > 1 else ''} {shown}{more}"
+
+
+def score_frame(pipeline, frame):
+    """Adds `severity` and `risk_band` columns to a DataFrame of patients.
+
+    Raises ValueError naming the rows (by index label + 1) whose features
+    are missing or non-numeric.
+    """
+    missing = missing_features(frame.columns)
+    if missing:
+        raise ValueError(f"missing feature columns: {', '.join(missing)}")
+    bad = invalid_rows(frame)
+    if len(bad):
+        raise ValueError(f"blank, non-numeric or infinite feature values in {describe_rows(bad)}")
+    severity = np.round(pipeline.predict(frame[FEATURES].to_numpy(dtype=float)).astype(float), 2)
+    bands = np.array([label for _, label, _ in RISK_BANDS])
+    upper = np.array([u for u, _, _ in RISK_BANDS])
+    return frame.assign(severity=severity, risk_band=bands[np.searchsorted(upper, severity, side="right")])
+
+
+def patient_vector(state):
+    """Builds the 13-feature patient vector from a mapping such as `st.session_state`."""
+    return np.array([float(state[name]) for name in FEATURES])
+
+
+def feature_axis(name, resolution):
+    """Returns the values to sweep for one feature within its input bounds."""
+    lo, hi, discrete = FEATURE_BOUNDS[name]
+    if discrete:
+        return np.arange(lo, hi + 1, dtype=float)
+    return np.linspace(lo, hi, resolution)
+
+
+def sweep(pipeline, base, axes, chunk_size=SWEEP_CHUNK):
+    """Predicts severity over a grid of feature values around one patient.
+
+    `axes` maps feature names to 1-D arrays of values to try. Every other
+    feature keeps its value from `base`. Grid rows are generated and
+    predicted `chunk_size` at a time, so memory stays bounded for dense
+    grids; the result has one dimension per axis, in the order the axes
+    were given, clipped to the 0–3 severity range.
+    """
+    base = np.asarray(base, dtype=float)
+    columns = [FEATURES.index(name) for name in axes]
+    values = [np.asarray(v, dtype=float) for v in axes.values()]
+    shape = tuple(len(v) for v in values)
+
+    preds = np.empty(int(np.prod(shape)))
+    for start in range(0, preds.size, chunk_size):
+        flat = np.arange(start, min(start + chunk_size, preds.size))
+        rows = np.tile(base, (flat.size, 1))
+        for col, axis_values, idx in zip(columns, values, np.unravel_index(flat, shape)):
+            rows[:, col] = axis_values[idx]
+        preds[start:start + flat.size] = pipeline.predict_trusted(rows)
+
+    return np.clip(preds, 0.0, 3.0).reshape(shape)
@@ -0,0 +1,362 @@
+# ============================================================
+# 🫀 Heart Health Intelligence Platform — Neighbor Indexes
+# Prebuilt nearest-neighbor search over the standardized reference set
+# ============================================================
+"""
+Usage:
+    python neighbors.py model.pkl knn_index.pkl [--method auto|blocked|kd_tree|ball_tree|ivf]
+
+Builds a persistent neighbor index from the fitted KNeighborsClassifier
+and saves it next to the model. `inference.load_artifacts` picks it up and
+answers predictions from the index directly, skipping the estimator's
+per-call validation and dispatch.
+
+The "ivf" method is approximate: it searches only the `nprobe` k-means
+clusters nearest to each query. Use benchmarks/bench_ann.py to measure
+recall@k against exact search before picking `nprobe`.
+"""
+
+import argparse
+import pickle
+
+import numpy as np
+
+# Reference sets at or below this size use exact blocked search; a single
+# matrix product beats tree traversal up to tens of thousands of rows
+# (see benchmarks/bench_neighbors.py).
+BLOCKED_MAX_ROWS = 50_000
+
+# Upper bound on the query × reference distance block held in memory
+# (float64 elements, i.e. ~32 MB).
+BLOCK_ELEMENTS = 4_000_000
+
+# Clusters probed per query by IVFIndex unless overridden at load time;
+# ~0.98 recall@15 on a 300k-row cohort (benchmarks/bench_ann.py).
+DEFAULT_NPROBE = 16
+
+
+class BlockedIndex:
+    """Exact Euclidean search by blocked matrix products.
+
+    Uses ‖a − b‖² = ‖a‖² + ‖b‖² − 2a·b so each block of queries costs one
+    matmul against the reference matrix, then selects the k smallest with
+    `argpartition`.
+    """
+
+    def __init__(self, reference, sq_norms=None):
+        self.reference = np.ascontiguousarray(reference, dtype=float)
+        if sq_norms is None:
+            sq_norms = np.einsum("ij,ij->i", self.reference, self.reference)
+        self.sq_norms = sq_norms
+
+    def __len__(self):
+        return len(self.reference)
+
+    def query(self, X, k):
+        """Returns (distances, indices) of the k nearest rows, nearest first."""
+        X = np.asarray(X, dtype=float)
+        k = min(k, len(self))
+        dist = np.empty((len(X), k))
+        ind = np.empty((len(X), k), dtype=np.intp)
+        block = max(1, BLOCK_ELEMENTS // len(self))
+
+        for start in range(0, len(X), block):
+            xb = X[start:start + block]
+            d2 = np.einsum("ij,ij->i", xb, xb)[:, None] + self.sq_norms - 2.0 * (xb @ self.reference.T)
+            part = np.argpartition(d2, k - 1, axis=1)[:, :k]
+            part_d2 = np.take_along_axis(d2, part, axis=1)
+            order = np.argsort(part_d2, axis=1, kind="stable")
+            ind[start:start + len(xb)] = np.take_along_axis(part, order, axis=1)
+            dist[start:start + len(xb)] = np.sqrt(np.maximum(np.take_along_axis(part_d2, order, axis=1), 0.0))
+
+        return dist, ind
+
+
+class MinkowskiIndex:
+    """Exact Minkowski-p search (p ≠ 2) by blocked brute force.
+
+    The matmul expansion behind BlockedIndex only holds for p = 2, so each
+    block of queries is compared coordinate-wise against the reference
+    matrix instead. Ranking uses Σ|a − b|^p; only the k kept distances pay
+    for the p-th root.
+    """
+
+    def __init__(self, reference, p):
+        self.reference = np.ascontiguousarray(reference, dtype=float)
+        self.p = float(p)
+
+    def __len__(self):
+        return len(self.reference)
+
+    def query(self, X, k):
+        """Returns (distances, indices) of the k nearest rows, nearest first."""
+        X = np.asarray(X, dtype=float)
+        k = min(k, len(self))
+        dist = np.empty((len(X), k))
+        ind = np.empty((len(X), k), dtype=np.intp)
+        block = max(1, BLOCK_ELEMENTS // (len(self) * self.reference.shape[1]))
+
+        for start in range(0, len(X), block):
+            diff = np.abs(X[start:start + block, None, :] - self.reference)
+            dp = (diff if self.p == 1.0 else diff ** self.p).sum(axis=2)
+            part = np.argpartition(dp, k - 1, axis=1)[:, :k]
+            part_dp = np.take_along_axis(dp, part, axis=1)
+            order = np.argsort(part_dp, axis=1, kind="stable")
+            ind[start:start + len(dp)] = np.take_along_axis(part, order, axis=1)
+            kept = np.take_along_axis(part_dp, order, axis=1)
+            dist[start:start + len(dp)] = kept if self.p == 1.0 else kept ** (1.0 / self.p)
+
+        return dist, ind
+
+
+class TreeIndex:
+    """KD-tree or ball tree over the reference set (scikit-learn implementation)."""
+
+    def __init__(self, tree, p=2.0):
+        self.tree = tree
+        self.p = float(p)
+
+    @classmethod
+    def build(cls, reference, kind="kd_tree", leaf_size=30, p=2):
+        from sklearn.neighbors import BallTree, KDTree
+
+        tree_cls = {"kd_tree": KDTree, "ball_tree": BallTree}[kind]
+        return cls(tree_cls(np.asarray(reference, dtype=float), leaf_size=leaf_size, metric="minkowski", p=p), p)
+
+    def __len__(self):
+        return self.tree.data.shape[0]
+
+    @property
+    def reference(self):
+        return np.asarray(self.tree.data)
+
+    def query(self, X, k):
+        """Returns (distances, indices) of the k nearest rows, nearest first."""
+        return self.tree.query(np.asarray(X, dtype=float), k=min(k, len(self)))
+
+
+def kmeans(X, n_clusters, iterations=10, sample_size=100_000, seed=0):
+    """Lloyd's k-means on a random sample of X; returns the centroids."""
+    rng = np.random.default_rng(seed)
+    if len(X) > sample_size:
+        X = X[rng.choice(len(X), sample_size, replace=False)]
+    centroids = X[rng.choice(len(X), n_clusters, replace=False)].copy()
+    for _ in range(iterations):
+        assign = BlockedIndex(centroids).query(X, 1)[1][:, 0]
+        counts = np.bincount(assign, minlength=n_clusters)
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, assign, X)
+        filled = counts > 0
+        centroids[filled] = sums[filled] / counts[filled, None]
+    return centroids
+
+
+class IVFIndex:
+    """Approximate search over an inverted file of k-means clusters.
+
+    Each query is compared exactly against the rows of its `nprobe`
+    nearest clusters only (more if those hold fewer than k rows). Raising
+    `nprobe` trades latency for recall; probing every cluster is exact.
+    """
+
+    def __init__(self, reference, centroids, assignments, nprobe=DEFAULT_NPROBE):
+        self.reference = np.ascontiguousarray(reference, dtype=float)
+        self.centroids = np.asarray(centroids, dtype=float)
+        self.assignments = np.asarray(assignments, dtype=np.intp)
+        self.nprobe = nprobe
+        self._sq_norms = np.einsum("ij,ij->i", self.reference, self.reference)
+        self._centroid_index = BlockedIndex(self.centroids)
+        # Row ids grouped by cluster: cluster c owns _order[_offsets[c]:_offsets[c + 1]].
+        self._order = np.argsort(self.assignments, kind="stable")
+        self._offsets = np.searchsorted(self.assignments[self._order], np.arange(len(self.centroids) + 1))
+
+    @classmethod
+    def build(cls, reference, n_lists=None, nprobe=DEFAULT_NPROBE):
+        """Clusters the reference set into ~√n lists."""
+        reference = np.asarray(reference, dtype=float)
+        n_lists = n_lists or max(1, int(np.sqrt(len(reference))))
+        centroids = kmeans(reference, n_lists)
+        assignments = BlockedIndex(centroids).query(reference, 1)[1][:, 0]
+        return cls(reference, centroids, assignments, nprobe)
+
+    def __len__(self):
+        return len(self.reference)
+
+    def query(self, X, k):
+        """Returns approximate (distances, indices) of the k nearest rows, nearest first."""
+        X = np.asarray(X, dtype=float)
+        k = min(k, len(self))
+        dist = np.empty((len(X), k))
+        ind = np.empty((len(X), k), dtype=np.intp)
+        sizes = np.diff(self._offsets)
+        _, probe_order = self._centroid_index.query(X, len(self.centroids))
+
+        for i, (row, probes) in enumerate(zip(X, probe_order)):
+            # Probe at least nprobe clusters, and enough of them to hold k rows.
+            n_probe = max(self.nprobe, int(np.searchsorted(np.cumsum(sizes[probes]), k)) + 1)
+            cand = np.concatenate([self._order[self._offsets[c]:self._offsets[c + 1]] for c in probes[:n_probe]])
+            d2 = self._sq_norms[cand] - 2.0 * (self.reference[cand] @ row) + row @ row
+            top = np.argpartition(d2, k - 1)[:k]
+            top = top[np.argsort(d2[top], kind="stable")]
+            ind[i] = cand[top]
+            dist[i] = np.sqrt(np.maximum(d2[top], 0.0))
+
+        return dist, ind
+
+
+def build_index(reference, method="auto", p=2):
+    """Builds a neighbor index; "auto" picks blocked search for small sets, else a KD-tree.
+
+    `p` is the Minkowski exponent (2: Euclidean, 1: Manhattan).
+    """
+    if method == "auto":
+        method = "blocked" if len(reference) <= BLOCKED_MAX_ROWS else "kd_tree"
+    if method == "blocked":
+        return BlockedIndex(reference) if p == 2 else MinkowskiIndex(reference, p)
+    if method == "ivf":
+        if p != 2:
+            raise ValueError("the IVF index supports Euclidean distance only")
+        return IVFIndex.build(reference)
+    return TreeIndex.build(reference, kind=method, p=p)
+
+
+def minkowski_p(model):
+    """The Minkowski exponent a fitted KNeighborsClassifier searches with.
+
+    Raises ValueError for metrics or weightings the NumPy engine does not
+    implement.
+    """
+    if model.weights not in ("uniform", "distance"):
+        raise ValueError("only uniform or distance-weighted KNN models are supported")
+    metric = model.effective_metric_
+    if metric == "euclidean":
+        return 2.0
+    if metric == "manhattan":
+        return 1.0
+    if metric == "minkowski":
+        return float(model.effective_metric_params_["p"])
+    raise ValueError(f"unsupported KNN metric {metric!r}; expected a Minkowski distance")
+
+
+def recall_at_k(approx, exact, queries, k):
+    """Fraction of the exact k nearest neighbors that `approx` also returns."""
+    _, approx_ind = approx.query(queries, k)
+    _, exact_ind = exact.query(queries, k)
+    hits = sum(len(np.intersect1d(a, e)) for a, e in zip(approx_ind, exact_ind))
+    return hits / exact_ind.size
+
+
+def vote_weights(dist):
+    """Inverse-distance vote weights, as KNeighborsClassifier(weights="distance").
+
+    A row with exact matches (distance 0) lets only those neighbors vote.
+    """
+    with np.errstate(divide="ignore"):
+        weights = 1.0 / dist
+    exact = np.isinf(weights)
+    rows = exact.any(axis=1)
+    weights[rows] = exact[rows]
+    return weights
+
+
+class IndexedKNN:
+    """KNN classifier answering `predict` from a prebuilt index.
+
+    `labels` are class indices into `classes`, as stored by scikit-learn.
+    `weights` is "uniform" (one vote per neighbor) or "distance" (votes
+    weighted by inverse distance). Ties in the vote go to the lowest class
+    index, matching `KNeighborsClassifier`.
+    """
+
+    def __init__(self, index, labels, classes, n_neighbors, weights="uniform"):
+        self.index = index
+        self.labels = np.asarray(labels, dtype=np.intp)
+        self.classes_ = np.asarray(classes)
+        self.n_neighbors = n_neighbors
+        self.weights = weights
+
+    @classmethod
+    def from_estimator(cls, model, method="auto"):
+        """Builds the index from a fitted KNeighborsClassifier."""
+        index = build_index(model._fit_X, method, p=minkowski_p(model))
+        return cls(index, model._y, model.classes_, model.n_neighbors, model.weights)
+
+    @property
+    def p(self):
+        """Minkowski exponent of the index (2 for Euclidean)."""
+        return getattr(self.index, "p", 2.0)
+
+    def with_index(self, index):
+        """Returns a copy of this classifier searching `index` instead."""
+        return IndexedKNN(index, self.labels, self.classes_, self.n_neighbors, self.weights)
+
+    def kneighbors(self, X, n_neighbors=None):
+        """Returns (distances, indices) into the reference set for each row of X."""
+        return self.index.query(X, n_neighbors or self.n_neighbors)
+
+    def predict(self, X):
+        return self.vote(*self.kneighbors(X))
+
+    def vote(self, dist, ind):
+        """Predicted class for each row of a (distances, reference indices) neighbor list."""
+        votes = self.labels[ind]
+        if self.weights == "distance":
+            weights = vote_weights(dist)
+            counts = np.stack([((votes == c) * weights).sum(axis=1) for c in range(len(self.classes_))], axis=1)
+        else:
+            counts = np.stack([(votes == c).sum(axis=1) for c in range(len(self.classes_))], axis=1)
+        return self.classes_[counts.argmax(axis=1)]
+
+    def save(self, path):
+        """Writes the index artifact. Only NumPy/scikit-learn objects are pickled."""
+        if isinstance(self.index, BlockedIndex):
+            method, data = "blocked", self.index.reference
+        elif isinstance(self.index, MinkowskiIndex):
+            method, data = "minkowski", {"reference": self.index.reference, "p": self.index.p}
+        elif isinstance(self.index, IVFIndex):
+            method = "ivf"
+            data = {
+                "reference": self.index.reference, "centroids": self.index.centroids,
+                "assignments": self.index.assignments, "nprobe": self.index.nprobe,
+            }
+        else:
+            method, data = "tree", {"tree": self.index.tree, "p": self.index.p}
+        payload = {
+            "method": method, "data": data, "labels": self.labels,
+            "classes": self.classes_, "n_neighbors": self.n_neighbors, "weights": self.weights,
+        }
+        with open(path, "wb") as f:
+            pickle.dump(payload, f, protocol=pickle.HIGHEST_PROTOCOL)
+
+    @classmethod
+    def load(cls, path):
+        with open(path, "rb") as f:
+            payload = pickle.load(f)
+        if payload["method"] == "blocked":
+            index = BlockedIndex(payload["data"])
+        elif payload["method"] == "minkowski":
+            index = MinkowskiIndex(**payload["data"])
+        elif payload["method"] == "ivf":
+            index = IVFIndex(**payload["data"])
+        else:
+            index = TreeIndex(**payload["data"])
+        return cls(index, payload["labels"], payload["classes"], payload["n_neighbors"],
+                   payload.get("weights", "uniform"))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build a persistent neighbor index from a fitted KNN model.")
+    parser.add_argument("model", help="pickled KNeighborsClassifier")
+    parser.add_argument("output", help="where to write the index artifact")
+    parser.add_argument("--method", default="auto", choices=["auto", "blocked", "kd_tree", "ball_tree", "ivf"])
+    args = parser.parse_args(argv)
+
+    with open(args.model, "rb") as f:
+        model = pickle.load(f)
+    knn = IndexedKNN.from_estimator(model, args.method)
+    knn.save(args.output)
+    print(f"wrote {args.output} ({type(knn.index).__name__}, {len(knn.index):,} reference rows)")
+
+
+if __name__ == "__main__":
+    main()
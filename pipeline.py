@@ -0,0 +1,126 @@
+# ============================================================
+# 🫀 Heart Health Intelligence Platform — Fused Inference Pipeline
+# StandardScaler + KNN classifier as a single prediction object
+# ============================================================
+
+import numpy as np
+
+from neighbors import IndexedKNN, build_index, minkowski_p
+
+N_FEATURES = 13
+
+
+def check_rows(X):
+    """Validates raw patient rows once: a finite float matrix with 13 columns."""
+    X = np.asarray(X, dtype=float)
+    if X.ndim == 1:
+        X = X.reshape(1, -1)
+    if X.ndim != 2 or X.shape[1] != N_FEATURES:
+        raise ValueError(f"expected rows of {N_FEATURES} features, got shape {X.shape}")
+    if not np.isfinite(X).all():
+        raise ValueError("feature rows contain NaN or infinite values")
+    return X
+
+
+class KNNPipeline:
+    """Standardization and KNN voting fused into one object.
+
+    Minkowski distances are unchanged by shifting both points, so
+    ‖(x − mean)/scale − r‖ = ‖x/scale − (r + mean/scale)‖. The reference
+    rows are stored with the mean already folded in, which leaves a single
+    multiply by `inv_scale` per query. `shift` supports indexes built over
+    the plain standardized rows (query = x · inv_scale + shift).
+    `raw_reference` holds the unscaled training rows when they were
+    exported (see artifacts.py).
+    """
+
+    def __init__(self, knn, inv_scale, shift=None, raw_reference=None):
+        self.knn = knn
+        self.inv_scale = np.asarray(inv_scale, dtype=float)
+        self.shift = None if shift is None else np.asarray(shift, dtype=float)
+        self.raw_reference = raw_reference
+        self.classes_ = knn.classes_
+        self.n_neighbors = knn.n_neighbors
+        self.weights = knn.weights
+        self.p = knn.p
+
+    @classmethod
+    def from_estimator(cls, model, scaler, method="auto"):
+        """Fuses a fitted StandardScaler and KNeighborsClassifier."""
+        p = minkowski_p(model)
+        inv_scale = 1.0 / np.asarray(scaler.scale_, dtype=float)
+        reference = np.asarray(model._fit_X, dtype=float) + scaler.mean_ * inv_scale
+        knn = IndexedKNN(build_index(reference, method, p), model._y, model.classes_, model.n_neighbors, model.weights)
+        return cls(knn, inv_scale)
+
+    def transform(self, X):
+        """Maps raw rows into the space the neighbor index was built in."""
+        Q = X * self.inv_scale
+        return Q if self.shift is None else Q + self.shift
+
+    def predict_trusted(self, X):
+        """Fast path for a float N×13 matrix built by the app itself; no validation."""
+        return self.knn.predict(self.transform(X))
+
+    def predict(self, X):
+        """Validates raw patient rows and predicts their class."""
+        return self.predict_trusted(check_rows(X))
+
+    def kneighbors(self, X, n_neighbors=None):
+        """Returns (distances, reference indices) of the nearest training patients."""
+        return self.knn.kneighbors(self.transform(check_rows(X)), n_neighbors)
+
+    def reference_rows(self, ind):
+        """Training patients by reference index, as (feature rows, class values).
+
+        Rows come from `raw_reference` when it was exported. Otherwise they
+        are scaled back from the reference matrix, which gives raw units
+        only if this scaler is the one the model was fit with. Only the
+        requested rows are read, so a memory-mapped reference set (see
+        artifacts.py) is never loaded in full.
+        """
+        classes = self.classes_[self.knn.labels[ind]]
+        if self.raw_reference is not None:
+            return np.asarray(self.raw_reference[ind], dtype=float), classes
+        Q = np.asarray(self.knn.index.reference[ind], dtype=float)
+        if self.shift is not None:
+            Q = Q - self.shift
+        return Q / self.inv_scale, classes
+
+
+class SklearnPipeline:
+    """The original two-step path, `model.predict(scaler.transform(X))`.
+
+    Same interface as KNNPipeline. Kept as the reference engine for parity
+    checks and as a fallback; it needs scikit-learn at inference time.
+    """
+
+    def __init__(self, model, scaler):
+        self.model = model
+        self.scaler = scaler
+        self.classes_ = model.classes_
+        self.n_neighbors = model.n_neighbors
+        self.weights = model.weights
+        self.p = minkowski_p(model)
+        self.raw_reference = None
+
+    def transform(self, X):
+        """Standardizes raw rows with the fitted scaler."""
+        names = getattr(self.scaler, "feature_names_in_", None)
+        if names is not None:
+            import pandas as pd
+
+            X = pd.DataFrame(X, columns=names)  # the scaler was fitted on a DataFrame
+        return self.scaler.transform(X)
+
+    def predict_trusted(self, X):
+        return self.model.predict(self.transform(X))
+
+    def predict(self, X):
+        return self.predict_trusted(check_rows(X))
+
+    def kneighbors(self, X, n_neighbors=None):
+        return self.model.kneighbors(self.transform(check_rows(X)), n_neighbors)
+
+    def reference_rows(self, ind):
+        return self.scaler.inverse_transform(self.model._fit_X[ind]), self.classes_[self.model._y[ind]]
@@ -0,0 +1,142 @@
+# ============================================================
+# 🫀 Heart Health Intelligence Platform — Reference Population
+# Leave-one-out severity distribution of the model's reference cohort
+# ============================================================
+"""
+Usage:
+    python population.py artifacts/ [--chunk-rows 8192]
+
+Scores every reference row with the model itself, leaving the row out of
+its own neighbor vote, and writes the resulting severity distribution as
+`population.json` next to the manifest:
+
+    n, values, counts   every distinct leave-one-out severity and how many rows got it
+    histogram           counts over HISTOGRAM_BINS equal bins of SEVERITY_RANGE
+    kde                 a Gaussian density smoothed from the histogram, for plotting
+
+`values`/`counts` are the exact empirical distribution, so `percentile`
+places a patient against all n cohort scores without keeping the scores.
+The file records the reference checksum and hyperparameters it was
+computed for; `load_population` ignores it once the model changes.
+
+Rows are scored in chunks of `--chunk-rows`: one k+1 neighbor query per
+chunk (the nearest hit is usually the row itself), so memory stays bounded
+however large the cohort is.
+"""
+
+import argparse
+import json
+import time
+from pathlib import Path
+
+import numpy as np
+
+from artifacts import open_artifacts, read_manifest
+
+POPULATION_FILE = "population.json"
+LOO_CHUNK_ROWS = 8192
+SEVERITY_RANGE = (0.0, 3.0)
+HISTOGRAM_BINS = 300
+KDE_POINTS = 200
+
+
+def leave_one_out(knn, reference=None, chunk_rows=LOO_CHUNK_ROWS):
+    """Severity of every reference row predicted from the other rows.
+
+    `reference` defaults to the index's own matrix (query space). Each
+    chunk asks for k+1 neighbors and drops the row itself; when exact
+    duplicates push the row out of its own k+1 list, the farthest is
+    dropped instead, so every row still votes with k neighbors.
+    """
+    reference = knn.index.reference if reference is None else reference
+    n = len(reference)
+    k = knn.n_neighbors
+    scores = np.empty(n, dtype=np.asarray(knn.classes_).dtype)
+    for start in range(0, n, chunk_rows):
+        rows = np.arange(start, min(start + chunk_rows, n))
+        dist, ind = knn.index.query(reference[rows], k + 1)
+        keep = ind != rows[:, None]
+        keep[keep.all(axis=1), -1] = False
+        scores[rows] = knn.vote(dist[keep].reshape(len(rows), -1), ind[keep].reshape(len(rows), -1))
+    return scores
+
+
+def summarize(scores):
+    """Compact distribution of cohort scores: exact value counts, a histogram and a KDE curve."""
+    scores = np.asarray(scores, dtype=float)
+    values, counts = np.unique(scores, return_counts=True)
+    lo, hi = min(SEVERITY_RANGE[0], values[0]), max(SEVERITY_RANGE[1], values[-1])
+    hist, edges = np.histogram(scores, bins=HISTOGRAM_BINS, range=(lo, hi))
+
+    # Silverman's rule, floored at two bins so a one-valued cohort still draws a peak.
+    q75, q25 = np.percentile(scores, [75, 25])
+    spread = min(scores.std(), (q75 - q25) / 1.34) or scores.std()
+    bandwidth = max(0.9 * spread * len(scores) ** -0.2, 2.0 * (edges[1] - edges[0]))
+    centers = 0.5 * (edges[:-1] + edges[1:])
+    x_vals = np.linspace(lo, hi, KDE_POINTS)
+    kernel = np.exp(-0.5 * ((x_vals[:, None] - centers) / bandwidth) ** 2)
+    y_vals = kernel @ hist / (len(scores) * bandwidth * np.sqrt(2.0 * np.pi))
+
+    return {
+        "n": int(len(scores)),
+        "mean": float(scores.mean()),
+        "values": values.tolist(),
+        "counts": counts.tolist(),
+        "histogram": {"range": [float(lo), float(hi)], "counts": hist.tolist()},
+        "kde": {"bandwidth": float(bandwidth), "x": np.round(x_vals, 4).tolist(),
+                "y": np.round(y_vals, 6).tolist()},
+    }
+
+
+def percentile(population, score):
+    """Percentile rank of `score` in the cohort: % scoring lower, plus half of those tied."""
+    values = np.asarray(population["values"])
+    counts = np.asarray(population["counts"])
+    below = counts[values < score].sum()
+    tied = counts[values == score].sum()
+    return 100.0 * (below + 0.5 * tied) / population["n"]
+
+
+def _model_key(manifest):
+    return {"reference_sha256": manifest["sha256"]["reference"], "n_neighbors": manifest["n_neighbors"],
+            "weights": manifest.get("weights", "uniform"), "p": manifest.get("p", 2.0)}
+
+
+def write_population(artifact_dir, chunk_rows=LOO_CHUNK_ROWS):
+    """Computes the leave-one-out distribution of an artifact directory and writes population.json."""
+    artifact_dir = Path(artifact_dir)
+    manifest = read_manifest(artifact_dir)
+    scores = leave_one_out(open_artifacts(artifact_dir).knn, chunk_rows=chunk_rows)
+    population = {"created": time.strftime("%Y-%m-%d %H:%M:%S"), "model": _model_key(manifest), **summarize(scores)}
+    (artifact_dir / POPULATION_FILE).write_text(json.dumps(population) + "\n")
+    return population
+
+
+def load_population(artifact_dir):
+    """The stored distribution, or None when it is missing or was computed for another model."""
+    path = Path(artifact_dir) / POPULATION_FILE
+    try:
+        population = json.loads(path.read_text())
+        manifest = read_manifest(artifact_dir)
+    except (OSError, ValueError):
+        return None
+    if population.get("model") != _model_key(manifest):
+        return None
+    return population
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Write the leave-one-out severity distribution of a model's reference cohort.")
+    parser.add_argument("artifacts", help="exported artifact directory (see artifacts.py)")
+    parser.add_argument("--chunk-rows", type=int, default=LOO_CHUNK_ROWS, help="reference rows scored per neighbor query")
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    population = write_population(args.artifacts, args.chunk_rows)
+    shares = ", ".join(f"{v:g}: {c / population['n']:.1%}" for v, c in zip(population["values"], population["counts"]))
+    print(f"wrote {Path(args.artifacts) / POPULATION_FILE} ({population['n']:,} rows in "
+          f"{time.perf_counter() - start:.2f}s; {shares})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+# ============================================================
+# 🫀 Heart Health Intelligence Platform — Prediction Cache
+# Bounded LRU memoization of per-patient predictions
+# ============================================================
+
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+from pipeline import check_rows
+
+DEFAULT_MAXSIZE = 4096
+
+
+class CachedPipeline:
+    """Wraps a KNNPipeline with a thread-safe LRU cache keyed on the 13-feature tuple.
+
+    Exposes the same `predict` / `predict_trusted` interface. Rows already
+    seen are answered from the cache; the remaining rows go to the
+    pipeline in one batch. One instance is meant to be shared by every
+    session in the process.
+    """
+
+    def __init__(self, pipeline, maxsize=DEFAULT_MAXSIZE):
+        self.pipeline = pipeline
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def predict_trusted(self, X):
+        keys = [tuple(row) for row in X.tolist()]
+        preds = np.empty(len(keys))
+        missing = []
+
+        with self._lock:
+            for i, key in enumerate(keys):
+                value = self._entries.get(key)
+                if value is None:
+                    missing.append(i)
+                else:
+                    self._entries.move_to_end(key)
+                    preds[i] = value
+            self.hits += len(keys) - len(missing)
+            self.misses += len(missing)
+
+        if missing:
+            fresh = self.pipeline.predict_trusted(X[missing]).astype(float)
+            preds[missing] = fresh
+            with self._lock:
+                for i, value in zip(missing, fresh.tolist()):
+                    self._entries[keys[i]] = value
+                    self._entries.move_to_end(keys[i])
+                while len(self._entries) > self.maxsize:
+                    self._entries.popitem(last=False)
+                    self.evictions += 1
+
+        return preds
+
+    def predict(self, X):
+        return self.predict_trusted(check_rows(X))
+
+    def stats(self):
+        """Returns a snapshot of the hit/miss/eviction counters."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries), "maxsize": self.maxsize,
+                "hits": self.hits, "misses": self.misses, "evictions": self.evictions,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
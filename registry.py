@@ -0,0 +1,295 @@
+# ============================================================
+# 🫀 Heart Health Intelligence Platform — Model Registry
+# Versioned model artifacts with background hot-swap
+# ============================================================
+"""
+Usage:
+    python registry.py publish model.pkl scaler.pkl [--version v2] [--no-activate] [--raw rows.csv]
+    python registry.py activate v1
+    python registry.py list
+
+A registry is a directory of exported artifact directories (see
+artifacts.py), one per version, plus `registry.json` naming the active one:
+
+    models/registry.json   {"active": "v2", "versions": {"v1": {...}, "v2": {...}}}
+    models/v1/             manifest.json + .npy arrays + population.json + cohort.json
+    models/v2/
+
+Versions are written to a temporary directory and renamed into place, and
+registry.json is replaced atomically, so a running app never sees a
+half-written version. `ModelRegistry` polls a checksum of registry.json and
+the active manifest; on a change it loads and verifies the new version in
+the background, warms it up, then swaps it in. The version found at
+startup is served straight away and checksummed by the poller thread, so
+cold start does not read every array.
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import pickle
+import shutil
+import threading
+import time
+from pathlib import Path
+
+import numpy as np
+
+from artifacts import export_artifacts, read_manifest, verify_artifacts
+from batching import BatchScheduler
+from cohort import load_cohort, write_cohort
+from inference import FEATURES, IVF_NPROBE, KNN_BACKEND, load_artifacts
+from population import load_population, write_population
+from prediction_cache import CachedPipeline
+
+REGISTRY_DIR = os.environ.get("HHI_MODEL_REGISTRY", "models")
+REGISTRY_POLL_S = float(os.environ.get("HHI_REGISTRY_POLL_S", "2"))
+REGISTRY_FILE = "registry.json"
+
+
+def read_registry(root):
+    """The registry index, or None when `root` holds no registry."""
+    path = Path(root) / REGISTRY_FILE
+    if not path.exists():
+        return None
+    return json.loads(path.read_text())
+
+
+def _write_registry(root, index):
+    path = Path(root) / REGISTRY_FILE
+    tmp = path.with_suffix(".json.tmp")
+    tmp.write_text(json.dumps(index, indent=2) + "\n")
+    os.replace(tmp, path)
+
+
+def publish(root, model, scaler, version=None, activate=True, source=None, raw=None):
+    """Exports a fitted model and scaler as a new registry version; returns its name.
+
+    `raw` is the unscaled training rows, stored as raw_reference.npy (see artifacts.py).
+    """
+    root = Path(root)
+    root.mkdir(parents=True, exist_ok=True)
+    index = read_registry(root) or {"active": None, "versions": {}}
+    version = version or f"v{len(index['versions']) + 1}"
+    if version in index["versions"] or (root / version).exists():
+        raise ValueError(f"version {version!r} already exists in {root}")
+
+    staging = root / f".staging-{version}"
+    shutil.rmtree(staging, ignore_errors=True)
+    manifest = export_artifacts(model, scaler, staging, raw)
+    write_population(staging)
+    if raw is not None:
+        write_cohort(staging)
+    os.replace(staging, root / version)
+
+    index["versions"][version] = {"published": manifest["created"], "n_samples": manifest["n_samples"],
+                                  "n_neighbors": manifest["n_neighbors"], "source": source}
+    if activate:
+        index["active"] = version
+    _write_registry(root, index)
+    return version
+
+
+def activate(root, version):
+    """Points the registry at an already published version (also used to roll back)."""
+    index = read_registry(root)
+    if index is None or version not in index["versions"]:
+        raise ValueError(f"no version {version!r} in {root}")
+    index["active"] = version
+    _write_registry(root, index)
+
+
+class ModelVersion:
+    """One loaded model version with its own batcher and prediction cache.
+
+    Sessions take the current version once per scan and predict on it, so
+    a swap never mixes two models in one batch or one cached answer.
+    `population` and `cohort` are the version's reference-cohort severity
+    distribution and feature quantiles (see population.py and cohort.py),
+    or None if they were not exported. `verified` is False until the
+    arrays have been checked against the manifest checksums.
+    """
+
+    def __init__(self, version, pipeline, source, population=None, cohort=None, verified=True):
+        self.version = version
+        self.pipeline = pipeline
+        self.source = source
+        self.population = population
+        self.cohort = cohort
+        self.verified = verified
+        self.loaded_at = time.strftime("%Y-%m-%d %H:%M:%S")
+        self.batcher = BatchScheduler(pipeline)
+        self.predictions = CachedPipeline(self.batcher)
+
+    def retire(self):
+        """Lets predictions already queued finish on this version, then stops its batcher."""
+        self.batcher.close()
+
+
+class ModelRegistry:
+    """Serves the active registry version and hot-swaps to new ones.
+
+    `current()` is lock-free for readers: it returns whichever ModelVersion
+    was swapped in last. Without a registry directory, `fallback()` loads a
+    fixed local model, labelled "local", with the cohort summaries stored
+    in `fallback_dir`, and the poller keeps watching for a registry to
+    appear (`root=None` disables the registry altogether).
+    """
+
+    def __init__(self, root=REGISTRY_DIR, fallback=None, poll_s=REGISTRY_POLL_S, fallback_dir=None):
+        self.root = Path(root) if root is not None else None
+        self.fallback = fallback
+        self.fallback_dir = fallback_dir
+        self.poll_s = poll_s
+        self.last_error = None
+        self._current = None
+        self._fingerprint = None
+        self._swap_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._poller = None
+
+    def current(self):
+        return self._current
+
+    def start(self):
+        """Loads the active version (or the fallback) now, then polls in a daemon thread.
+
+        The active version is memory-mapped without reading its arrays; the
+        poller verifies its checksums before it starts watching for changes.
+        """
+        self.refresh(verify=False)
+        if self._current is None:
+            self._serve_fallback()
+        if self.root is not None:
+            self._poller = threading.Thread(target=self._poll, name="model-registry", daemon=True)
+            self._poller.start()
+        return self
+
+    def _serve_fallback(self):
+        if self.fallback is None:
+            return
+        pipeline = self.fallback()
+        if pipeline is not None:
+            local = ModelVersion("local", pipeline, "local")
+            if self.fallback_dir:
+                local.population = load_population(self.fallback_dir)
+                local.cohort = load_cohort(self.fallback_dir)
+            self._swap(local)
+
+    def stop(self):
+        self._stop.set()
+
+    def fingerprint(self):
+        """Checksum of registry.json and the active manifest, or None without a registry."""
+        if self.root is None:
+            return None
+        try:
+            index_bytes = (self.root / REGISTRY_FILE).read_bytes()
+            active = json.loads(index_bytes)["active"]
+            manifest_bytes = (self.root / active / "manifest.json").read_bytes() if active else b""
+        except (OSError, ValueError, KeyError):
+            return None
+        return hashlib.sha256(index_bytes + b"\0" + manifest_bytes).hexdigest()
+
+    def refresh(self, verify=True):
+        """Loads and swaps in the active version if the registry changed; True on a swap."""
+        fingerprint = self.fingerprint()
+        if fingerprint is None or fingerprint == self._fingerprint:
+            return False
+        active = read_registry(self.root)["active"]
+        if active is None:
+            self._fingerprint = fingerprint
+            return False
+        try:
+            loaded = self._load(active, verify)
+        except Exception as exc:  # keep serving the current version
+            self.last_error = f"{type(exc).__name__}: {exc}"
+            self._fingerprint = fingerprint  # retried once the registry changes again
+            return False
+        self._fingerprint = fingerprint
+        self.last_error = None
+        self._swap(loaded)
+        return True
+
+    def _load(self, version, verify=True):
+        path = self.root / version
+        manifest = verify_artifacts(path) if verify else read_manifest(path)
+        if manifest["n_features"] != len(FEATURES):
+            raise ValueError(f"version {version} has {manifest['n_features']} features, expected {len(FEATURES)}")
+        pipeline = load_artifacts(artifact_dir=path, backend=KNN_BACKEND, nprobe=IVF_NPROBE)
+        if verify:
+            # Fault the memory-mapped arrays in before the first real request lands.
+            pipeline.predict_trusted(np.zeros((1, len(FEATURES))))
+        return ModelVersion(version, pipeline, str(path), load_population(path), load_cohort(path), verify)
+
+    def _verify_current(self):
+        """Checksums a version that start() served unverified; falls back to the local model on a mismatch."""
+        current = self._current
+        if current is None or current.verified:
+            return
+        try:
+            verify_artifacts(current.source)
+        except Exception as exc:
+            self.last_error = f"{type(exc).__name__}: {exc}"
+            self._serve_fallback()
+            return
+        current.verified = True
+
+    def _swap(self, loaded):
+        with self._swap_lock:
+            previous, self._current = self._current, loaded
+        if previous is not None:
+            previous.retire()
+
+    def _poll(self):
+        self._verify_current()
+        while not self._stop.wait(self.poll_s):
+            self.refresh()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Publish, activate and list versioned model artifacts.")
+    parser.add_argument("--registry", default=REGISTRY_DIR, help="registry directory (default: %(default)s)")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    pub = commands.add_parser("publish", help="export a pickled model and scaler as a new version")
+    pub.add_argument("model", help="pickled KNeighborsClassifier")
+    pub.add_argument("scaler", help="pickled StandardScaler")
+    pub.add_argument("--version", help="version name (default: v<N+1>)")
+    pub.add_argument("--no-activate", action="store_true", help="publish without serving it")
+    pub.add_argument("--raw", help="CSV of the unscaled training rows (13 feature columns, fit order)")
+
+    act = commands.add_parser("activate", help="serve an already published version")
+    act.add_argument("version")
+
+    commands.add_parser("list", help="show published versions")
+    args = parser.parse_args(argv)
+
+    if args.command == "publish":
+        with open(args.model, "rb") as f:
+            model = pickle.load(f)
+        with open(args.scaler, "rb") as f:
+            scaler = pickle.load(f)
+        raw = None
+        if args.raw:
+            import pandas as pd
+
+            raw = pd.read_csv(args.raw)[FEATURES].to_numpy(dtype=np.float64)
+        version = publish(args.registry, model, scaler, args.version, not args.no_activate, source=args.model, raw=raw)
+        print(f"published {version} to {args.registry}" + ("" if args.no_activate else " (active)"))
+    elif args.command == "activate":
+        activate(args.registry, args.version)
+        print(f"{args.version} is now active")
+    else:
+        index = read_registry(args.registry)
+        if index is None:
+            print(f"no registry in {args.registry}")
+            return
+        for version, info in index["versions"].items():
+            marker = "*" if version == index["active"] else " "
+            print(f"{marker} {version:<12} {info['published']}  {info['n_samples']:,} rows  k={info['n_neighbors']}")
+
+
+if __name__ == "__main__":
+    main()
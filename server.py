@@ -0,0 +1,264 @@
+# ============================================================
+# 🫀 Heart Health Intelligence Platform — REST Inference Server
+# JSON prediction API sharing the Streamlit app's model artifacts
+# ============================================================
+"""
+Usage:
+    python server.py --port 8600 --workers 2
+
+Endpoints:
+    POST /predict        {"features": [13 numbers]} or {"age": …, …, "thal": …}
+    POST /predict/batch  {"instances": [[13 numbers], …]}
+    GET  /health         status and micro-batching counters
+
+Requests are handled on one asyncio event loop. Rows from concurrent
+requests are collected for up to `--max-wait-ms` or `--max-batch` rows and
+predicted in a single call, on a pool of `--workers` processes (or in a
+background thread with `--workers 1`).
+"""
+
+import argparse
+import asyncio
+import json
+import multiprocessing
+import signal
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from http import HTTPStatus
+
+import numpy as np
+
+from inference import FEATURES, add_model_arguments, classify_risk, init_worker, model_source, worker_pipeline
+from pipeline import check_rows
+
+DEFAULT_PORT = 8600
+DEFAULT_MAX_BATCH = 256
+DEFAULT_MAX_WAIT_MS = 2.0
+MAX_BODY_BYTES = 8 * 1024 * 1024
+
+def _predict_in_worker(X):
+    return worker_pipeline().predict_trusted(X).astype(float)
+
+
+def parse_patient(payload):
+    """One patient row from `{"features": [...]}` or a mapping of the 13 feature names."""
+    if not isinstance(payload, dict):
+        raise ValueError("expected a JSON object")
+    if "features" in payload:
+        X = check_rows(payload["features"])
+    else:
+        missing = [name for name in FEATURES if name not in payload]
+        if missing:
+            raise ValueError(f"missing features: {', '.join(missing)}")
+        X = check_rows([payload[name] for name in FEATURES])
+    if len(X) != 1:
+        raise ValueError("expected one patient; use /predict/batch for several")
+    return X
+
+
+def parse_batch(payload):
+    if not isinstance(payload, dict) or "instances" not in payload:
+        raise ValueError('expected {"instances": [[13 features], ...]}')
+    X = check_rows(payload["instances"])
+    if len(X) == 0:
+        raise ValueError("instances is empty")
+    return X
+
+
+def prediction(score):
+    severity = round(float(score), 2)
+    return {"severity": severity, "risk_band": classify_risk(severity)[0]}
+
+
+class MicroBatcher:
+    """Coalesces rows from concurrent requests into one predict call per batch.
+
+    The first pending request opens a window of `max_wait_ms`. The batch is
+    flushed when the window closes or `max_batch` rows are pending. A single
+    request larger than `max_batch` is predicted on its own.
+    """
+
+    def __init__(self, executor, max_batch=DEFAULT_MAX_BATCH, max_wait_ms=DEFAULT_MAX_WAIT_MS):
+        self.executor = executor
+        self.max_batch = max_batch
+        self.max_wait = max_wait_ms / 1000.0
+        self.batches = 0
+        self.rows = 0
+        self._pending = []
+        self._pending_rows = 0
+        self._timer = None
+        # The event loop only holds weak references to tasks; keep in-flight batches alive.
+        self._tasks = set()
+
+    async def predict(self, X):
+        future = asyncio.get_running_loop().create_future()
+        self._pending.append((X, future))
+        self._pending_rows += len(X)
+        if self._pending_rows >= self.max_batch:
+            self._flush()
+        elif self._timer is None:
+            self._timer = asyncio.get_running_loop().call_later(self.max_wait, self._flush)
+        return await future
+
+    def _flush(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending, self._pending_rows = self._pending, [], 0
+        if batch:
+            task = asyncio.create_task(self._run(batch))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, batch):
+        X = np.concatenate([rows for rows, _ in batch])
+        self.batches += 1
+        self.rows += len(X)
+        try:
+            preds = await asyncio.get_running_loop().run_in_executor(self.executor, _predict_in_worker, X)
+        except Exception as exc:  # surfaces as a 500 on every request in the batch
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(exc)
+            return
+        start = 0
+        for rows, future in batch:
+            if not future.done():
+                future.set_result(preds[start:start + len(rows)])
+            start += len(rows)
+
+    def stats(self):
+        return {
+            "batches": self.batches, "rows": self.rows,
+            "mean_batch_rows": self.rows / self.batches if self.batches else 0.0,
+            "max_batch": self.max_batch, "max_wait_ms": self.max_wait * 1000.0,
+        }
+
+
+class InferenceServer:
+    """Minimal HTTP/1.1 JSON server with keep-alive, built on asyncio streams."""
+
+    def __init__(self, batcher):
+        self.batcher = batcher
+        self.started = time.time()
+
+    async def handle(self, reader, writer):
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                try:
+                    method, path, version = request_line.decode("latin-1").split()
+                except ValueError:
+                    await self._respond(writer, HTTPStatus.BAD_REQUEST, {"error": "malformed request line"}, False)
+                    break
+
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+
+                keep_alive = headers.get("connection", "").lower() != "close" and version == "HTTP/1.1"
+                length = headers.get("content-length", "0")
+                length = int(length) if length.isdigit() else -1
+                if length < 0:
+                    await self._respond(writer, HTTPStatus.BAD_REQUEST, {"error": "invalid Content-Length"}, False)
+                    break
+                if length > MAX_BODY_BYTES:
+                    await self._respond(writer, HTTPStatus.REQUEST_ENTITY_TOO_LARGE, {"error": "request body too large"}, False)
+                    break
+                body = await reader.readexactly(length) if length else b""
+
+                status, payload = await self.route(method, path.split("?", 1)[0], body)
+                await self._respond(writer, status, payload, keep_alive)
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def route(self, method, path, body):
+        if path == "/health":
+            if method != "GET":
+                return HTTPStatus.METHOD_NOT_ALLOWED, {"error": "use GET"}
+            return HTTPStatus.OK, {"status": "ok", "uptime_s": round(time.time() - self.started, 1),
+                                   "batching": self.batcher.stats()}
+
+        if path not in ("/predict", "/predict/batch"):
+            return HTTPStatus.NOT_FOUND, {"error": f"no route for {path}"}
+        if method != "POST":
+            return HTTPStatus.METHOD_NOT_ALLOWED, {"error": "use POST"}
+
+        try:
+            payload = json.loads(body or b"null")
+            X = parse_patient(payload) if path == "/predict" else parse_batch(payload)
+        except (ValueError, TypeError) as exc:  # includes json.JSONDecodeError
+            return HTTPStatus.BAD_REQUEST, {"error": str(exc)}
+
+        try:
+            preds = await self.batcher.predict(X)
+        except Exception as exc:
+            return HTTPStatus.INTERNAL_SERVER_ERROR, {"error": f"prediction failed: {exc}"}
+        if path == "/predict":
+            return HTTPStatus.OK, prediction(preds[0])
+        return HTTPStatus.OK, {"predictions": [prediction(p) for p in preds]}
+
+    async def _respond(self, writer, status, payload, keep_alive):
+        body = json.dumps(payload).encode()
+        head = (f"HTTP/1.1 {status.value} {status.phrase}\r\n"
+                f"Content-Type: application/json\r\n"
+                f"Content-Length: {len(body)}\r\n"
+                f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n")
+        writer.write(head.encode("latin-1") + body)
+        await writer.drain()
+
+
+async def serve(host, port, executor, max_batch, max_wait_ms):
+    """Serves until SIGINT or SIGTERM, so the caller can shut the worker pool down cleanly."""
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stop.set)
+
+    server = InferenceServer(MicroBatcher(executor, max_batch, max_wait_ms))
+    listener = await asyncio.start_server(server.handle, host, port)
+    print(f"serving on http://{host}:{port}", file=sys.stderr)
+    async with listener:
+        await stop.wait()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve heart disease KNN predictions over HTTP/JSON.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--workers", type=int, default=1, help="prediction processes (default: 1, in-process)")
+    parser.add_argument("--max-batch", type=int, default=DEFAULT_MAX_BATCH, help="rows per coalesced predict call")
+    parser.add_argument("--max-wait-ms", type=float, default=DEFAULT_MAX_WAIT_MS,
+                        help="how long the first request of a batch waits for company")
+    add_model_arguments(parser)
+    args = parser.parse_args(argv)
+
+    initargs = model_source(args)
+    if args.workers <= 1:
+        # One thread keeps predictions off the event loop without a second copy of the model.
+        init_worker(*initargs)
+        executor = ThreadPoolExecutor(1)
+    else:
+        # Spawned rather than forked: forked workers would inherit the listening socket.
+        executor = ProcessPoolExecutor(args.workers, mp_context=multiprocessing.get_context("spawn"),
+                                       initializer=init_worker, initargs=initargs)
+
+    try:
+        asyncio.run(serve(args.host, args.port, executor, args.max_batch, args.max_wait_ms))
+    finally:
+        executor.shutdown(cancel_futures=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+# ============================================================
+# 🫀 Heart Health Intelligence Platform — Latency Telemetry
+# Per-stage timings for the prediction pipeline
+# ============================================================
+
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+import numpy as np
+
+# p95 end-to-end latency budget for a diagnostic scan, in milliseconds.
+LATENCY_BUDGET_MS = float(os.environ.get("HHI_LATENCY_BUDGET_MS", "250"))
+
+
+@contextmanager
+def timed(timings, stage):
+    """Records the wall-clock time of the wrapped block into `timings[stage]` (ms)."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings[stage] = (time.perf_counter() - start) * 1000.0
+
+
+class LatencyTracker:
+    """Thread-safe rolling window of per-request stage timings."""
+
+    def __init__(self, window=500):
+        self._samples = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        with self._lock:
+            return len(self._samples)
+
+    def record(self, timings):
+        """Stores one request's stage timings; `total` is derived if missing."""
+        sample = dict(timings)
+        sample.setdefault("total", sum(timings.values()))
+        with self._lock:
+            self._samples.append(sample)
+        return sample
+
+    def percentile(self, q, stage="total"):
+        """Returns the q-th percentile of a stage over the window, or None if empty."""
+        with self._lock:
+            values = [s[stage] for s in self._samples if stage in s]
+        if not values:
+            return None
+        return float(np.percentile(values, q))
+
+    def over_budget(self, budget_ms=LATENCY_BUDGET_MS):
+        """True when the rolling p95 total latency exceeds the budget."""
+        p95 = self.percentile(95)
+        return p95 is not None and p95 > budget_ms
@@ -0,0 +1,113 @@
+# ============================================================
+# Parity tests: NumPy inference engine vs the scikit-learn model
+# Usage: python -m pytest tests/
+# ============================================================
+"""
+Every NumPy engine source (memory-mapped artifacts, the saved neighbor
+index, fusing the pickles directly) must predict the same classes and
+neighbor distances as `SklearnPipeline`, i.e. the original
+`model.predict(scaler.transform(X))`. Covered for the shipped model and for
+models refit with each vote weighting and Minkowski p that train.py
+searches. benchmarks/check_parity.py runs the same comparison at scale.
+"""
+
+import pickle
+import sys
+import warnings
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from artifacts import export_artifacts  # noqa: E402
+from inference import FEATURE_BOUNDS, FEATURES, feature_axis, load_artifacts  # noqa: E402
+from neighbors import IndexedKNN  # noqa: E402
+from pipeline import KNNPipeline, SklearnPipeline  # noqa: E402
+
+BASE = np.array([45.0, 1, 0, 120, 200, 0, 0, 150, 0, 1.0, 0, 0, 1])
+SOURCES = ["artifacts", "index", "estimator"]
+# Near-zero distances (a query equal to a reference row) differ by the
+# rounding of the ‖a‖² + ‖b‖² − 2a·b expansion, about sqrt(1e-15).
+DISTANCE_ATOL = 1e-6
+
+
+def _unpickle(name):
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")  # pickles from an older scikit-learn
+        with open(ROOT / name, "rb") as f:
+            return pickle.load(f)
+
+
+@pytest.fixture(scope="module")
+def shipped():
+    return _unpickle("model.pkl"), _unpickle("scaler.pkl")
+
+
+@pytest.fixture(scope="module")
+def patients(shipped):
+    """Training patients, random patients within the input bounds, and sensitivity grids around one patient."""
+    model, scaler = shipped
+    rng = np.random.default_rng(0)
+    cols = []
+    for name in FEATURES:
+        lo, hi, discrete = FEATURE_BOUNDS[name]
+        cols.append(rng.integers(lo, hi + 1, 2000).astype(float) if discrete else rng.uniform(lo, hi, 2000).round(1))
+    grids = []
+    for x, y in [("age", "chol"), ("trestbps", "thalach"), ("oldpeak", "ca"), ("cp", "thal")]:
+        gx, gy = np.meshgrid(feature_axis(x, 25), feature_axis(y, 25), indexing="ij")
+        grid = np.tile(BASE, (gx.size, 1))
+        grid[:, FEATURES.index(x)] = gx.ravel()
+        grid[:, FEATURES.index(y)] = gy.ravel()
+        grids.append(grid)
+    return np.concatenate([scaler.inverse_transform(model._fit_X), np.column_stack(cols), *grids])
+
+
+def numpy_engine(source, model, scaler, tmp_path, method="auto"):
+    """Builds the NumPy pipeline for `model` from one of the three sources load_artifacts supports."""
+    model_path, scaler_path = tmp_path / "model.pkl", tmp_path / "scaler.pkl"
+    model_path.write_bytes(pickle.dumps(model))
+    scaler_path.write_bytes(pickle.dumps(scaler))
+    if source == "artifacts":
+        export_artifacts(model, scaler, tmp_path / "artifacts")
+        return load_artifacts(model_path, scaler_path, artifact_dir=tmp_path / "artifacts")
+    if source == "index":
+        IndexedKNN.from_estimator(model, method).save(tmp_path / "knn_index.pkl")
+        return load_artifacts(model_path, scaler_path, index_path=tmp_path / "knn_index.pkl")
+    return KNNPipeline.from_estimator(model, scaler, method)
+
+
+def assert_parity(engine, reference, X):
+    np.testing.assert_array_equal(engine.predict(X), reference.predict(X))
+    dist, _ = engine.kneighbors(X)
+    ref_dist, _ = reference.kneighbors(X)
+    np.testing.assert_allclose(dist, ref_dist, rtol=1e-9, atol=DISTANCE_ATOL)
+
+
+@pytest.mark.parametrize("source", SOURCES)
+def test_shipped_model(source, shipped, patients, tmp_path):
+    model, scaler = shipped
+    assert_parity(numpy_engine(source, model, scaler, tmp_path), SklearnPipeline(model, scaler), patients)
+
+
+@pytest.mark.parametrize("source", SOURCES)
+@pytest.mark.parametrize("p", [1, 2])
+@pytest.mark.parametrize("weights", ["uniform", "distance"])
+def test_weights_and_metric(weights, p, source, shipped, patients, tmp_path):
+    from sklearn.base import clone
+
+    model, scaler = shipped
+    refit = clone(model).set_params(weights=weights, p=p).fit(model._fit_X, model.classes_[model._y])
+    assert_parity(numpy_engine(source, refit, scaler, tmp_path), SklearnPipeline(refit, scaler), patients)
+
+
+@pytest.mark.parametrize("method", ["kd_tree", "ball_tree"])
+@pytest.mark.parametrize("p", [1, 2])
+def test_tree_indexes(method, p, shipped, patients, tmp_path):
+    from sklearn.base import clone
+
+    model, scaler = shipped
+    refit = clone(model).set_params(p=p, n_neighbors=7).fit(model._fit_X, model.classes_[model._y])
+    assert_parity(numpy_engine("index", refit, scaler, tmp_path, method), SklearnPipeline(refit, scaler), patients)
@@ -0,0 +1,177 @@
+# ============================================================
+# 🫀 Heart Health Intelligence Platform — Model Training
+# Cross-validated KNN hyperparameter search and artifact export
+# ============================================================
+"""
+Usage:
+    python train.py heart.csv [--folds 5] [--repeats 3] [--workers 4]
+                              [--artifacts artifacts] [--registry models]
+
+Replaces the notebook's serial k loop on one train/test split. Searches
+k, vote weighting and the Minkowski exponent p (1: Manhattan, 2: Euclidean)
+with repeated stratified K-fold cross-validation on the training split,
+then refits the best configuration and exports it as the app's artifact
+directory, with its reference-cohort summaries (see population.py and
+cohort.py), and, with --registry, publishes it as a new model version.
+
+Each fold standardizes with its own training rows and runs one neighbor
+search per p out to the largest k. Every (k, weights) pair is then scored
+from that single sorted neighbor list with cumulative vote counts, so the
+grid costs one search per fold and metric instead of one fit per setting.
+Folds are spread across a process pool.
+"""
+
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from inference import FEATURES
+from neighbors import build_index, vote_weights
+
+TARGET = "target"
+K_VALUES = range(1, 31)
+WEIGHTS = ("uniform", "distance")
+P_VALUES = (1, 2)
+# The notebook's split, kept so held-out accuracy is comparable with it.
+TEST_SIZE = 0.2
+SEED = 42
+
+
+def load_dataset(path):
+    """Reads the heart disease CSV and drops duplicate rows, as the notebook does."""
+    df = pd.read_csv(path).drop_duplicates()
+    missing = [name for name in FEATURES + [TARGET] if name not in df.columns]
+    if missing:
+        raise ValueError(f"{path} is missing columns: {', '.join(missing)}")
+    return df[FEATURES], df[TARGET]
+
+
+def score_fold(X_train, y_train, X_val, y_val, k_values, p_values):
+    """Correct predictions on one validation fold for every (p, weights, k).
+
+    Returns an array of shape (len(p_values), len(WEIGHTS), len(k_values)).
+    Labels must be class indices (0..n_classes-1).
+    """
+    mean = X_train.mean(axis=0)
+    scale = X_train.std(axis=0)
+    scale[scale == 0.0] = 1.0  # StandardScaler leaves constant columns unscaled
+    Z_train, Z_val = (X_train - mean) / scale, (X_val - mean) / scale
+
+    n_classes = int(y_train.max()) + 1
+    k_max = max(k_values)
+    picks = np.asarray(k_values) - 1
+    correct = np.empty((len(p_values), len(WEIGHTS), len(k_values)), dtype=np.int64)
+    for i, p in enumerate(p_values):
+        dist, ind = build_index(Z_train, "blocked", p).query(Z_val, k_max)
+        onehot = np.eye(n_classes)[y_train[ind]]  # (n_val, k_max, n_classes)
+        for j, weights in enumerate(WEIGHTS):
+            votes = onehot if weights == "uniform" else onehot * vote_weights(dist)[:, :, None]
+            # Running vote totals: entry k-1 holds the vote over the k nearest neighbors.
+            totals = np.cumsum(votes, axis=1)[:, picks, :]
+            correct[i, j] = (totals.argmax(axis=2) == y_val[:, None]).sum(axis=0)
+    return correct
+
+
+def _score_split(args):
+    X, y, train_idx, val_idx, k_values, p_values = args
+    return score_fold(X[train_idx], y[train_idx], X[val_idx], y[val_idx], k_values, p_values)
+
+
+def search(X, y, folds=5, repeats=3, k_values=K_VALUES, p_values=P_VALUES, workers=None, seed=SEED):
+    """Cross-validates the full grid; returns result rows sorted best first.
+
+    Each row is a dict with k, weights, p, and the mean and standard
+    deviation of fold accuracy.
+    """
+    from sklearn.model_selection import RepeatedStratifiedKFold
+
+    X = np.asarray(X, dtype=float)
+    classes, y = np.unique(np.asarray(y), return_inverse=True)
+    k_values, p_values = list(k_values), list(p_values)
+    splitter = RepeatedStratifiedKFold(n_splits=folds, n_repeats=repeats, random_state=seed)
+    jobs = [(X, y, tr, va, k_values, p_values) for tr, va in splitter.split(X, y)]
+    sizes = np.array([len(va) for _, _, _, va, _, _ in jobs])
+
+    if workers == 1:
+        correct = list(map(_score_split, jobs))
+    else:
+        with ProcessPoolExecutor(workers) as pool:
+            correct = list(pool.map(_score_split, jobs))
+    accuracy = np.stack(correct) / sizes[:, None, None, None]  # (fold, p, weights, k)
+
+    mean, std = accuracy.mean(axis=0), accuracy.std(axis=0)
+    rows = [
+        {"k": k, "weights": weights, "p": p, "mean": float(mean[i, j, n]), "std": float(std[i, j, n])}
+        for i, p in enumerate(p_values) for j, weights in enumerate(WEIGHTS) for n, k in enumerate(k_values)
+    ]
+    # Ties prefer the steadier, then the simpler (smaller k, uniform, Euclidean) setting.
+    return sorted(rows, key=lambda r: (-round(r["mean"], 10), r["std"], r["k"], r["weights"] != "uniform", r["p"] != 2))
+
+
+def fit_best(X, y, best):
+    """Fits the StandardScaler and KNeighborsClassifier for one search result."""
+    from sklearn.neighbors import KNeighborsClassifier
+    from sklearn.preprocessing import StandardScaler
+
+    scaler = StandardScaler().fit(X)
+    model = KNeighborsClassifier(n_neighbors=best["k"], weights=best["weights"], p=best["p"])
+    return model.fit(scaler.transform(X), y), scaler
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Cross-validated KNN hyperparameter search with artifact export.")
+    parser.add_argument("data", help="heart disease CSV with the 13 feature columns and 'target'")
+    parser.add_argument("--folds", type=int, default=5)
+    parser.add_argument("--repeats", type=int, default=3, help="reshuffled K-fold repetitions")
+    parser.add_argument("--k-max", type=int, default=max(K_VALUES), help="search k = 1..k-max")
+    parser.add_argument("--p", type=float, nargs="+", default=list(P_VALUES), help="Minkowski exponents to try")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="fold processes (default: all CPUs)")
+    parser.add_argument("--test-size", type=float, default=TEST_SIZE,
+                        help="held-out fraction scored once at the end (0 trains on every row)")
+    parser.add_argument("--top", type=int, default=10, help="leaderboard rows to print")
+    parser.add_argument("--artifacts", default="artifacts", help="artifact directory to export the best model to")
+    parser.add_argument("--registry", help="also publish the best model as a new version in this registry")
+    args = parser.parse_args(argv)
+
+    X, y = load_dataset(args.data)
+    if args.test_size > 0:
+        from sklearn.model_selection import train_test_split
+
+        X, X_test, y, y_test = train_test_split(X, y, test_size=args.test_size, random_state=SEED)
+    print(f"{len(X):,} training rows, {args.folds}-fold × {args.repeats} cross-validation, "
+          f"{args.k_max * len(WEIGHTS) * len(args.p)} settings")
+
+    start = time.perf_counter()
+    results = search(X, y, args.folds, args.repeats, range(1, args.k_max + 1), args.p, args.workers)
+    print(f"searched in {time.perf_counter() - start:.2f}s")
+    print(f"  {'k':>3} {'weights':<9} {'p':>4}  {'CV accuracy':>14}")
+    for r in results[:args.top]:
+        print(f"  {r['k']:>3} {r['weights']:<9} {r['p']:>4g}  {r['mean']:.4f} ± {r['std']:.4f}")
+
+    best = results[0]
+    model, scaler = fit_best(X, y, best)
+    if args.test_size > 0:
+        accuracy = (model.predict(scaler.transform(X_test)) == np.asarray(y_test)).mean()
+        print(f"held-out accuracy of k={best['k']} {best['weights']} p={best['p']:g}: {accuracy:.4f}")
+
+    from artifacts import export_artifacts
+    from cohort import write_cohort
+    from population import write_population
+
+    export_artifacts(model, scaler, args.artifacts, raw=X)
+    write_population(args.artifacts)
+    write_cohort(args.artifacts)
+    print(f"wrote {args.artifacts}")
+    if args.registry:
+        from registry import publish
+
+        version = publish(args.registry, model, scaler, source=args.data, raw=X)
+        print(f"published {version} to {args.registry} (active)")
+
+
+if __name__ == "__main__":
+    main()